@@ -0,0 +1,280 @@
+# Active region tracking for the Game of Life.
+# The bit-packed board of GoLBits is cut into tiles of 64 rows by one word
+# (64 x 64 cells), and the last two generations are kept.  The next state of
+# a tile only depends on the tile and its eight neighbors, so when none of
+# them changed over the last two generations, the tile's next state is its
+# state two generations ago, which is already in the buffer the next
+# generation is written into.  Only the tiles next to a tile that changed are
+# recomputed, so still lifes, blinkers and other settled ash cost nothing
+# once the board around them has calmed down.  When most of the board is
+# active it is stepped in bands of rows like GoLBits, which is cheaper than
+# gathering the tiles one by one.
+
+import numpy as np
+from GoLbits import GoLBits, sum_neighbors, apply_rule, popcount, bits_hash, rows_hash
+
+_ONE = np.uint64(1)
+_63 = np.uint64(63)
+
+# Tiles recomputed at once
+_CHUNK_TILES = 1 << 12
+# Share of active tiles above which the whole board is stepped
+_DENSE = 0.4
+
+
+class GoLActive(GoLBits):
+    """
+    Represents a bit-packed Game of Life board that only recomputes the tiles
+    next to a tile that changed.  Results are identical to GoLArray.
+    """
+
+    def __init__(self, width, height, rule, topology="bounded", tile=64):
+        """
+        Initializes an empty board.
+
+        Parameters
+        ----------
+        width, height: size of the board
+        rule: compiled rule table (see GoLrules.compile_rule)
+        topology: bounded, torus or klein (see ConwayGOLGrid)
+        tile: number of rows of a tile; a tile is always one word (64 cells) wide
+
+        Returns
+        -------
+        None
+        """
+        GoLBits.__init__(self, width, height, rule, topology)
+
+        self.tile = min(tile, width)
+        self.tiles = (width + self.tile - 1) // self.tile
+        # Bands of whole tiles
+        self._band = max(1, self._band // self.tile) * self.tile
+
+        # Generation before the current one, its population and, while the
+        # board's hash is kept, its hash
+        self.__previous = np.zeros_like(self.board)
+        self.__previous_population = 0
+        self.__previous_hash = 0
+
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets which tiles changed, so the next two steps look at every tile
+        with living cells (every tile under a rule with B0).  Called after
+        cells were added other than by step.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        # Tiles that differ from two generations ago, unknown until two
+        # generations have been stepped
+        self.__changed = None
+        self.__fresh = True
+
+    def randomize(self, rate=30):
+        """
+        Randomly brings cells to life (see GoLBits.randomize).
+        """
+        GoLBits.randomize(self, rate)
+        self.reset()
+
+    def spawn(self, x, y):
+        """
+        Brings the cell at (x, y) to life (see GoLBits.spawn).
+        """
+        GoLBits.spawn(self, x, y)
+        self.reset()
+
+    def load(self, mask):
+        """
+        Replaces the board with the cells of a mask (see GoLBits.load).
+        """
+        GoLBits.load(self, mask)
+        self.reset()
+
+    def load_checkpoint(self, checkpoint):
+        """
+        Replaces the board with the cells of a checkpoint (see GoLBits.load_checkpoint).
+        """
+        GoLBits.load_checkpoint(self, checkpoint)
+        self.reset()
+
+    def state_hash(self):
+        """
+        Returns the Zobrist hash of the board (see GoLBits.state_hash).  Steps
+        write over the generation before the current one, so its hash is
+        kept as well.
+        """
+        if self._hash is None:
+            self.__previous_hash = self._board_hash(self.__previous)
+        return GoLBits.state_hash(self)
+
+    def __tiles(self, rows):
+        """
+        Returns which tiles of a rows x words bool array hold a True.
+        """
+        return np.logical_or.reduceat(rows, np.arange(0, len(rows), self.tile), axis=0)
+
+    def __mirror(self, tiles):
+        """
+        Returns the tiles holding the rows of a set of tiles mirrored in x.
+        """
+        return self.__tiles(np.repeat(tiles, self.tile)[:self.width][::-1])
+
+    def active(self):
+        """
+        Finds the tiles that may differ next generation from two generations
+        ago: the tiles that changed and their neighbors.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        tiles x words bool array
+        """
+        if self.__changed is not None:
+            changed = self.__changed
+        elif self._rule[0]:
+            # Empty tiles come to life too
+            return np.ones((self.tiles, self.words), dtype=np.bool_)
+        else:
+            # Only tiles near living cells can come to life
+            changed = self.__tiles((self.board != 0) | (self.__previous != 0))
+
+        # Neighbors along x
+        near = changed.copy()
+        if self.topology == "bounded":
+            near[1:] |= changed[:-1]
+            near[:-1] |= changed[1:]
+        else:
+            near |= np.roll(changed, 1, axis=0) | np.roll(changed, -1, axis=0)
+
+        # and along y, past the first and last words onto the other side
+        active = near.copy()
+        active[:, 1:] |= near[:, :-1]
+        active[:, :-1] |= near[:, 1:]
+        if self.topology == "torus":
+            active[:, 0] |= near[:, -1]
+            active[:, -1] |= near[:, 0]
+        elif self.topology == "klein":
+            active[:, 0] |= self.__mirror(near[:, -1])
+            active[:, -1] |= self.__mirror(near[:, 0])
+
+        return active
+
+    def __step_tiles(self, tx, tk):
+        """
+        Returns the next generation of a few tiles as a tile x n array of
+        words, and the rows of each tile.  Rows past the board are the width.
+        """
+        width, words, board = self.width, self.words, self.board
+
+        # Rows x0 - 1 to x1 of every tile, and the words before and after it
+        rows = tx * self.tile + np.arange(-1, self.tile + 1)[:, np.newaxis]
+        if self.topology == "bounded":
+            inside = (rows >= 0) & (rows < width)
+            src = np.where(inside, rows, 0)
+        else:
+            src = rows % width
+        c = board[src, tk]
+        before = board[src, np.maximum(tk - 1, 0)]
+        before[:, tk == 0] = 0
+        after = board[src, np.minimum(tk + 1, words - 1)]
+        after[:, tk == words - 1] = 0
+        if self.topology == "bounded":
+            c *= inside
+            before *= inside
+            after *= inside
+
+        # Neighbor at y - 1 (up) and y + 1 (down) of every cell
+        up = (c << _ONE) | (before >> _63)
+        down = (c >> _ONE) | (after << _63)
+        first, last = tk == 0, tk == words - 1
+        if self.topology != "bounded":
+            # The first and last cells of a row are neighbors, of the mirrored
+            # row on a Klein bottle
+            wrap = src if self.topology == "torus" else width - 1 - src
+            if first.any():
+                up[:, first] |= (board[wrap[:, first], words - 1] >> self._top) & _ONE
+            if last.any():
+                down[:, last] |= (board[wrap[:, last], 0] & _ONE) << self._top
+
+        new = apply_rule(self._rule, c[1:-1], sum_neighbors(up, c, down))
+        # Cells past the last one of a row stay dead, even with B0
+        new[:, last] &= self._tail
+
+        return new, np.minimum(rows[1:-1], width)
+
+    def step(self):
+        """
+        Advances the board by one generation.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        True if there are remaining alive cells.
+        False otherwise.
+        """
+        active = self.active()
+        # The next generation overwrites the one before the current one
+        target = self.__previous
+        changed = np.zeros_like(active)
+        # Hash of the next generation, from the cells that differ from the
+        # generation it is written over
+        hashed = self._hash is not None
+        h = self.__previous_hash
+
+        if active.mean() > _DENSE:
+            population = 0
+            for x0 in range(0, self.width, self._band):
+                x1 = min(x0 + self._band, self.width)
+                new = self._step_rows(x0, x1)
+                changed[x0 // self.tile:(x1 + self.tile - 1) // self.tile] = \
+                    self.__tiles(new != target[x0:x1])
+                if hashed:
+                    h ^= rows_hash(new ^ target[x0:x1], x0)
+                target[x0:x1] = new
+                population += popcount(new)
+        else:
+            # Tiles left alone are the same as two generations ago
+            population = self.__previous_population
+            tx, tk = np.nonzero(active)
+            for i in range(0, len(tx), _CHUNK_TILES):
+                x, k = tx[i:i + _CHUNK_TILES], tk[i:i + _CHUNK_TILES]
+                new, rows = self.__step_tiles(x, k)
+                # Rows of the last tile past the board are left out
+                valid = rows < self.width
+                words = np.broadcast_to(k, rows.shape)
+                rows, words, new = rows[valid], words[valid], new[valid]
+                old = target[rows, words]
+                moved = old != new
+                if not moved.any():
+                    continue
+                changed[rows[moved] // self.tile, words[moved]] = True
+                population += popcount(new) - popcount(old)
+                if hashed:
+                    h ^= bits_hash(rows[moved], words[moved], old[moved] ^ new[moved])
+                target[rows, words] = new
+
+        self.__previous, self.board = self.board, target
+        self.__previous_population, self._population = self._population, population
+        if hashed:
+            self.__previous_hash, self._hash = self._hash, h
+        if self.__fresh:
+            # The generation before the first one was not stepped to
+            self.__fresh = False
+        else:
+            self.__changed = changed
+
+        return population > 0
@@ -0,0 +1,278 @@
+# NumPy backed board for the Game of Life.
+# The whole board is kept in a single uint8 array (1 alive, 0 dead) and the
+# neighbor counts for every cell are computed at once by summing the eight
+# shifted views of a padded copy of the board.  The one cell border of the
+# padded copy holds dead cells on a bounded board, or copies of the opposite
+# edges on a torus or Klein bottle.
+
+import numpy as np
+from GoLcycles import array_hash
+
+
+def sum_neighbors(padded, count):
+    """
+    Sums the eight shifted views of a padded board.
+
+    Parameters
+    ----------
+    padded: (w + 2) x (h + 2) uint8 array holding a board and a one cell border
+    count: w x h uint8 array that receives the neighbor counts
+
+    Returns
+    -------
+    count
+    """
+    p = padded
+    np.copyto(count, p[:-2, :-2])
+    count += p[:-2, 1:-1]
+    count += p[:-2, 2:]
+    count += p[1:-1, :-2]
+    count += p[1:-1, 2:]
+    count += p[2:, :-2]
+    count += p[2:, 1:-1]
+    count += p[2:, 2:]
+
+    return count
+
+
+def apply_rule(rule, board, count, out):
+    """
+    Looks up the next state of every cell in a rule table.
+
+    Parameters
+    ----------
+    rule: uint8 array of 18 entries indexed by (state * 9 + neighbors)
+    board: uint8 array of current states
+    count: uint8 array of neighbor counts, same shape as board
+    out: uint8 array that receives the next states (may be board itself)
+
+    Returns
+    -------
+    out
+    """
+    # Turn the states into rule table indices (state * 9 + neighbors)
+    # in place, then look up the next state.
+    np.multiply(board, 9, out=out)
+    out += count
+    np.take(rule, out, out=out)
+
+    return out
+
+
+class GoLArray():
+    """
+    Represents a Game of Life board stored as a width x height NumPy array.
+    The array is indexed the same way as ConwayGOLGrid.cells, board[x, y].
+    """
+
+    def __init__(self, width, height, rule, topology="bounded", board=None):
+        """
+        Initializes an empty board.
+
+        Parameters
+        ----------
+        width, height: size of the board
+        rule: compiled rule table (see GoLrules.compile_rule)
+        topology: bounded, torus or klein (see ConwayGOLGrid)
+        board: optional empty width x height uint8 array to use as the board,
+            such as one in shared memory
+
+        Returns
+        -------
+        None
+        """
+        self.width, self.height = width, height
+        self.topology = topology
+        self.board = np.zeros((width, height), dtype=np.uint8) if board is None else board
+        # Number of living cells, kept up to date by randomize, spawn and step
+        self._population = 0
+        # Zobrist hash of the board, kept up to date by step once state_hash
+        # has been called; None until then and after any other change
+        self._hash = None
+
+        # Rule table indexed by (state * 9 + neighbors)
+        self.__rule = np.array(list(rule), dtype=np.uint8)
+
+        # Buffers reused on every update so a generation does not allocate,
+        # made on the first update.  On a bounded board the border of the
+        # padded board is never written and stays dead.
+        self.__padded = None
+        self.__count = None
+
+    def randomize(self, rate=30):
+        """
+        Randomly brings cells to life with the same odds as ConwayGOLGrid
+        (randint(0, 100) < rate).
+
+        Parameters
+        ----------
+        rate: chance out of 101 that a cell starts alive
+
+        Returns
+        -------
+        None
+        """
+        self.board[...] = np.random.randint(0, 101, size=self.board.shape) < rate
+        self._population = int(np.count_nonzero(self.board))
+        self._hash = None
+
+    def spawn(self, x, y):
+        """
+        Brings the cell at (x, y) to life.
+
+        Parameters
+        ----------
+        x, y: coordinates of the cell
+
+        Returns
+        -------
+        None
+        """
+        if not self.board[x, y]:
+            self.board[x, y] = 1
+            self._population += 1
+            self._hash = None
+
+    def load(self, mask):
+        """
+        Replaces the board with the cells of a mask.
+
+        Parameters
+        ----------
+        mask: bool array indexed as [x, y]; cells past the board are dropped
+
+        Returns
+        -------
+        None
+        """
+        self.board[...] = 0
+        width, height = min(mask.shape[0], self.width), min(mask.shape[1], self.height)
+        self.board[:width, :height] = mask[:width, :height]
+        self._population = int(np.count_nonzero(self.board))
+        self._hash = None
+
+    def load_checkpoint(self, checkpoint):
+        """
+        Replaces the board with the cells of a checkpoint, unpacked from the
+        mapped file straight into the board.
+
+        Parameters
+        ----------
+        checkpoint: GoLcheckpoint.GoLCheckpoint
+
+        Returns
+        -------
+        None
+        """
+        checkpoint.draw(self.board)
+        self._population = int(np.count_nonzero(self.board))
+        self._hash = None
+
+    def is_alive(self, x, y):
+        """
+        Returns True if the cell at (x, y) is alive, False otherwise.
+        """
+        return bool(self.board[x, y])
+
+    def count_neighbors(self):
+        """
+        Computes the number of living neighbors of every cell.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        width x height uint8 array of neighbor counts. The array is reused by
+        the next call.
+        """
+        if self.__padded is None:
+            self.__padded = np.zeros((self.width + 2, self.height + 2), dtype=np.uint8)
+            self.__count = np.zeros((self.width, self.height), dtype=np.uint8)
+
+        p = self.__padded
+        p[1:-1, 1:-1] = self.board
+
+        if self.topology != "bounded":
+            # Wrap the left and right edges, then the top and bottom edges
+            # (corners included) from the rows just filled in
+            p[0, 1:-1] = self.board[-1]
+            p[-1, 1:-1] = self.board[0]
+            if self.topology == "klein":
+                p[:, 0] = p[::-1, -2]
+                p[:, -1] = p[::-1, 1]
+            else:
+                p[:, 0] = p[:, -2]
+                p[:, -1] = p[:, 1]
+
+        return sum_neighbors(p, self.__count)
+
+    def step(self):
+        """
+        Advances the board by one generation.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        True if there are remaining alive cells.
+        False otherwise.
+        """
+        apply_rule(self.__rule, self.board, self.count_neighbors(), self.board)
+        self._population = int(np.count_nonzero(self.board))
+        if self._hash is not None:
+            # The padded board still holds the last generation
+            self._hash ^= array_hash(self.board != self.__padded[1:-1, 1:-1])
+
+        return self._population > 0
+
+    def population(self):
+        """
+        Returns the number of living cells.
+        """
+        return self._population
+
+    def state_hash(self):
+        """
+        Returns the Zobrist hash of the board (see GoLcycles).  It is computed
+        from the whole board on the first call, then updated by every step
+        from the cells that changed.
+        """
+        if self._hash is None:
+            self._hash = array_hash(self.board)
+        return self._hash
+
+    def bounding_box(self):
+        """
+        Returns the smallest rectangle holding every living cell.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        (x0, y0, x1, y1) inclusive corners, or None when nothing is alive
+        """
+        xs = np.flatnonzero(self.board.any(axis=1))
+        if len(xs) == 0:
+            return None
+        ys = np.flatnonzero(self.board.any(axis=0))
+        return (int(xs[0]), int(ys[0]), int(xs[-1]), int(ys[-1]))
+
+    def get_living(self):
+        """
+        Returns a 2D list with False representing dead cells and True representing alive cells.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        2D list of booleans indexed as [x][y]
+        """
+        return self.board.astype(bool).tolist()
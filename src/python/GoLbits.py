@@ -0,0 +1,480 @@
+# Bit-packed board for the Game of Life.
+# Every row x of the board is packed into uint64 words, bit y % 64 of word
+# y // 64 holding cell (x, y), so the board takes one bit per cell.  The
+# neighbor counts of 64 cells at once are added up by bitwise adders (SWAR,
+# SIMD within a register): shifting a row by one bit lines up the neighbors
+# above and below every cell, and full adders sum the eight neighbors into
+# the four bits of their count.  Any B/S rule is then a handful of ANDs and
+# ORs on those bits.  The board is stepped in bands of rows, so the adders
+# only ever hold a small slice of the board.
+
+import numpy as np
+from GoLcycles import coords_hash
+
+_ONE = np.uint64(1)
+_63 = np.uint64(63)
+
+# Words stepped at once (a band of rows)
+_BAND_WORDS = 1 << 15
+
+# Masks of the SWAR population count
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+# Every byte with its bits in reverse order
+_REVERSED = np.packbits(np.unpackbits(np.arange(256, dtype=np.uint8).reshape(-1, 1),
+                                      axis=1)[:, ::-1], axis=1).ravel()
+
+
+def popcount(words):
+    """
+    Counts the set bits of an array of uint64 words.
+
+    Parameters
+    ----------
+    words: uint64 array
+
+    Returns
+    -------
+    Number of set bits
+    """
+    v = words - ((words >> _ONE) & _M1)
+    v = (v & _M2) + ((v >> np.uint64(2)) & _M2)
+    v = (v + (v >> np.uint64(4))) & _M4
+    return int(((v * _H01) >> np.uint64(56)).sum())
+
+
+def sum_neighbors(up, c, down):
+    """
+    Adds up the eight neighbors of every cell with bitwise full adders.
+
+    Parameters
+    ----------
+    up, c, down: (rows + 2) x n uint64 arrays holding rows x0 - 1 to x1 of a
+        board (c), and the same rows with every bit replaced by the cell
+        before it (up, the neighbor at y - 1) or after it (down, y + 1)
+
+    Returns
+    -------
+    (z0, z1, z2, z3) rows x n arrays of the bits of the counts of rows x0 to
+    x1 - 1, so a cell has z0 + 2 z1 + 4 z2 + 8 z3 living neighbors
+    """
+    # Each row's sum of up, center and down (2 bits), and of up and down
+    t0 = up ^ c ^ down
+    t1 = (up & c) | (down & (up ^ c))
+    m0 = up[1:-1] ^ down[1:-1]
+    m1 = up[1:-1] & down[1:-1]
+
+    # Add the sums of the rows before and after, and the row's own up and down
+    a, b = t0[:-2], t0[2:]
+    z0 = a ^ b ^ m0
+    carry = (a & b) | (m0 & (a ^ b))
+    a, b = t1[:-2], t1[2:]
+    u = a ^ b ^ m1
+    v = (a & b) | (m1 & (a ^ b))
+    z1 = u ^ carry
+    w = u & carry
+
+    return z0, z1, v ^ w, v & w
+
+
+def apply_rule(rule, alive, bits, out=None):
+    """
+    Works out the next state of every cell from its neighbor count.
+
+    Parameters
+    ----------
+    rule: compiled rule table (see GoLrules.compile_rule)
+    alive: uint64 array of the current states
+    bits: bits of the neighbor counts (see sum_neighbors)
+    out: optional uint64 array that receives the next states
+
+    Returns
+    -------
+    out, or a new array
+    """
+    # Cells with n neighbors are those whose count bits match the bits of n
+    inverse = [~z for z in bits]
+    born = np.zeros_like(alive)
+    survives = np.zeros_like(alive)
+    for n in range(9):
+        if not (rule[n] or rule[9 + n]):
+            continue
+        count = bits[0] if n & 1 else inverse[0]
+        for i in range(1, 4):
+            count = count & (bits[i] if n >> i & 1 else inverse[i])
+        if rule[n]:
+            born |= count
+        if rule[9 + n]:
+            survives |= count
+
+    return np.bitwise_or(alive & survives, ~alive & born, out=out)
+
+
+def pack_rows(mask, words):
+    """
+    Packs a bool mask indexed as [x, y] into uint64 words.
+
+    Parameters
+    ----------
+    mask: rows x height bool array
+    words: number of words per row
+
+    Returns
+    -------
+    rows x words uint64 array
+    """
+    rows, height = mask.shape
+    bits = np.zeros((rows, words * 64), dtype=np.bool_)
+    bits[:, :height] = mask
+    # packbits puts the first bit in the high end of a byte, the words want it low
+    packed = np.packbits(bits.reshape(rows, words * 8, 8)[:, :, ::-1], axis=2)
+    return packed.reshape(rows, words * 8).view("<u8").astype(np.uint64)
+
+
+def unpack_rows(words, height):
+    """
+    Unpacks uint64 words into a bool mask indexed as [x, y] (see pack_rows).
+    """
+    rows = words.shape[0]
+    packed = words.astype("<u8").view(np.uint8).reshape(rows, -1, 1)
+    bits = np.unpackbits(packed, axis=2)[:, :, ::-1]
+    return bits.reshape(rows, -1)[:, :height].view(np.bool_)
+
+
+def bits_hash(xs, ks, words):
+    """
+    Returns the Zobrist hash (see GoLcycles) of the set bits of words.
+
+    Parameters
+    ----------
+    xs, ks: NumPy arrays of the row and word index of every word
+    words: uint64 NumPy array of words; bit j of word k of row x is cell
+        (x, 64 k + j)
+
+    Returns
+    -------
+    64 bit hash
+    """
+    packed = words.astype("<u8").view(np.uint8).reshape(-1, 8, 1)
+    bits = np.unpackbits(packed, axis=2)[:, :, ::-1].reshape(-1, 64)
+    i, j = np.nonzero(bits)
+    return coords_hash(xs[i], ks[i] * 64 + j)
+
+
+def rows_hash(rows, x0=0):
+    """
+    Returns the Zobrist hash of the set bits of a rows x words array of
+    words holding rows x0 onward of a board.
+    """
+    xs, ks = np.nonzero(rows)
+    return bits_hash(xs + x0, ks, rows[xs, ks])
+
+
+class GoLBits():
+    """
+    Represents a Game of Life board stored as rows of uint64 words.  Results
+    are identical to GoLArray.
+    """
+
+    def __init__(self, width, height, rule, topology="bounded"):
+        """
+        Initializes an empty board.
+
+        Parameters
+        ----------
+        width, height: size of the board
+        rule: compiled rule table (see GoLrules.compile_rule)
+        topology: bounded, torus or klein (see ConwayGOLGrid)
+
+        Returns
+        -------
+        None
+        """
+        self.width, self.height = width, height
+        self.topology = topology
+        self.words = (height + 63) // 64
+        # Current generation; the bits past height are always 0.  The next
+        # generation is made on the first step.
+        self.board = np.zeros((width, self.words), dtype=np.uint64)
+        self.__next = None
+        self._population = 0
+        # Zobrist hash of the board, kept up to date by step once state_hash
+        # has been called; None until then and after any other change
+        self._hash = None
+
+        self._rule = rule
+        # Bit of the last cell of a row, and the used bits of the last word
+        self._top = np.uint64((height - 1) % 64)
+        self._tail = np.uint64((1 << ((height - 1) % 64 + 1)) - 1)
+        # Rows stepped at once
+        self._band = max(1, _BAND_WORDS // self.words)
+
+    def randomize(self, rate=30):
+        """
+        Randomly brings cells to life with the same odds as ConwayGOLGrid
+        (randint(0, 100) < rate), a band of rows at a time.
+
+        Parameters
+        ----------
+        rate: chance out of 101 that a cell starts alive
+
+        Returns
+        -------
+        None
+        """
+        for x in range(0, self.width, self._band):
+            end = min(x + self._band, self.width)
+            cells = np.random.randint(0, 101, size=(end - x, self.height)) < rate
+            self.board[x:end] = pack_rows(cells, self.words)
+        self._population = popcount(self.board)
+        self._hash = None
+
+    def spawn(self, x, y):
+        """
+        Brings the cell at (x, y) to life.
+
+        Parameters
+        ----------
+        x, y: coordinates of the cell
+
+        Returns
+        -------
+        None
+        """
+        if not self.is_alive(x, y):
+            self.board[x, y >> 6] |= _ONE << np.uint64(y & 63)
+            self._population += 1
+            self._hash = None
+
+    def load(self, mask):
+        """
+        Replaces the board with the cells of a mask.
+
+        Parameters
+        ----------
+        mask: bool array indexed as [x, y]; cells past the board are dropped
+
+        Returns
+        -------
+        None
+        """
+        self.board[...] = 0
+        width, height = min(mask.shape[0], self.width), min(mask.shape[1], self.height)
+        for x in range(0, width, self._band):
+            end = min(x + self._band, width)
+            self.board[x:end] = pack_rows(mask[x:end, :height], self.words)
+        self._population = popcount(self.board)
+        self._hash = None
+
+    def load_checkpoint(self, checkpoint):
+        """
+        Replaces the board with the cells of a checkpoint.  A dense checkpoint
+        is unpacked a band of rows at a time; the cells of a sparse one are
+        read once and set straight in their words.
+
+        Parameters
+        ----------
+        checkpoint: GoLcheckpoint.GoLCheckpoint
+
+        Returns
+        -------
+        None
+        """
+        if checkpoint.layout == "sparse":
+            self.board[...] = 0
+            words = self.board.reshape(-1)
+            for xs, ys in checkpoint.chunks():
+                inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+                xs, ys = xs[inside], ys[inside]
+                # Cells of the same word are ORed together
+                np.bitwise_or.at(words, xs * self.words + (ys >> 6),
+                                 _ONE << (ys & 63).astype(np.uint64))
+        else:
+            band = np.zeros((self._band, self.height), dtype=np.bool_)
+            for x in range(0, self.width, self._band):
+                end = min(x + self._band, self.width)
+                checkpoint.draw(band[:end - x], -x)
+                self.board[x:end] = pack_rows(band[:end - x], self.words)
+        self._population = popcount(self.board)
+        self._hash = None
+
+    def is_alive(self, x, y):
+        """
+        Returns True if the cell at (x, y) is alive, False otherwise.
+        """
+        return bool((self.board[x, y >> 6] >> np.uint64(y & 63)) & _ONE)
+
+    def __rows(self, x0, x1):
+        """
+        Returns rows x0 - 1 to x1 of the board, wrapped or dead past its edges.
+        """
+        xs = np.arange(x0 - 1, x1 + 1)
+        if self.topology == "bounded":
+            rows = np.zeros((len(xs), self.words), dtype=np.uint64)
+            inside = (xs >= 0) & (xs < self.width)
+            rows[inside] = self.board[xs[inside]]
+            return rows, xs
+
+        xs %= self.width
+        return self.board[xs], xs
+
+    def _step_rows(self, x0, x1):
+        """
+        Returns the next generation of rows x0 to x1 - 1 as an
+        (x1 - x0) x words array.
+        """
+        c, xs = self.__rows(x0, x1)
+
+        # Planes holding the neighbor at y - 1 (up) and y + 1 (down) of every cell
+        up = c << _ONE
+        up[:, 1:] |= c[:, :-1] >> _63
+        down = c >> _ONE
+        down[:, :-1] |= c[:, 1:] << _63
+        if self.topology != "bounded":
+            # The first and last cells of a row are neighbors, of the mirrored
+            # row on a Klein bottle
+            wrap = c if self.topology == "torus" else self.board[self.width - 1 - xs]
+            up[:, 0] |= (wrap[:, -1] >> self._top) & _ONE
+            down[:, -1] |= (wrap[:, 0] & _ONE) << self._top
+
+        new = apply_rule(self._rule, c[1:-1], sum_neighbors(up, c, down))
+        # Cells past the last one of a row stay dead, even with B0
+        new[:, -1] &= self._tail
+
+        return new
+
+    def step(self):
+        """
+        Advances the board by one generation.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        True if there are remaining alive cells.
+        False otherwise.
+        """
+        if self.__next is None:
+            self.__next = np.zeros_like(self.board)
+
+        population = 0
+        for x0 in range(0, self.width, self._band):
+            x1 = min(x0 + self._band, self.width)
+            self.__next[x0:x1] = new = self._step_rows(x0, x1)
+            population += popcount(new)
+            if self._hash is not None:
+                self._hash ^= rows_hash(new ^ self.board[x0:x1], x0)
+
+        self.board, self.__next = self.__next, self.board
+        self._population = population
+
+        return population > 0
+
+    def population(self):
+        """
+        Returns the number of living cells.
+        """
+        return self._population
+
+    def _board_hash(self, board):
+        """
+        Returns the Zobrist hash of a width x words board, a band of rows at a time.
+        """
+        h = 0
+        for x in range(0, self.width, self._band):
+            h ^= rows_hash(board[x:x + self._band], x)
+        return h
+
+    def state_hash(self):
+        """
+        Returns the Zobrist hash of the board (see GoLcycles).  It is computed
+        from the whole board on the first call, then updated by every step
+        from the words that changed.
+        """
+        if self._hash is None:
+            self._hash = self._board_hash(self.board)
+        return self._hash
+
+    def bounding_box(self):
+        """
+        Returns the smallest rectangle holding every living cell.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        (x0, y0, x1, y1) inclusive corners, or None when nothing is alive
+        """
+        xs = np.flatnonzero(self.board.any(axis=1))
+        if len(xs) == 0:
+            return None
+
+        # Words with living cells in any row, and their lowest and highest bits
+        column = np.bitwise_or.reduce(self.board, axis=0)
+        used = np.flatnonzero(column)
+        low, high = int(column[used[0]]), int(column[used[-1]])
+        y0 = used[0] * 64 + (low & -low).bit_length() - 1
+        y1 = used[-1] * 64 + high.bit_length() - 1
+
+        return (int(xs[0]), int(y0), int(xs[-1]), int(y1))
+
+    def unpack(self, out=None):
+        """
+        Returns the board as a width x height bool array indexed as [x, y].
+
+        Parameters
+        ----------
+        out: optional width x height bool array to fill
+
+        Returns
+        -------
+        out, or a new array
+        """
+        if out is None:
+            out = np.zeros((self.width, self.height), dtype=np.bool_)
+        for x in range(0, self.width, self._band):
+            end = min(x + self._band, self.width)
+            out[x:end] = unpack_rows(self.board[x:end], self.height)
+
+        return out
+
+    def packed_bands(self):
+        """
+        Yields the board a band of rows at a time, with every row packed into
+        bytes the way numpy.packbits packs a bool array (cell y is bit
+        7 - y % 8 of byte y // 8), as dense checkpoints store it.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        Generator of rows x (height + 7) // 8 uint8 arrays
+        """
+        stride = (self.height + 7) // 8
+        for x in range(0, self.width, self._band):
+            end = min(x + self._band, self.width)
+            packed = self.board[x:end].astype("<u8").view(np.uint8)
+            yield _REVERSED[packed[:, :stride]]
+
+    def get_living(self):
+        """
+        Returns a 2D list with False representing dead cells and True representing alive cells.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        2D list of booleans indexed as [x][y]
+        """
+        return self.unpack().tolist()
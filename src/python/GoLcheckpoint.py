@@ -0,0 +1,287 @@
+# Binary checkpoints for the Game of Life.
+# A checkpoint is a 96 byte header followed by the living cells, stored in
+# one of two layouts, whichever is smaller:
+#   dense:  the cells of a columns x rows region, one bit per cell, each
+#           column x packed along y (see numpy.packbits)
+#   sparse: a table of little endian uint32 (x, y) pairs relative to the
+#           corner of the region
+# The header holds the rule, topology, engine and generation, so a run can be
+# resumed where it stopped.  Checkpoints are read through mmap, so the cells go
+# from the page cache straight into a board a slice at a time, and a checkpoint
+# of any size costs little more memory than the board it is loaded into.
+
+import mmap
+import struct
+
+_MAGIC = b"GoLCKPT\0"
+_VERSION = 1
+# magic, version, layout, topology, engine, board width and height, corner of
+# the region, size of the region, generation, population, rule
+_HEADER = struct.Struct("<8sHBBBxIIqqIIQQ32s2x")
+
+LAYOUTS = ("dense", "sparse")
+TOPOLOGIES = ("bounded", "torus", "klein", "unbounded")
+
+# Number of cells unpacked or written at once
+_CHUNK = 1 << 20
+
+
+def write_checkpoint(f, width, height, rule, topology="bounded", generation=0, engine=0,
+                     mask=None, cells=None, layout=None, bands=None, population=None):
+    """
+    Writes the cells of a board as a checkpoint.
+
+    Parameters
+    ----------
+    f: file open for writing in binary mode
+    width, height: size of the board
+    rule: rule of the game, such as B3/S23
+    topology: one of TOPOLOGIES
+    generation: generation of the board
+    engine: optimized mode of ConwayGOLGrid the board came from
+    mask: bool array indexed as [x, y] holding the board, or
+    cells: (xs, ys) integer arrays of the living cells, which may be signed
+        on an unbounded board, or
+    bands: iterable of the board in bands of consecutive columns, each a
+        columns x (height + 7) // 8 uint8 array packed along y like
+        numpy.packbits packs a mask, with population its number of living
+        cells.  Boards stored packed are written without being unpacked.
+    layout: dense or sparse.  The smaller of the two when not given.
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    ValueError if layout is not one of LAYOUTS or topology not one of TOPOLOGIES
+    """
+    import numpy as np
+
+    if layout is not None and layout not in LAYOUTS:
+        raise ValueError("%r is not a checkpoint layout" % (layout,))
+    if topology not in TOPOLOGIES:
+        raise ValueError("%r is not a topology" % (topology,))
+
+    if mask is not None:
+        x0 = y0 = 0
+        columns, rows = mask.shape
+        population = int(np.count_nonzero(mask))
+    elif bands is not None:
+        x0 = y0 = 0
+        columns, rows = width, height
+    else:
+        xs, ys = np.asarray(cells[0], dtype=np.int64), np.asarray(cells[1], dtype=np.int64)
+        population = len(xs)
+        if population:
+            x0, y0 = int(xs.min()), int(ys.min())
+            columns, rows = int(xs.max()) - x0 + 1, int(ys.max()) - y0 + 1
+        else:
+            x0 = y0 = columns = rows = 0
+
+    # Bytes of each layout
+    stride = (rows + 7) // 8
+    if layout is None:
+        layout = "dense" if columns * stride <= 8 * population else "sparse"
+
+    f.write(_HEADER.pack(_MAGIC, _VERSION, LAYOUTS.index(layout), TOPOLOGIES.index(topology),
+                         engine, width, height, x0, y0, columns, rows, generation,
+                         population, rule.encode("ascii")))
+
+    # Columns packed or searched at once
+    step = max(1, _CHUNK // max(rows, 1))
+    if bands is not None:
+        x = 0
+        for band in bands:
+            if layout == "dense":
+                f.write(band.tobytes())
+            else:
+                cx, cy = np.nonzero(np.unpackbits(band, axis=1)[:, :rows])
+                _write_pairs(f, cx + x, cy)
+            x += len(band)
+    elif layout == "dense":
+        if mask is None:
+            mask = np.zeros((columns, rows), dtype=np.bool_)
+            mask[xs - x0, ys - y0] = True
+        for x in range(0, columns, step):
+            f.write(np.packbits(mask[x:x + step], axis=1).tobytes())
+    elif mask is not None:
+        for x in range(0, columns, step):
+            cx, cy = np.nonzero(mask[x:x + step])
+            _write_pairs(f, cx + x, cy)
+    else:
+        for i in range(0, population, _CHUNK):
+            _write_pairs(f, xs[i:i + _CHUNK] - x0, ys[i:i + _CHUNK] - y0)
+
+
+def _write_pairs(f, xs, ys):
+    """
+    Writes coordinates relative to the corner of the region as uint32 pairs.
+    """
+    import numpy as np
+
+    pairs = np.empty((len(xs), 2), dtype="<u4")
+    pairs[:, 0] = xs
+    pairs[:, 1] = ys
+    f.write(pairs.tobytes())
+
+
+class GoLCheckpoint(object):
+    """
+    Represents a checkpoint file mapped into memory.  Call close() when done,
+    or use it in a with statement.
+    """
+
+    def __init__(self, path):
+        """
+        Maps a checkpoint file and reads its header.
+
+        Parameters
+        ----------
+        path: path of the file
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ValueError if the file is not a checkpoint or is cut short
+        """
+        with open(path, "rb") as f:
+            self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.__map) < _HEADER.size:
+            self.close()
+            raise ValueError("%s is not a Game of Life checkpoint" % (path,))
+        (magic, version, layout, topology, self.engine, self.width, self.height,
+         self.x0, self.y0, self.columns, self.rows, self.generation, self.population,
+         rule) = _HEADER.unpack_from(self.__map)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise ValueError("%s is not a Game of Life checkpoint" % (path,))
+
+        self.layout = LAYOUTS[layout]
+        self.topology = TOPOLOGIES[topology]
+        self.rule = rule.rstrip(b"\0").decode("ascii")
+
+        if self.layout == "dense":
+            size = self.columns * ((self.rows + 7) // 8)
+        else:
+            size = 8 * self.population
+        if len(self.__map) < _HEADER.size + size:
+            self.close()
+            raise ValueError("%s is cut short" % (path,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Unmaps the file.
+        """
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+
+    def __packed(self):
+        """
+        Returns the bits of a dense checkpoint as a columns x bytes array
+        viewing the mapped file.
+        """
+        import numpy as np
+
+        stride = (self.rows + 7) // 8
+        return np.frombuffer(self.__map, dtype=np.uint8, count=self.columns * stride,
+                             offset=_HEADER.size).reshape(self.columns, stride)
+
+    def __pairs(self):
+        """
+        Returns the table of a sparse checkpoint as a population x 2 array
+        viewing the mapped file.
+        """
+        import numpy as np
+
+        return np.frombuffer(self.__map, dtype="<u4", count=2 * self.population,
+                             offset=_HEADER.size).reshape(self.population, 2)
+
+    def chunks(self):
+        """
+        Yields the living cells a chunk at a time as (xs, ys) int64 arrays.
+        """
+        import numpy as np
+
+        if self.layout == "dense":
+            packed = self.__packed()
+            step = max(1, _CHUNK // max(self.rows, 1))
+            for x in range(0, self.columns, step):
+                cells = np.unpackbits(packed[x:x + step], axis=1)[:, :self.rows]
+                xs, ys = np.nonzero(cells)
+                yield xs + (self.x0 + x), ys + self.y0
+        else:
+            pairs = self.__pairs()
+            for i in range(0, self.population, _CHUNK):
+                chunk = pairs[i:i + _CHUNK].astype(np.int64)
+                yield chunk[:, 0] + self.x0, chunk[:, 1] + self.y0
+
+    def cells(self):
+        """
+        Yields the (x, y) coordinates of every living cell one at a time.
+        """
+        for xs, ys in self.chunks():
+            for x, y in zip(xs.tolist(), ys.tolist()):
+                yield x, y
+
+    def draw(self, out, x0=0, y0=0):
+        """
+        Draws the living cells into a board.  Cells past the edges of out are
+        dropped.
+
+        Parameters
+        ----------
+        out: bool or uint8 array indexed as [x, y]; it is cleared first
+        x0, y0: position in out of the board's (0, 0), so a band of rows
+            x to x + n - 1 is drawn with x0 = -x
+
+        Returns
+        -------
+        out
+        """
+        import numpy as np
+
+        out[...] = 0
+        width, height = out.shape
+
+        if self.layout == "dense":
+            # The part of the region inside out, unpacked a few columns at a time
+            rx, ry = self.x0 + x0, self.y0 + y0
+            x1, y1 = min(rx + self.columns, width), min(ry + self.rows, height)
+            xs, ys = max(rx, 0), max(ry, 0)
+            if xs >= x1 or ys >= y1:
+                return out
+            packed = self.__packed()
+            step = max(1, _CHUNK // max(self.rows, 1))
+            for x in range(xs, x1, step):
+                end = min(x + step, x1)
+                cells = np.unpackbits(packed[x - rx:end - rx], axis=1)
+                out[x:end, ys:y1] = cells[:, ys - ry:y1 - ry]
+            return out
+
+        for xs, ys in self.chunks():
+            xs, ys = xs + x0, ys + y0
+            inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+            out[xs[inside], ys[inside]] = 1
+
+        return out
+
+    def mask(self):
+        """
+        Returns the board as a width x height bool array indexed as [x, y].
+        On an unbounded board this is the window at the origin.
+        """
+        import numpy as np
+
+        return self.draw(np.zeros((self.width, self.height), dtype=np.bool_))
@@ -0,0 +1,126 @@
+# Cycle detection for the Game of Life.
+# A board is identified by its Zobrist hash: every cell has a fixed 64 bit
+# key, and the hash of a board is the XOR of the keys of its living cells.
+# Bringing a cell to life or killing it XORs its key in or out, so engines
+# can keep the hash up to date from the cells that changed.  A board whose
+# hash was seen p generations ago is (barring a 2^-64 collision) in a cycle
+# of period p; p = 1 is a still life, and an empty board has hash 0.
+
+from collections import deque
+
+_MASK32 = 0xFFFFFFFF
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+def cell_key(x, y):
+    """
+    Returns the Zobrist key of a cell, the SplitMix64 hash of its coordinates.
+
+    Parameters
+    ----------
+    x, y: coordinates of the cell, which may be negative on unbounded boards
+
+    Returns
+    -------
+    64 bit integer key
+    """
+    z = ((((x & _MASK32) << 32) | (y & _MASK32)) + 0x9E3779B97F4A7C15) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+def cells_hash(cells):
+    """
+    Returns the Zobrist hash of an iterable of living (x, y) cells.
+    """
+    h = 0
+    for x, y in cells:
+        h ^= cell_key(x, y)
+
+    return h
+
+
+def coords_hash(xs, ys):
+    """
+    Returns the Zobrist hash of the living cells at NumPy arrays of
+    coordinates, computing their keys all at once.
+    """
+    import numpy as np
+
+    if len(xs) == 0:
+        return 0
+
+    # cell_key on whole arrays; uint64 arithmetic wraps like the masks above
+    u = np.uint64
+    z = ((np.asarray(xs).astype(u) & u(_MASK32)) << u(32)) | \
+        (np.asarray(ys).astype(u) & u(_MASK32))
+    z += u(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> u(30))) * u(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> u(27))) * u(0x94D049BB133111EB)
+    z ^= z >> u(31)
+
+    return int(np.bitwise_xor.reduce(z))
+
+
+def array_hash(board):
+    """
+    Returns the Zobrist hash of a NumPy board indexed as [x, y].  Only the
+    keys of the living cells are computed, so the XOR of two boards hashes to
+    the change between them.
+    """
+    import numpy as np
+
+    return coords_hash(*np.nonzero(board))
+
+
+class GoLCycleDetector(object):
+    """
+    Remembers the hashes of the last few boards to find repeated boards.
+    """
+
+    def __init__(self, history=64):
+        """
+        Initializes an empty history.
+
+        Parameters
+        ----------
+        history: number of boards remembered, which is the longest period
+            that can be found
+
+        Returns
+        -------
+        None
+        """
+        self.history = history
+        # Generation each remembered hash was last seen in, oldest first
+        self.__seen = {}
+        self.__order = deque()
+
+    def check(self, state_hash, generation):
+        """
+        Records the hash of a board and looks for it among the last boards.
+
+        Parameters
+        ----------
+        state_hash: Zobrist hash of the board
+        generation: generation of the board
+
+        Returns
+        -------
+        Period of the cycle the board is in, or None if the board is new
+        """
+        period = None
+        if state_hash in self.__seen:
+            period = generation - self.__seen[state_hash]
+
+        self.__seen[state_hash] = generation
+        self.__order.append((state_hash, generation))
+
+        # Forget the oldest board, unless its hash has been seen again since
+        if len(self.__order) > self.history:
+            old_hash, old_generation = self.__order.popleft()
+            if self.__seen.get(old_hash) == old_generation:
+                del self.__seen[old_hash]
+
+        return period
@@ -0,0 +1,681 @@
+# Hashlife for the Game of Life, after Bill Gosper's algorithm.
+# The universe is a quadtree whose nodes are canonicalized (hash-consed) so
+# that identical regions of the board are stored once, and the future of
+# every node is memoized so a region that has been seen before is never
+# computed again.  The board has no fixed size: the root grows as needed.
+# Every node also carries a hash of its cells by position, the sum of
+# X^x Y^y over its living cells (x, y) from its top left corner, modulo a
+# prime.  A node's hash is made from the hashes of its quadrants, shifted by
+# their offsets, when the node is created, so the hash of the board costs
+# nothing to keep up to date.
+
+# Modulus and bases of the node hashes
+_MODULUS = (1 << 61) - 1
+_X_BASE = 0x2545F4914F6CDD1D % _MODULUS
+_Y_BASE = 0x9E3779B97F4A7C15 % _MODULUS
+
+# Bits of the nw quadrant of a block key (see block_keys) of every level
+_QUADRANT_MASKS = [0] + [sum(((1 << (1 << (level - 1))) - 1) << (8 * dx)
+                             for dx in range(1 << (level - 1))) for level in range(1, 4)]
+
+
+def merge_blocks(bx, by, bits):
+    """
+    Merges the bits of entries for the same 8 x 8 block.
+
+    Parameters
+    ----------
+    bx, by, bits: NumPy arrays of block coordinates and uint64 cell bits (see
+        block_keys), with any number of entries per block
+
+    Returns
+    -------
+    (bx, by, keys) arrays with one entry per block, sorted by block
+    """
+    import numpy as np
+
+    order = np.lexsort((by, bx))
+    bx, by, bits = bx[order], by[order], bits[order]
+    first = np.ones(len(bx), dtype=np.bool_)
+    first[1:] = (bx[1:] != bx[:-1]) | (by[1:] != by[:-1])
+    starts = np.flatnonzero(first)
+
+    return bx[starts], by[starts], np.bitwise_or.reduceat(bits, starts)
+
+
+def block_keys(xs, ys):
+    """
+    Packs cells into one 64 bit key per 8 x 8 block.
+
+    Parameters
+    ----------
+    xs, ys: int64 NumPy arrays of signed coordinates
+
+    Returns
+    -------
+    (bx, by, keys) arrays with one entry per block holding a living cell.
+    Block (bx, by) holds the cells (8 bx + dx, 8 by + dy) for dx and dy
+    from 0 to 7, cell (dx, dy) being bit 8 dx + dy of its key.
+    """
+    import numpy as np
+
+    bits = np.left_shift(np.uint64(1), ((xs & 7) * 8 + (ys & 7)).astype(np.uint64))
+    return merge_blocks(xs >> 3, ys >> 3, bits)
+
+
+class GoLHashNode(object):
+    """
+    Represents a square block of 2^level x 2^level cells.  Nodes are immutable
+    and must be created through GoLHashlife.join so that they stay canonical.
+    """
+    __slots__ = ('nw', 'ne', 'sw', 'se', 'level', 'population', 'hash')
+
+    def __init__(self, nw, ne, sw, se, level, population, hash):
+        """
+        Initializes a node from its four quadrants.
+
+        Parameters
+        ----------
+        nw, ne, sw, se: quadrants of the node (None for the single cell leaves)
+        level: log2 of the width of the node
+        population: number of living cells in the node
+        hash: positional hash of the living cells in the node
+
+        Returns
+        -------
+        None
+        """
+        self.nw, self.ne, self.sw, self.se = nw, ne, sw, se
+        self.level = level
+        self.population = population
+        self.hash = hash
+
+
+class GoLHashlife():
+    """
+    Represents an unbounded Game of Life universe stepped with Hashlife.
+    Coordinates are signed integers; x grows to the east and y to the south.
+    The root node is always centered on the origin.
+    """
+
+    def __init__(self, rule, max_nodes=None):
+        """
+        Initializes an empty universe.
+
+        Parameters
+        ----------
+        rule: compiled rule table (see GoLrules.compile_rule)
+        max_nodes: when the canonical node table grows past this size after a
+            step, unreachable nodes and memoized results are dropped.
+            None keeps everything.
+
+        Returns
+        -------
+        None
+        """
+        # Rule table indexed by (state * 9 + neighbors)
+        self.__rule = rule
+
+        self.max_nodes = max_nodes
+        self.generation = 0
+
+        self.__off = GoLHashNode(None, None, None, None, 0, 0, 0)
+        self.__on = GoLHashNode(None, None, None, None, 0, 1, 1)
+        self.__nodes = {}
+        self.__results = {}
+        self.__empty = [self.__off]
+        # X^half, Y^half and X^half Y^half of the nodes of every level, by
+        # which the hashes of the ne, sw and se quadrants are shifted
+        self.__shifts = [None, (_X_BASE, _Y_BASE, _X_BASE * _Y_BASE % _MODULUS)]
+
+        self.root = self.empty(3)
+
+    def join(self, nw, ne, sw, se):
+        """
+        Returns the canonical node made of the four given quadrants.
+
+        Parameters
+        ----------
+        nw, ne, sw, se: canonical nodes of the same level
+
+        Returns
+        -------
+        Canonical node one level above its quadrants
+        """
+        key = (nw, ne, sw, se)
+        node = self.__nodes.get(key)
+        if node is None:
+            level = nw.level + 1
+            shifts = self.__shifts
+            while len(shifts) <= level:
+                x, y, xy = shifts[-1]
+                shifts.append((x * x % _MODULUS, y * y % _MODULUS, xy * xy % _MODULUS))
+            x, y, xy = shifts[level]
+            node = GoLHashNode(nw, ne, sw, se, level,
+                               nw.population + ne.population +
+                               sw.population + se.population,
+                               (nw.hash + x * ne.hash + y * sw.hash + xy * se.hash) % _MODULUS)
+            self.__nodes[key] = node
+        return node
+
+    def empty(self, level):
+        """
+        Returns the canonical empty node of the given level.
+        """
+        while len(self.__empty) <= level:
+            e = self.__empty[-1]
+            self.__empty.append(self.join(e, e, e, e))
+        return self.__empty[level]
+
+    def center(self, node):
+        """
+        Returns the node one level down that is centered on the given node.
+        """
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def expand(self):
+        """
+        Doubles the width of the universe, keeping the root centered on the origin.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        root = self.root
+        e = self.empty(root.level - 1)
+        self.root = self.join(self.join(e, e, e, root.nw),
+                              self.join(e, e, root.ne, e),
+                              self.join(e, root.sw, e, e),
+                              self.join(root.se, e, e, e))
+
+    def __contains_point(self, x, y):
+        half = 1 << (self.root.level - 1)
+        return -half <= x < half and -half <= y < half
+
+    def __set(self, node, x, y):
+        """
+        Returns a copy of node with the cell at (x, y) alive.
+        x and y are relative to the top left corner of the node.
+        """
+        if node.level == 0:
+            return self.__on
+
+        half = 1 << (node.level - 1)
+        if y < half:
+            if x < half:
+                return self.join(self.__set(node.nw, x, y), node.ne, node.sw, node.se)
+            return self.join(node.nw, self.__set(node.ne, x - half, y), node.sw, node.se)
+        if x < half:
+            return self.join(node.nw, node.ne, self.__set(node.sw, x, y - half), node.se)
+        return self.join(node.nw, node.ne, node.sw, self.__set(node.se, x - half, y - half))
+
+    def spawn(self, x, y):
+        """
+        Brings the cell at (x, y) to life.
+
+        Parameters
+        ----------
+        x, y: signed coordinates of the cell
+
+        Returns
+        -------
+        None
+        """
+        while not self.__contains_point(x, y):
+            self.expand()
+
+        half = 1 << (self.root.level - 1)
+        self.root = self.__set(self.root, x + half, y + half)
+
+    def __build(self, level, points):
+        """
+        Builds a node of the given level from a list of points relative to
+        its top left corner.
+        """
+        if not points:
+            return self.empty(level)
+        if level == 0:
+            return self.__on
+
+        half = 1 << (level - 1)
+        nw, ne, sw, se = [], [], [], []
+        for x, y in points:
+            if y < half:
+                if x < half:
+                    nw.append((x, y))
+                else:
+                    ne.append((x - half, y))
+            elif x < half:
+                sw.append((x, y - half))
+            else:
+                se.append((x - half, y - half))
+
+        return self.join(self.__build(level - 1, nw), self.__build(level - 1, ne),
+                         self.__build(level - 1, sw), self.__build(level - 1, se))
+
+    def add_cells(self, points):
+        """
+        Brings every cell in points to life.
+
+        Parameters
+        ----------
+        points: iterable of (x, y) signed coordinates
+
+        Returns
+        -------
+        None
+        """
+        points = list(points)
+        if not points:
+            return
+
+        for x, y in points:
+            while not self.__contains_point(x, y):
+                self.expand()
+
+        half = 1 << (self.root.level - 1)
+        added = self.__build(self.root.level, [(x + half, y + half) for x, y in points])
+        self.root = self.__union(self.root, added)
+
+    def add_arrays(self, chunks):
+        """
+        Brings cells to life from arrays of coordinates.  Each chunk is packed
+        into 8 x 8 blocks as it comes, and the nodes are built from the blocks,
+        so no list of cells is ever made.
+
+        Parameters
+        ----------
+        chunks: iterable of (xs, ys) integer NumPy arrays of signed coordinates
+
+        Returns
+        -------
+        None
+        """
+        import numpy as np
+        from GoLquadtree import spread_bits
+
+        parts = [block_keys(np.asarray(xs, dtype=np.int64), np.asarray(ys, dtype=np.int64))
+                 for xs, ys in chunks if len(xs)]
+        if not parts:
+            return
+        bx, by, keys = merge_blocks(*[np.concatenate(part) for part in zip(*parts)])
+        del parts
+
+        # Grow the root over every block.  From level 4 on the corner of the
+        # root lies on a block boundary.
+        x0, y0 = 8 * int(bx.min()), 8 * int(by.min())
+        x1, y1 = 8 * int(bx.max()) + 7, 8 * int(by.max()) + 7
+        while (self.root.level < 4 or not self.__contains_point(x0, y0) or
+               not self.__contains_point(x1, y1)):
+            self.expand()
+
+        # Morton codes of the blocks from the corner of the root, which keep
+        # the blocks of every node together once sorted
+        offset = 1 << (self.root.level - 4)
+        codes = (spread_bits((bx + offset).astype(np.uint64)) << np.uint64(1)) | \
+            spread_bits((by + offset).astype(np.uint64))
+        order = np.argsort(codes)
+
+        added = self.__build_blocks(codes[order], keys[order], 0, self.root.level, {})
+        self.root = self.__union(self.root, added)
+
+    def __block(self, key, level, leaves):
+        """
+        Returns the node of level 0 to 3 whose cell (dx, dy) is bit 8 dx + dy
+        of key.  leaves holds the nodes of the keys seen so far.
+        """
+        if not key:
+            return self.empty(level)
+        if level == 0:
+            return self.__on
+
+        node = leaves.get((level, key))
+        if node is None:
+            # Quadrants are shifted onto the nw one, keeping rows 8 bits apart
+            half = 1 << (level - 1)
+            quadrant = _QUADRANT_MASKS[level]
+            node = self.join(self.__block(key & quadrant, level - 1, leaves),
+                             self.__block((key >> (8 * half)) & quadrant, level - 1, leaves),
+                             self.__block((key >> half) & quadrant, level - 1, leaves),
+                             self.__block((key >> (9 * half)) & quadrant, level - 1, leaves))
+            leaves[(level, key)] = node
+
+        return node
+
+    def __build_blocks(self, codes, keys, start, level, leaves):
+        """
+        Builds a node of the given level from the sorted Morton codes and keys
+        of its blocks (see add_arrays).  start is the code of the node's first
+        block, and leaves the nodes of the keys seen so far.
+        """
+        import numpy as np
+
+        if len(codes) == 0:
+            return self.empty(level)
+        if level == 3:
+            return self.__block(int(keys[0]), 3, leaves)
+
+        # Codes of the quadrants follow each other, the x bit before the y bit:
+        # nw, sw, ne, se
+        quarter = 1 << (2 * (level - 4))
+        cuts = np.searchsorted(codes, np.array([start + quarter, start + 2 * quarter,
+                                                start + 3 * quarter], dtype=np.uint64))
+        bounds = [0] + cuts.tolist() + [len(codes)]
+        nw, sw, ne, se = [self.__build_blocks(codes[bounds[d]:bounds[d + 1]],
+                                              keys[bounds[d]:bounds[d + 1]],
+                                              start + d * quarter, level - 1, leaves)
+                          for d in range(4)]
+
+        return self.join(nw, ne, sw, se)
+
+    def __union(self, a, b):
+        """
+        Returns the node whose living cells are those of a or b.
+        """
+        if a.population == 0:
+            return b
+        if b.population == 0:
+            return a
+        if a.level == 0:
+            return self.__on
+        return self.join(self.__union(a.nw, b.nw), self.__union(a.ne, b.ne),
+                         self.__union(a.sw, b.sw), self.__union(a.se, b.se))
+
+    def __life_4x4(self, node):
+        """
+        Returns the center 2x2 node of a 4x4 node advanced by one generation.
+        """
+        # Unpack the 16 cells into rows of the 4x4 block
+        bits = [[0] * 4 for y in range(4)]
+        for qy, qx, quad in ((0, 0, node.nw), (0, 2, node.ne), (2, 0, node.sw), (2, 2, node.se)):
+            bits[qy][qx] = quad.nw.population
+            bits[qy][qx + 1] = quad.ne.population
+            bits[qy + 1][qx] = quad.sw.population
+            bits[qy + 1][qx + 1] = quad.se.population
+
+        new = []
+        for y in (1, 2):
+            for x in (1, 2):
+                neighbors = (bits[y - 1][x - 1] + bits[y - 1][x] + bits[y - 1][x + 1] +
+                             bits[y][x - 1] + bits[y][x + 1] +
+                             bits[y + 1][x - 1] + bits[y + 1][x] + bits[y + 1][x + 1])
+                if self.__rule[bits[y][x] * 9 + neighbors]:
+                    new.append(self.__on)
+                else:
+                    new.append(self.__off)
+
+        return self.join(new[0], new[1], new[2], new[3])
+
+    def successor(self, node, j):
+        """
+        Returns the center of node advanced by 2^j generations.
+
+        Parameters
+        ----------
+        node: canonical node of level 2 or more
+        j: log2 of the number of generations, clipped to node.level - 2
+
+        Returns
+        -------
+        Canonical node one level below node
+        """
+        j = min(j, node.level - 2)
+
+        if node.population == 0:
+            return node.nw
+
+        key = (node, j)
+        result = self.__results.get(key)
+        if result is not None:
+            return result
+
+        if node.level == 2:
+            result = self.__life_4x4(node)
+        else:
+            join = self.join
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+
+            # The nine overlapping subnodes one level down
+            n00 = nw
+            n01 = join(nw.ne, ne.nw, nw.se, ne.sw)
+            n02 = ne
+            n10 = join(nw.sw, nw.se, sw.nw, sw.ne)
+            n11 = join(nw.se, ne.sw, sw.ne, se.nw)
+            n12 = join(ne.sw, ne.se, se.nw, se.ne)
+            n20 = sw
+            n21 = join(sw.ne, se.nw, sw.se, se.sw)
+            n22 = se
+
+            if j == node.level - 2:
+                # Full speed: both halves of the step are taken recursively
+                step = self.successor
+                c00, c01, c02 = step(n00, j), step(n01, j), step(n02, j)
+                c10, c11, c12 = step(n10, j), step(n11, j), step(n12, j)
+                c20, c21, c22 = step(n20, j), step(n21, j), step(n22, j)
+            else:
+                # Smaller step: only the second half advances the board
+                center = self.center
+                c00, c01, c02 = center(n00), center(n01), center(n02)
+                c10, c11, c12 = center(n10), center(n11), center(n12)
+                c20, c21, c22 = center(n20), center(n21), center(n22)
+
+            result = join(self.successor(join(c00, c01, c10, c11), j),
+                          self.successor(join(c01, c02, c11, c12), j),
+                          self.successor(join(c10, c11, c20, c21), j),
+                          self.successor(join(c11, c12, c21, c22), j))
+
+        self.__results[key] = result
+        return result
+
+    def step(self, k=0):
+        """
+        Advances the universe by 2^k generations.
+
+        Parameters
+        ----------
+        k: log2 of the number of generations to advance
+
+        Returns
+        -------
+        True if there are remaining alive cells.
+        False otherwise.
+        """
+        # Grow the root until the pattern sits in its middle quarter and the
+        # root is large enough that nothing can escape its middle half in 2^k
+        # generations.
+        while (self.root.level < k + 3 or
+               self.center(self.center(self.root)).population != self.root.population):
+            self.expand()
+
+        self.root = self.successor(self.root, k)
+        self.generation += 1 << k
+
+        if self.max_nodes is not None and len(self.__nodes) > self.max_nodes:
+            self.collect()
+
+        return self.root.population > 0
+
+    def advance(self, generations):
+        """
+        Advances the universe by any number of generations, taking the
+        largest power of two steps first.
+
+        Parameters
+        ----------
+        generations: number of generations to advance
+
+        Returns
+        -------
+        True if there are remaining alive cells.
+        False otherwise.
+        """
+        k = 0
+        while generations >> k:
+            k += 1
+
+        while k > 0:
+            k -= 1
+            if generations & (1 << k):
+                self.step(k)
+
+        return self.root.population > 0
+
+    def collect(self):
+        """
+        Drops memoized results and every canonical node not reachable from the root.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        self.__nodes = {}
+        self.__results = {}
+        self.__empty = [self.__off]
+
+        seen = set()
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.level == 0 or node in seen:
+                continue
+            seen.add(node)
+            self.__nodes[(node.nw, node.ne, node.sw, node.se)] = node
+            stack.extend((node.nw, node.ne, node.sw, node.se))
+
+    def population(self):
+        """
+        Returns the number of living cells.
+        """
+        return self.root.population
+
+    def state_hash(self):
+        """
+        Returns the positional hash of the board, the sum of X^x Y^y over its
+        living cells (x, y) modulo a 61 bit prime.  The root's hash counts
+        from its top left corner, (-half, -half), so it is shifted back to the
+        origin; the result does not depend on the size of the root.
+        """
+        x, y, xy = self.__shifts[self.root.level]
+        return self.root.hash * pow(xy, _MODULUS - 2, _MODULUS) % _MODULUS
+
+    def node_count(self):
+        """
+        Returns the number of canonical nodes, to weigh against max_nodes.
+        """
+        return len(self.__nodes)
+
+    def bounding_box(self):
+        """
+        Returns the smallest rectangle holding every living cell.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        (x0, y0, x1, y1) inclusive corners, or None when nothing is alive
+        """
+        if self.root.population == 0:
+            return None
+
+        half = 1 << (self.root.level - 1)
+        box = None
+        stack = [(self.root, -half, -half)]
+        while stack:
+            node, x, y = stack.pop()
+            if node.population == 0:
+                continue
+            size = 1 << node.level
+            # Nodes inside the box found so far cannot grow it
+            if (box is not None and x >= box[0] and y >= box[1] and
+                    x + size - 1 <= box[2] and y + size - 1 <= box[3]):
+                continue
+            if node.level == 0:
+                if box is None:
+                    box = (x, y, x, y)
+                else:
+                    box = (min(box[0], x), min(box[1], y), max(box[2], x), max(box[3], y))
+                continue
+            size >>= 1
+            stack.append((node.nw, x, y))
+            stack.append((node.ne, x + size, y))
+            stack.append((node.sw, x, y + size))
+            stack.append((node.se, x + size, y + size))
+
+        return box
+
+    def living(self):
+        """
+        Returns a list of (x, y) coordinates of every living cell.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        List of signed (x, y) tuples
+        """
+        half = 1 << (self.root.level - 1)
+        cells = []
+        stack = [(self.root, -half, -half)]
+        while stack:
+            node, x, y = stack.pop()
+            if node.population == 0:
+                continue
+            if node.level == 0:
+                cells.append((x, y))
+                continue
+            size = 1 << (node.level - 1)
+            stack.append((node.nw, x, y))
+            stack.append((node.ne, x + size, y))
+            stack.append((node.sw, x, y + size))
+            stack.append((node.se, x + size, y + size))
+
+        return cells
+
+    def get_living(self, x0, y0, width, height):
+        """
+        Returns a 2D list with False representing dead cells and True
+        representing alive cells for a window of the universe.
+
+        Parameters
+        ----------
+        x0, y0: top left corner of the window
+        width, height: size of the window
+
+        Returns
+        -------
+        2D list of booleans indexed as [x][y]
+        """
+        cells = [[False for y in range(height)] for x in range(width)]
+        x1, y1 = x0 + width, y0 + height
+
+        half = 1 << (self.root.level - 1)
+        stack = [(self.root, -half, -half)]
+        while stack:
+            node, x, y = stack.pop()
+            size = 1 << node.level
+            # Skip empty nodes and nodes outside the window
+            if (node.population == 0 or x >= x1 or y >= y1 or
+                    x + size <= x0 or y + size <= y0):
+                continue
+            if node.level == 0:
+                cells[x - x0][y - y0] = True
+                continue
+            size >>= 1
+            stack.append((node.nw, x, y))
+            stack.append((node.ne, x + size, y))
+            stack.append((node.sw, x, y + size))
+            stack.append((node.se, x + size, y + size))
+
+        return cells
@@ -0,0 +1,482 @@
+# Pattern files for the Game of Life.
+# Reads the run length encoded (.rle), Life 1.06 (.lif, .life) and plaintext
+# (.cells) formats one line at a time.  Living cells come out as horizontal
+# runs (x, y, length), so a pattern goes straight into a NumPy mask without
+# a list of coordinates ever being built.  x is the column and y the row of
+# the file, and (0, 0) is its top left corner (Life 1.06 files give their own
+# signed coordinates).
+
+import re
+
+# <count><tag> items of the RLE body; the count defaults to 1
+_RLE_ITEM = re.compile(r'(\d*)([^\d\s])')
+# x = 3, y = 3, rule = B3/S23
+_RLE_HEADER = re.compile(r'^x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)(?:\s*,\s*rule\s*=\s*(\S+))?')
+# Runs of living cells on a plaintext row
+_CELLS_ALIVE = re.compile(r'[O*]+')
+
+FORMATS = ("rle", "life106", "cells")
+
+# Number of runs GoLPattern.mask draws at once
+_BATCH = 1 << 16
+# Number of cells of a mask mask_chunks looks at at once
+_CHUNK = 1 << 20
+
+
+def mask_chunks(mask):
+    """
+    Yields the coordinates of the living cells of a mask a band of columns
+    at a time.
+
+    Parameters
+    ----------
+    mask: NumPy bool array indexed as [x, y]
+
+    Returns
+    -------
+    Generator of (xs, ys) int64 arrays
+    """
+    import numpy as np
+
+    step = max(1, _CHUNK // max(mask.shape[1], 1))
+    for x in range(0, mask.shape[0], step):
+        xs, ys = np.nonzero(mask[x:x + step])
+        yield xs.astype(np.int64) + x, ys.astype(np.int64)
+
+
+def chunk_cells(chunks):
+    """
+    Yields the (x, y) coordinates of chunks of arrays (see mask_chunks) one
+    at a time.
+
+    Parameters
+    ----------
+    chunks: iterable of (xs, ys) NumPy arrays
+
+    Returns
+    -------
+    Generator of (x, y) tuples
+    """
+    for xs, ys in chunks:
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            yield x, y
+
+
+def mask_cells(mask):
+    """
+    Yields the (x, y) coordinates of the living cells of a mask one at a time.
+
+    Parameters
+    ----------
+    mask: NumPy bool array indexed as [x, y]
+
+    Returns
+    -------
+    Generator of (x, y) tuples
+    """
+    return chunk_cells(mask_chunks(mask))
+
+
+class GoLPattern(object):
+    """
+    Represents a pattern file.  The file is read again on every pass, so a
+    pattern of any size costs only the memory of the mask it is loaded into.
+    """
+
+    def __init__(self, source, format=None):
+        """
+        Reads the header of a pattern file.
+
+        Parameters
+        ----------
+        source: path of the file, or an open file (which has to allow seek)
+        format: rle, life106 or cells.  Guessed from the file extension or
+            the first line when not given.
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ValueError if format is not one of FORMATS
+        """
+        self.source = source
+        # Size given in an RLE header, and rule given in the file, if any
+        self.width = self.height = None
+        self.rule = None
+
+        if format is None:
+            format = self.__guess_format()
+        if format not in FORMATS:
+            raise ValueError("%r is not a pattern format" % (format,))
+        self.format = format
+
+        if format == "rle":
+            for line in self.__lines():
+                if line.startswith("#r "):
+                    self.rule = line[3:].strip()
+                    continue
+                match = _RLE_HEADER.match(line)
+                if match:
+                    self.width, self.height = int(match.group(1)), int(match.group(2))
+                    self.rule = match.group(3) or self.rule
+                if not line.startswith("#"):
+                    break
+
+    def __lines(self):
+        """
+        Yields the stripped lines of the file.
+        """
+        if hasattr(self.source, "read"):
+            self.source.seek(0)
+            for line in self.source:
+                yield line.strip()
+        else:
+            with open(self.source) as f:
+                for line in f:
+                    yield line.strip()
+
+    def __guess_format(self):
+        """
+        Returns the format of the file from its extension or first line.
+        """
+        name = getattr(self.source, "name", self.source)
+        if isinstance(name, str):
+            extension = name.rsplit(".", 1)[-1].lower()
+            if extension == "rle":
+                return "rle"
+            if extension in ("lif", "life"):
+                return "life106"
+            if extension == "cells":
+                return "cells"
+
+        for line in self.__lines():
+            if not line:
+                continue
+            if line.upper().startswith("#LIFE 1.06"):
+                return "life106"
+            if line.startswith("!"):
+                return "cells"
+            return "rle"
+
+        return "rle"
+
+    def runs(self):
+        """
+        Yields the living cells of the pattern as horizontal runs.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        Generator of (x, y, length) tuples, each standing for the cells
+        (x, y) to (x + length - 1, y)
+        """
+        if self.format == "rle":
+            return self.__rle_runs()
+        elif self.format == "life106":
+            return self.__life106_runs()
+        else:
+            return self.__cells_runs()
+
+    def __rle_runs(self):
+        """
+        Yields the runs of an RLE file, skipping its header.
+        """
+        x = y = 0
+        # Digits at the end of a line belong to the item on the next line
+        pending = ""
+        header = False
+
+        for line in self.__lines():
+            if line.startswith("#"):
+                continue
+            if not header:
+                # The x = .., y = .. line comes before the cells
+                header = True
+                if _RLE_HEADER.match(line):
+                    continue
+
+            text = pending + line
+            end = 0
+            for match in _RLE_ITEM.finditer(text):
+                count = int(match.group(1) or 1)
+                tag = match.group(2)
+                end = match.end()
+                if tag == "!":
+                    return
+                elif tag == "$":
+                    x = 0
+                    y += count
+                elif tag in "b.":
+                    x += count
+                else:
+                    # o, or any state of a multi-state pattern, is alive
+                    yield x, y, count
+                    x += count
+            pending = text[end:]
+
+    def __life106_runs(self):
+        """
+        Yields every cell of a Life 1.06 file as a run of 1.
+        """
+        for line in self.__lines():
+            if not line or line.startswith("#"):
+                continue
+            x, y = line.split()[:2]
+            yield int(x), int(y), 1
+
+    def __cells_runs(self):
+        """
+        Yields the runs of O (or *) characters of a plaintext file.
+        """
+        y = 0
+        for line in self.__lines():
+            if line.startswith("!"):
+                continue
+            for match in _CELLS_ALIVE.finditer(line):
+                yield match.start(), y, match.end() - match.start()
+            y += 1
+
+    def cells(self):
+        """
+        Yields the (x, y) coordinates of every living cell one at a time.
+        """
+        for x, y, length in self.runs():
+            for n in range(length):
+                yield x + n, y
+
+    def bounding_box(self):
+        """
+        Returns the smallest rectangle holding every living cell, found by one
+        pass over the file.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        (x0, y0, x1, y1) inclusive corners, or None for an empty pattern
+        """
+        box = None
+        for x, y, length in self.runs():
+            if box is None:
+                x0, y0, x1, y1 = x, y, x + length - 1, y
+                box = True
+                continue
+            if x < x0:
+                x0 = x
+            if x + length - 1 > x1:
+                x1 = x + length - 1
+            if y < y0:
+                y0 = y
+            elif y > y1:
+                y1 = y
+
+        return (x0, y0, x1, y1) if box else None
+
+    def center(self, width, height):
+        """
+        Returns where to put the pattern to center it on a board.
+
+        Parameters
+        ----------
+        width, height: size of the board
+
+        Returns
+        -------
+        (x0, y0) position on the board of the pattern's (0, 0)
+        """
+        # The size in an RLE header saves a pass over the file
+        if self.width is not None:
+            box = (0, 0, self.width - 1, self.height - 1)
+        else:
+            box = self.bounding_box()
+        if box is None:
+            return 0, 0
+
+        return ((width - (box[2] - box[0] + 1)) // 2 - box[0],
+                (height - (box[3] - box[1] + 1)) // 2 - box[1])
+
+    def chunks(self, x0=0, y0=0):
+        """
+        Yields the coordinates of the living cells a batch of runs at a time,
+        without clipping them to any board.
+
+        Parameters
+        ----------
+        x0, y0: offset added to every cell
+
+        Returns
+        -------
+        Generator of (xs, ys) int64 arrays
+        """
+        xs, ys, lengths = [], [], []
+        for x, y, length in self.runs():
+            xs.append(x)
+            ys.append(y)
+            lengths.append(length)
+            if len(xs) == _BATCH:
+                yield _run_cells(xs, ys, lengths, x0, y0)
+                xs, ys, lengths = [], [], []
+        if xs:
+            yield _run_cells(xs, ys, lengths, x0, y0)
+
+    def mask(self, width, height, x0=0, y0=0, out=None):
+        """
+        Draws the pattern into a NumPy mask.  Cells that fall outside of the
+        mask are dropped.
+
+        Parameters
+        ----------
+        width, height: size of the mask
+        x0, y0: position in the mask of the pattern's (0, 0)
+        out: optional width x height bool array to draw into; it is cleared first
+
+        Returns
+        -------
+        width x height bool array indexed as [x, y]
+        """
+        import numpy as np
+
+        if out is None:
+            out = np.zeros((width, height), dtype=np.bool_)
+        else:
+            out[...] = False
+
+        # Runs are drawn a batch at a time, so memory stays bounded by the batch
+        for cx, cy in self.chunks(x0, y0):
+            inside = (cx >= 0) & (cx < width) & (cy >= 0) & (cy < height)
+            out[cx[inside], cy[inside]] = True
+
+        return out
+
+
+def _run_cells(xs, ys, lengths, x0, y0):
+    """
+    Returns the coordinates of every cell of a batch of runs as int64 arrays.
+    """
+    import numpy as np
+
+    lengths = np.array(lengths, dtype=np.int64)
+    # Cell n of the batch lies offsets[n] cells into its run
+    ends = np.cumsum(lengths)
+    offsets = np.arange(ends[-1], dtype=np.int64) - np.repeat(ends - lengths, lengths)
+    cx = np.repeat(np.array(xs, dtype=np.int64) + x0, lengths) + offsets
+    cy = np.repeat(np.array(ys, dtype=np.int64) + y0, lengths)
+
+    return cx, cy
+
+
+def write_pattern(f, mask, format="rle", rule=None):
+    """
+    Writes the living cells of a mask as a pattern file.
+
+    Parameters
+    ----------
+    f: file open for writing
+    mask: NumPy bool array indexed as [x, y]; its (0, 0) becomes the top left
+        corner of the pattern
+    format: rle, life106 or cells
+    rule: rule written in the RLE header, if any
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    ValueError if format is not one of FORMATS
+    """
+    import numpy as np
+
+    if format not in FORMATS:
+        raise ValueError("%r is not a pattern format" % (format,))
+
+    width, height = mask.shape
+    if format == "life106":
+        f.write("#Life 1.06\n")
+        # Row by row, like the other formats
+        for y in range(height):
+            for x in np.flatnonzero(mask[:, y]):
+                f.write("%d %d\n" % (x, y))
+        return
+
+    if format == "cells":
+        # The comment line also tells the format apart from RLE
+        f.write("!Rule: %s\n" % (rule,) if rule else "!\n")
+        for y in range(height):
+            f.write("".join("O" if alive else "." for alive in mask[:, y]).rstrip(".") + "\n")
+        return
+
+    header = "x = %d, y = %d" % (width, height)
+    if rule:
+        header += ", rule = %s" % (rule,)
+    f.write(header + "\n")
+
+    # Items are joined into lines of at most 70 characters
+    line = ""
+    # Row of the last cells written, whose end is the number of $ to the next
+    last = None
+    for y in range(height):
+        row = mask[:, y]
+        # Starts and ends of the runs of living cells
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], row.view(np.uint8), [0]))))
+        if len(edges) == 0:
+            continue
+
+        items = []
+        if last is not None:
+            items.append(_rle_item(y - last, "$"))
+        elif y > 0:
+            items.append(_rle_item(y, "$"))
+        last = y
+        x = 0
+        for start, end in zip(edges[::2], edges[1::2]):
+            if start > x:
+                items.append(_rle_item(start - x, "b"))
+            items.append(_rle_item(end - start, "o"))
+            x = end
+
+        for item in items:
+            if len(line) + len(item) > 70:
+                f.write(line + "\n")
+                line = ""
+            line += item
+
+    # The closing ! has to fit on the line too
+    if len(line) + 1 > 70:
+        f.write(line + "\n")
+        line = ""
+    f.write(line + "!\n")
+
+
+def _rle_item(count, tag):
+    """
+    Returns one <count><tag> item of an RLE body.
+    """
+    return tag if count == 1 else "%d%s" % (count, tag)
+
+
+def load_pattern(source, width, height, format=None):
+    """
+    Reads a pattern file into a mask with the pattern centered on it.
+
+    Parameters
+    ----------
+    source: path of the file, or an open file
+    width, height: size of the mask
+    format: see GoLPattern
+
+    Returns
+    -------
+    (mask, rule) where rule is the rule given in the file or None
+    """
+    pattern = GoLPattern(source, format)
+    x0, y0 = pattern.center(width, height)
+
+    return pattern.mask(width, height, x0, y0), pattern.rule
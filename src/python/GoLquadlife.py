@@ -0,0 +1,344 @@
+# Quadtree native stepping for the Game of Life.
+# The board stays in a GoLQuadTree, but a generation is computed a block at a
+# time instead of cell by cell.  Every node of the tree that is block x block
+# cells wide keeps the living cells below it as the bits of one integer, its
+# mask.  The next state of a block only depends on the block and its eight
+# neighbors, so a block is recomputed only when one of those changed last
+# generation.  The blocks are found by walking down the tree, where a missing
+# quadrant is an empty block, and only the cells that actually changed are
+# inserted into or deleted from the tree.  The masks stand in for the tree's
+# set of leaves, which is not kept.
+
+from GoLquadtree import GoLNode, QUADRANT
+
+
+def rule_windows(rule):
+    """
+    Expands a rule table into the next state of every 3 x 3 neighborhood.
+
+    Parameters
+    ----------
+    rule: compiled rule table (see GoLrules.compile_rule)
+
+    Returns
+    -------
+    bytearray of 512 entries indexed by the neighborhood, where bit
+    (3 * (dx + 1) + (dy + 1)) is the cell at offset (dx, dy)
+    """
+    windows = bytearray(512)
+    for window in range(512):
+        windows[window] = rule[((window >> 4) & 1) * 9 + bin(window & ~16).count('1')]
+
+    return windows
+
+
+class GoLQuadLife():
+    """
+    Steps the cells of a GoLQuadTree by blocks.  Cell (x, y) of the block at
+    (bx, by) is bit ((x - bx * block) * block + (y - by * block)) of the mask
+    of the block's node.
+    """
+
+    def __init__(self, tree, rule, topology="bounded", block=8):
+        """
+        Initializes the block masks from the cells already in the tree.  The
+        tree's set of leaves is emptied; use cells() instead.
+
+        Parameters
+        ----------
+        tree: GoLQuadTree holding the board; its root must be a square with a
+            power of 2 width (see ConwayGOLGrid)
+        rule: compiled rule table (see GoLrules.compile_rule)
+        topology: bounded, torus or klein (see ConwayGOLGrid)
+        block: width of a block, a power of 2.  Capped at the board width.
+
+        Returns
+        -------
+        None
+        """
+        self.tree = tree
+        self.topology = topology
+        x0, y0, x1, y1 = tree.rootnode.rect
+        self.x0, self.y0 = x0, y0
+        self.width = x1 - x0 + 1
+        self.block = min(block, self.width)
+        self.blocks = self.width // self.block
+
+        self.__windows = rule_windows(rule)
+
+        self.reset()
+
+    def reset(self):
+        """
+        Rebuilds the block masks from the tree.  Call after cells were added to
+        or removed from the tree other than by step.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        block = self.block
+        # Every block with living cells has to be looked at on the first step
+        self.__changed = set()
+        for node in self.block_nodes(self.tree.rootnode):
+            x0, y0 = node.rect[0], node.rect[1]
+            node.mask = self.__node_mask(node, x0, y0)
+            self.__changed.add(((x0 - self.x0) // block, (y0 - self.y0) // block))
+
+        self.tree.leaves.clear()
+
+    def block_nodes(self, node):
+        """
+        Yields the nodes a block wide that hold living cells below node,
+        without descending into empty quadrants.
+        """
+        if node is None or node.count == 0:
+            return
+        if node.rect[2] - node.rect[0] + 1 <= self.block:
+            yield node
+            return
+        for child in node.children:
+            for found in self.block_nodes(child):
+                yield found
+
+    def block_node(self, bx, by):
+        """
+        Walks down the tree to the node of a block.
+
+        Parameters
+        ----------
+        bx, by: block coordinates
+
+        Returns
+        -------
+        GoLNode a block wide, or None when the block has no node (no living
+        cells)
+        """
+        block = self.block
+        x, y = bx * block, by * block
+        node = self.tree.rootnode
+        half = self.width >> 1
+        while half >= block:
+            node = node.children[QUADRANT[(bool(x & half) << 1) | bool(y & half)]]
+            if node is None:
+                return None
+            half >>= 1
+
+        return node
+
+    def cells(self):
+        """
+        Yields the (x, y) coordinates of every living cell, block by block.
+        """
+        block = self.block
+        for node in self.block_nodes(self.tree.rootnode):
+            x0, y0 = node.rect[0], node.rect[1]
+            mask = node.mask
+            while mask:
+                bit = mask & -mask
+                i = bit.bit_length() - 1
+                yield x0 + i // block, y0 + i % block
+                mask ^= bit
+
+    def __mask(self, key, nodes):
+        """
+        Returns the mask of a block, looking its node up in the tree the first
+        time it is asked for this generation.
+        """
+        if key not in nodes:
+            nodes[key] = self.block_node(*key)
+        node = nodes[key]
+
+        return node.mask if node is not None else 0
+
+    def __node_mask(self, node, x0, y0):
+        """
+        Returns the mask of the leaves below node, in a block with its corner
+        at (x0, y0).
+        """
+        if node.type == GoLNode.LEAF:
+            return 1 << ((node.rect[0] - x0) * self.block + node.rect[1] - y0)
+
+        mask = 0
+        for child in node.children:
+            if child is not None and child.count:
+                mask |= self.__node_mask(child, x0, y0)
+
+        return mask
+
+    def __mirror(self, mask):
+        """
+        Returns a block mask mirrored in x.
+        """
+        block = self.block
+        row = (1 << block) - 1
+        mirrored = 0
+        for dx in range(block):
+            mirrored |= ((mask >> (dx * block)) & row) << ((block - 1 - dx) * block)
+
+        return mirrored
+
+    def neighbor(self, bx, by, ox, oy):
+        """
+        Finds the block at offset (ox, oy) from block (bx, by).
+
+        Parameters
+        ----------
+        bx, by: block coordinates
+        ox, oy: offset between -1 and 1
+
+        Returns
+        -------
+        (bx, by, mirrored) of the neighbor where mirrored is True if the
+        neighbor is seen mirrored in x (across the y edge of a Klein bottle),
+        or None past the edge of a bounded board
+        """
+        blocks = self.blocks
+        bx, by = bx + ox, by + oy
+        mirrored = False
+
+        if by < 0 or by >= blocks:
+            if self.topology == "bounded":
+                return None
+            if self.topology == "klein":
+                bx = blocks - 1 - bx
+                mirrored = True
+            by %= blocks
+        if bx < 0 or bx >= blocks:
+            if self.topology == "bounded":
+                return None
+            bx %= blocks
+
+        return bx, by, mirrored
+
+    def __padded(self, bx, by, nodes):
+        """
+        Returns the mask of a block with a one cell border taken from its
+        neighbors.  Rows of the padded mask are block + 2 bits apart.
+        """
+        block = self.block
+        stride = block + 2
+        row = (1 << block) - 1
+        padded = 0
+
+        for ox in (-1, 0, 1):
+            for oy in (-1, 0, 1):
+                found = self.neighbor(bx, by, ox, oy)
+                if found is None:
+                    continue
+                nx, ny, mirrored = found
+                mask = self.__mask((nx, ny), nodes)
+                if not mask:
+                    continue
+                if mirrored:
+                    mask = self.__mirror(mask)
+
+                # Rows (x) and columns (y) of the neighbor that touch this block
+                if ox == 0:
+                    rows = range(block)
+                else:
+                    rows = [block - 1] if ox < 0 else [0]
+                for dx in rows:
+                    bits = (mask >> (dx * block)) & row
+                    if not bits:
+                        continue
+                    px = dx + 1 + ox * block
+                    if oy == 0:
+                        padded |= bits << (px * stride + 1)
+                    elif oy < 0:
+                        padded |= ((bits >> (block - 1)) & 1) << (px * stride)
+                    else:
+                        padded |= (bits & 1) << (px * stride + block + 1)
+
+        return padded
+
+    def __next_mask(self, bx, by, nodes):
+        """
+        Returns the mask of a block in the next generation.
+        """
+        block = self.block
+        stride = block + 2
+        padded = self.__padded(bx, by, nodes)
+        if not padded:
+            return 0
+
+        windows = self.__windows
+        three_rows = (1 << (3 * stride)) - 1
+        mask = 0
+
+        for dx in range(block):
+            rows = (padded >> (dx * stride)) & three_rows
+            if not rows:
+                continue
+            for dy in range(block):
+                window = ((rows >> dy) & 7) | (((rows >> (stride + dy)) & 7) << 3) | \
+                         (((rows >> (2 * stride + dy)) & 7) << 6)
+                if windows[window]:
+                    mask |= 1 << (dx * block + dy)
+
+        return mask
+
+    def step(self):
+        """
+        Advances the board by one generation.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        True if there are remaining alive cells.
+        False otherwise.
+        """
+        # Only blocks next to a block that changed can change
+        active = set()
+        for bx, by in self.__changed:
+            for ox in (-1, 0, 1):
+                for oy in (-1, 0, 1):
+                    found = self.neighbor(bx, by, ox, oy)
+                    if found is not None:
+                        active.add(found[:2])
+
+        # Nodes of the blocks looked at this generation.  Every new mask is
+        # worked out before the tree is touched.
+        nodes = {}
+        updates = []
+        for key in active:
+            mask = self.__next_mask(key[0], key[1], nodes)
+            old = self.__mask(key, nodes)
+            if mask != old:
+                updates.append((key, old, mask))
+
+        tree, root = self.tree, self.tree.rootnode
+        block = self.block
+        self.__changed = set()
+
+        for key, old, mask in updates:
+            bx, by = key
+            x0, y0 = self.x0 + bx * block, self.y0 + by * block
+
+            # Only the cells that changed touch the tree.  Births go first, so
+            # a block that stays alive is never emptied and pruned on the way.
+            for diff, edit in ((mask & ~old, tree.insert), (old & ~mask, tree.delete)):
+                while diff:
+                    bit = diff & -diff
+                    i = bit.bit_length() - 1
+                    edit(root, (x0 + i // block, y0 + i % block))
+                    diff ^= bit
+
+            node = nodes[key]
+            if node is None:
+                # Made by the births
+                node = self.block_node(bx, by)
+            node.mask = mask
+            self.__changed.add(key)
+
+        # Cut off the branches emptied this generation, if the policy says so
+        tree.end_generation()
+
+        return root.count > 0
@@ -3,14 +3,50 @@
 # Instead of using inheritance, I just modified what I needed.
 # I had to override every function to make it match my needs.
 
-import matplotlib.pyplot as plt
-
-class GoLNode():
+import heapq
+from GoLcycles import cell_key
+
+# Child index for a point, looked up by (x bit << 1) | (y bit) of the point's
+# offset in its node.  Matches the order subdivide creates children in.
+QUADRANT = (0, 1, 3, 2)
+
+def spread_bits(v):
+	"""
+	Spreads the low 32 bits of v out to the even bits of the result.
+	Works on ints and on NumPy uint64 arrays alike.
+	"""
+	v = v & 0xFFFFFFFF
+	v = (v | (v << 16)) & 0x0000FFFF0000FFFF
+	v = (v | (v << 8)) & 0x00FF00FF00FF00FF
+	v = (v | (v << 4)) & 0x0F0F0F0F0F0F0F0F
+	v = (v | (v << 2)) & 0x3333333333333333
+	v = (v | (v << 1)) & 0x5555555555555555
+	return v
+
+def morton(x, y):
+	"""
+	Returns the Morton (Z-order) key of a point.  The x bit of every level
+	comes before the y bit, so sorted keys visit the children of a node in
+	the order of QUADRANT.
+
+	Parameters
+	----------
+	x, y: non negative coordinates below 2^32
+
+	Returns
+	-------
+	Integer key
+	"""
+	return (spread_bits(x) << 1) | spread_bits(y)
+
+class GoLNode(object):
 	ROOT = 0
 	BRANCH = 1
 	LEAF = 2
 	EMPTY = 3
 
+	__slots__ = ('parent', 'children', 'count', 'rect', 'depth', 'type', 'mask')
+
 	def __init__(self, parent, rect):
 		"""
 		Initializes an instance of a Quadtree Node
@@ -22,6 +58,10 @@ class GoLNode():
 		"""
 		self.parent = parent
 		self.children = [None, None, None, None]
+		# Number of leaves (living cells) below this node
+		self.count = 0
+		# Living cells below a block wide node, kept by GoLquadlife
+		self.mask = 0
 
 		self.rect = rect
 		x0, y0, x1, y1 = rect
@@ -87,11 +127,11 @@ class GoLNode():
 
 		Returns
 		-------
-		None
+		Number of nodes created
 		"""
 		
 		if self.type == GoLNode.LEAF:
-			return
+			return 0
 		
 		x,y = point
 
@@ -104,12 +144,16 @@ class GoLNode():
 		rects.append((x0 + h + 1, y0, x1, y0 + h))
 		#print rects
 
+		created = 0
 		for n in range(len(rects)):
 			if self.spans_feature(rects[n], point):
 				#if x == x0 and x == x1 and y == y0 and y == y1:
 				#print "Creating child for ", point, "at depth ", self.depth, " and child ", n, rects[n]
 				self.children[n] = self.getinstance(rects[n])
-				self.children[n].subdivide(point)
+				self.children[n].count = 1
+				created += 1 + self.children[n].subdivide(point)
+
+		return created
 
 	def contains(self, x, y):
 		"""
@@ -150,26 +194,55 @@ class GoLNode():
 		
 
 class GoLQuadTree():
-	maxdepth = 1
-	leaves = set()
-	allnodes = []
-	
-	def __init__(self, rootnode, minrect):
+	# Pruning policies: when branches left without leaves are cut off
+	PRUNE_POLICIES = ("eager", "batch", "threshold", "never")
+
+	def __init__(self, rootnode, minrect, prune="eager", threshold=0.5):
 		"""
-		Initializes the Quad tree
+		Initializes the Quad tree.  All of the bookkeeping (leaves, allnodes
+		and maxdepth) belongs to the instance, so several trees can be used
+		side by side in one process.
 
 		Parameters
 		----------
-		Rootnode is the root of the tree, needs to be (2^n)-1 and square
+		Rootnode is the root of the tree, needs to be (2^n)-1 and square,
+			anything else raises a ValueError
 		Minrect is leftover from Malcom's Implementation
+		Prune is the pruning policy:
+			eager: empty branches are cut off by every delete
+			batch: empty branches are cut off once per end_generation call
+			threshold: like batch, but only once empty nodes make up more
+				than threshold of all nodes
+			never: empty branches are kept and reused by later inserts
+		Threshold is the empty node ratio used by the threshold policy
 		
 		Returns
 		-------
 		None
 		"""
-		GoLNode.minsize = minrect
-		GoLQuadTree.leaves.clear()
-		GoLQuadTree.allnodes = []
+		# insert and delete walk the tree by the bits of a cell's offset
+		x0, y0, x1, y1 = rootnode.rect
+		width = x1 - x0 + 1
+		if width != y1 - y0 + 1 or width < 1 or width & (width - 1):
+			raise ValueError("%r is not a square with a power of 2 width" % (rootnode.rect,))
+
+		if prune not in GoLQuadTree.PRUNE_POLICIES:
+			print prune, " is not a valid pruning policy. Using eager."
+			prune = "eager"
+
+		self.rootnode = rootnode
+		self.minsize = minrect
+		self.prune_policy = prune
+		self.prune_threshold = threshold
+		self.maxdepth = 1
+		self.leaves = set()
+		self.allnodes = []
+
+		# Kept up to date by insert, delete and prune
+		self.nodecount = 1
+		self.emptycount = 0
+		# Zobrist hash of the points in the tree (see GoLcycles)
+		self.hash = 0
 
 	def traverse(self, node):
 		"""
@@ -189,17 +262,17 @@ class GoLQuadTree():
 		# If beginning of recursion (root node), then clear out all data
 		# structures and reset depth.
 		if node.depth == 0:
-			GoLQuadTree.allnodes = []
-			GoLQuadTree.leaves = set()
-			GoLQuadTree.maxdepth = 1
+			self.allnodes = []
+			self.leaves = set()
+			self.maxdepth = 1
 
 		# Add the current node to all nodes
-		GoLQuadTree.allnodes.append(node)
+		self.allnodes.append(node)
 		# And save leaves into leaves
                 if node.type == GoLNode.LEAF:
-                        GoLQuadTree.leaves.add(node.return_point())
-                        if node.depth > GoLQuadTree.maxdepth:
-                                GoLQuadTree.maxdepth = node.depth
+                        self.leaves.add(node.return_point())
+                        if node.depth > self.maxdepth:
+                                self.maxdepth = node.depth
 
 		# Recurse on non-empty children
                 for child in node.children:
@@ -217,28 +290,83 @@ class GoLQuadTree():
 
 		Returns
 		-------
+		Number of leaves below node
+		"""
+		if node.type == GoLNode.LEAF:
+			return 1
+
+		for n in range(len(node.children)):
+			child = node.children[n]
+			if child == None or child.type == GoLNode.LEAF:
+				continue
+			if child.count == 0:
+				# Every node of an empty branch is empty
+				removed = self.size(child)
+				node.children[n] = None
+				self.nodecount -= removed
+				self.emptycount -= removed
+			else:
+				self.prune(child)
+
+		return node.count
+
+	def size(self, node):
+		"""
+		Returns the number of nodes in the subtree starting at node.
+		"""
+		total = 0
+		stack = [node]
+		while stack:
+			current = stack.pop()
+			total += 1
+			for child in current.children:
+				if child != None:
+					stack.append(child)
+
+		return total
+
+	def end_generation(self):
+		"""
+		Applies the batch and threshold pruning policies.  Call once after
+		all of the inserts and deletes of a generation.
+
+		Parameters
+		----------
 		None
+
+		Returns
+		-------
+		True if the tree was pruned, else false
 		"""
-                if node.type == GoLNode.LEAF:
-                        return 1
-                leafcount = 0
-                removals = []
-                for child in node.children:
-                        if child != None:
-                                leafcount += self.prune(child)
-                                if leafcount == 0:
-                                        removals.append(child)
-                for item in removals:
-                        n = node.children.index(item)
-                        node.children[n] = None
-                return leafcount
-	
+		if (self.prune_policy == "batch" or
+			(self.prune_policy == "threshold" and
+			 self.emptycount > self.prune_threshold * self.nodecount)):
+			self.prune(self.rootnode)
+			return True
+
+		return False
+
+	def node_counts(self):
+		"""
+		Reports the size of the tree, to weigh memory against pruning time.
+
+		Parameters
+		----------
+		None
+
+		Returns
+		-------
+		Dictionary with the number of nodes, of empty nodes (nodes other
+		than the root with no leaves below them) and of leaves
+		"""
+		return {"nodes": self.nodecount, "empty": self.emptycount,
+			"leaves": self.rootnode.count}
 
 	def insert(self, root, point):
 		"""
 		Use this to add a point to the Quad Tree
-		The function finds the first None child then calls subdivide from that node
-		This is also a recursive function (root becomes the child)
+		The function walks down from root, picking each child from the bits
+		of the point's coordinates, and creates the missing part of the path.
 
 		Parameters
 		----------
@@ -247,31 +375,80 @@ class GoLQuadTree():
 
 		Returns
 		-------
-		None	
-		"""
-
-		# Recursively traverse the tree until the correct non-empty node is
-		# found that contains the bounding rectangle of our point to insert
-		# We could call subdivide on the root, but this method is a little
-		# more efficient.
-		found = False
-		for child in root.children:
-			if child != None and child.contains(point[0], point[1]):
-				found = True
-				self.insert(child, point)
-				
-		
-		if not found:
-			#print "Subdividing to add point ", point
-			root.subdivide(point)
+		True if the point was added, false if it was already in the tree
+		or lies outside of root
+		"""
+		x, y = point
+		x0, y0, x1, y1 = root.rect
+		if x < x0 or x > x1 or y < y0 or y > y1:
+			return False
+		dx, dy = x - x0, y - y0
+
+		# Walk down existing nodes.  Reaching the bottom means the point is
+		# already a leaf.
+		node = root
+		half = (x1 - x0 + 1) >> 1
+		while half:
+			child = node.children[QUADRANT[(bool(dx & half) << 1) | bool(dy & half)]]
+			if child == None:
+				break
+			node = child
+			half >>= 1
+		else:
+			return False
 
-		
+		# Create the rest of the path down to the new leaf
+		attach = node
+		while half:
+			bx, by = bool(dx & half), bool(dy & half)
+			nx0, ny0 = node.rect[0] + bx * half, node.rect[1] + by * half
+			child = GoLNode(node, (nx0, ny0, nx0 + half - 1, ny0 + half - 1))
+			child.count = 1
+			node.children[QUADRANT[(bx << 1) | by]] = child
+			self.nodecount += 1
+			node = child
+			half >>= 1
+
+		self.hash ^= cell_key(x, y)
+
+		# Count the new leaf in every existing node above it
+		node = attach
+		while True:
+			# An empty branch left behind by a delete is in use again
+			if node.count == 0 and node.type != GoLNode.ROOT:
+				self.emptycount -= 1
+			node.count += 1
+			if node is root:
+				break
+			node = node.parent
+
+		return True
+
+	def __find(self, root, point):
+		"""
+		Returns the leaf of point below root, or None if it is not in the tree.
+		"""
+		x, y = point
+		x0, y0, x1, y1 = root.rect
+		if x < x0 or x > x1 or y < y0 or y > y1:
+			return None
+		dx, dy = x - x0, y - y0
+
+		node = root
+		half = (x1 - x0 + 1) >> 1
+		while half:
+			node = node.children[QUADRANT[(bool(dx & half) << 1) | bool(dy & half)]]
+			if node == None:
+				return None
+			half >>= 1
+
+		return node
 
 	def delete(self, root, point):
 		"""
 		Use this to delete a point from the QuadTree.
-		This function clears a child and then prunes if the point was
-		found and deleted.
+		This function clears a leaf and, with the eager pruning policy,
+		cuts off the branches that were left empty.
 
 		Parameters
 		----------
@@ -282,33 +459,37 @@ class GoLQuadTree():
 		-------
 		True if item found and deleted, else false
 		"""
-		
-		found = False
-
-		# Need to check each child
-		for child in range(len(root.children)):
-			# Only search if not found.  
-			if not found and root.children[child] != None and root.children[child].contains(point[0], point[1]):
-				if root.children[child].type == GoLNode.LEAF:
-					found = True
-					#print "Deleting ", point
-					root.children[child] = None
+		leaf = self.__find(root, point)
+		if leaf == None or leaf is root:
+			return False
+
+		# A node on the path is the child of its parent picked by the bits
+		# of the point's offset at the node's size, as in insert
+		x, y = point
+		dx, dy = x - root.rect[0], y - root.rect[1]
+		half = 1
+		node = leaf.parent
+		node.children[QUADRANT[(bool(dx & half) << 1) | bool(dy & half)]] = None
+		self.nodecount -= 1
+		self.hash ^= cell_key(*point)
+
+		# Uncount the leaf in every node above it.  Eager pruning only has to
+		# look at this path, as every other branch was pruned before.
+		while True:
+			node.count -= 1
+			parent = node.parent
+			half <<= 1
+			if node.count == 0 and node.type != GoLNode.ROOT:
+				if self.prune_policy == "eager" and node is not root:
+					parent.children[QUADRANT[(bool(dx & half) << 1) | bool(dy & half)]] = None
+					self.nodecount -= 1
 				else:
-					found = self.delete(root.children[child], point)
-		
+					self.emptycount += 1
+			if node is root:
+				break
+			node = parent
 
-		# Prune each parent to remove excess nodes.
-		# We need to do this for each parent to save the most space.
-		# This can be modified to save less space but run quicker by pruning
-		# only the root node as shown below in comments.
-		# We only try and delete when we actually have deleted something (found)
-		if found and root != None and root.parent != None:
-			self.prune(root.parent)
-
-		#if root.type == GoLNode.ROOT:
-		#	self.prune(root)
-			
-		return found
+		return True
 
 	def is_element(self, root, point):
 		"""
@@ -323,16 +504,275 @@ class GoLQuadTree():
 		-------
 		True if found, false if not.
 		"""
+		leaf = self.__find(root, point)
+		return leaf != None and leaf.type == GoLNode.LEAF
 
-		for child in root.children:
-			if child != None and child.contains(point[0], point[1]):
-				if child.type == GoLNode.LEAF:
-					return True
-				return self.is_element(child, point)
+	def query(self, root, rect):
+		"""
+		Finds the points of the tree inside a rectangle.  Branches outside
+		of the rectangle or without leaves are never visited.
 
-		return False
+		Parameters
+		----------
+		root is the node to search below
+		rect is the (x0, y0, x1, y1) inclusive rectangle
+
+		Returns
+		-------
+		List of (x, y) points
+		"""
+		qx0, qy0, qx1, qy1 = rect
+		points = []
+		stack = [root]
+		while stack:
+			node = stack.pop()
+			x0, y0, x1, y1 = node.rect
+			if node.count == 0 or x0 > qx1 or x1 < qx0 or y0 > qy1 or y1 < qy0:
+				continue
+			if node.type == GoLNode.LEAF:
+				points.append((x0, y0))
+				continue
+			for child in node.children:
+				if child != None:
+					stack.append(child)
+
+		return points
+
+	def population(self, root, rect=None):
+		"""
+		Counts the points of the tree inside a rectangle.  Nodes that lie
+		completely inside of the rectangle answer with their leaf count.
+
+		Parameters
+		----------
+		root is the node to count below
+		rect is the (x0, y0, x1, y1) inclusive rectangle, None for all of root
+
+		Returns
+		-------
+		Number of points
+		"""
+		if rect == None:
+			return root.count
+
+		qx0, qy0, qx1, qy1 = rect
+		total = 0
+		stack = [root]
+		while stack:
+			node = stack.pop()
+			x0, y0, x1, y1 = node.rect
+			if node.count == 0 or x0 > qx1 or x1 < qx0 or y0 > qy1 or y1 < qy0:
+				continue
+			if qx0 <= x0 and x1 <= qx1 and qy0 <= y0 and y1 <= qy1:
+				total += node.count
+				continue
+			for child in node.children:
+				if child != None:
+					stack.append(child)
+
+		return total
+
+	def bounding_box(self, root):
+		"""
+		Finds the smallest rectangle holding every point below root.  Each
+		side is found by a best first descent towards that side, which
+		only opens the nodes that could hold a point further out.
+
+		Parameters
+		----------
+		root is the node to search below
+
+		Returns
+		-------
+		(x0, y0, x1, y1) inclusive corners, or None when there are no points
+		"""
+		if root.count == 0:
+			return None
+
+		return (self.__extreme(root, 0, 1), self.__extreme(root, 1, 1),
+			self.__extreme(root, 2, -1), self.__extreme(root, 3, -1))
+
+	def __extreme(self, root, side, sign):
+		"""
+		Returns the smallest (sign 1) or largest (sign -1) rect[side] of the
+		leaves below root.
+		"""
+		heap = [(sign * root.rect[side], 0, root)]
+		order = 1
+		while heap:
+			key, n, node = heapq.heappop(heap)
+			if node.type == GoLNode.LEAF:
+				return node.rect[side]
+			for child in node.children:
+				if child != None and child.count:
+					heapq.heappush(heap, (sign * child.rect[side], order, child))
+					order += 1
+
+		return None
+
+	def nearest(self, root, point, limit=None):
+		"""
+		Finds the point of the tree closest to a given point (Euclidean
+		distance).  Nodes are searched best first, by their distance to the
+		point, so only the nodes closer than the answer are opened.
+
+		Parameters
+		----------
+		root is the node to search below
+		point is the (x, y) point to search from
+		limit is the largest distance to search, None for no limit
+
+		Returns
+		-------
+		(x, y) of the closest point, or None if there is none within limit.
+		Ties go to the point found first.
+		"""
+		x, y = point
+		heap = [(0, 0, root)]
+		order = 1
+		while heap:
+			distance, n, node = heapq.heappop(heap)
+			if limit != None and distance > limit * limit:
+				return None
+			if node.type == GoLNode.LEAF:
+				return (node.rect[0], node.rect[1])
+			for child in node.children:
+				if child == None or child.count == 0:
+					continue
+				x0, y0, x1, y1 = child.rect
+				# Squared distance from the point to the rectangle of child
+				dx = max(x0 - x, 0, x - x1)
+				dy = max(y0 - y, 0, y - y1)
+				# order keeps the heap from comparing nodes on equal distances
+				heapq.heappush(heap, (dx * dx + dy * dy, order, child))
+				order += 1
+
+		return None
+
+	def bulk_load(self, root, points):
+		"""
+		Adds many points to an empty tree at once.  The points are sorted in
+		Morton order and the tree is built in one pass (see bulk_load_keys).
+		If root already has leaves, the points are inserted one at a time.
+
+		Parameters
+		----------
+		root is the root node
+		points is an iterable of (x, y) points; points outside of root are skipped
+
+		Returns
+		-------
+		Number of points added
+		"""
+		if root.count:
+			return sum(1 for point in points if self.insert(root, point))
+
+		x0, y0, x1, y1 = root.rect
+		keys = [morton(x - x0, y - y0) for x, y in points
+			if x0 <= x <= x1 and y0 <= y <= y1]
+		keys.sort()
+
+		return self.bulk_load_keys(root, keys)
+
+	def bulk_load_mask(self, root, mask):
+		"""
+		Adds the living cells of a boolean NumPy mask to an empty tree.
+
+		Parameters
+		----------
+		root is the root node
+		mask is an array indexed as [x, y] from the corner of root
+
+		Returns
+		-------
+		Number of points added
+		"""
+		import numpy as np
+
+		x0, y0, x1, y1 = root.rect
+		xs, ys = np.nonzero(mask[:x1 - x0 + 1, :y1 - y0 + 1])
+		if root.count:
+			return sum(1 for x, y in zip(xs.tolist(), ys.tolist())
+				if self.insert(root, (x + x0, y + y0)))
+
+		keys = (spread_bits(xs.astype(np.uint64)) << np.uint64(1)) | spread_bits(ys.astype(np.uint64))
+		keys.sort()
+
+		return self.bulk_load_keys(root, keys.tolist())
+
+	def bulk_load_keys(self, root, keys):
+		"""
+		Builds the tree below an empty root from sorted Morton keys (see morton)
+		taken relative to the corner of root.  Consecutive keys share the
+		path of their common prefix, so every node is created once, and the
+		leaf count of a node is added to its parent when the node is done.
+
+		Parameters
+		----------
+		root is the root node, with no leaves
+		keys is an iterable of sorted keys; duplicates are skipped
+
+		Returns
+		-------
+		Number of points added
+
+		Raises
+		------
+		ValueError if the keys are not sorted
+		"""
+		x0, y0, x1, y1 = root.rect
+		levels = (x1 - x0 + 1).bit_length() - 1
+		# Width of the children and shift of the key digit at every level
+		halves = [(x1 - x0 + 1) >> (l + 1) for l in range(levels)]
+		shifts = [2 * (levels - 1 - l) for l in range(levels)]
+
+		# path[l] is the node at level l on the path to the last leaf
+		path = [root] * (levels + 1)
+		leaves = self.leaves
+		previous = None
+		added = 0
+		for key in keys:
+			if key == previous:
+				continue
+			if previous is None:
+				level = 0
+			elif key < previous:
+				raise ValueError("Morton keys are not sorted")
+			else:
+				# First level where the paths of the two keys part
+				level = levels - 1 - ((key ^ previous).bit_length() - 1) // 2
+
+				# Finish the nodes of the last path below that level
+				for l in range(levels, level, -1):
+					path[l - 1].count += path[l].count
+
+			# Create the rest of the path down to the leaf
+			node = path[level]
+			for l in range(level, levels):
+				half = halves[l]
+				digit = (key >> shifts[l]) & 3
+				rect = node.rect
+				nx0, ny0 = rect[0] + (digit >> 1) * half, rect[1] + (digit & 1) * half
+				child = GoLNode(node, (nx0, ny0, nx0 + half - 1, ny0 + half - 1))
+				node.children[QUADRANT[digit]] = child
+				path[l + 1] = node = child
+			self.nodecount += levels - level
+
+			node.count = 1
+			leaves.add((node.rect[0], node.rect[1]))
+			self.hash ^= cell_key(node.rect[0], node.rect[1])
+			previous = key
+			added += 1
+
+		if added:
+			for l in range(levels, 0, -1):
+				path[l - 1].count += path[l].count
+
+		if added:
+			self.maxdepth = max(self.maxdepth, root.depth + levels)
+
+		return added
 
-	
 	def show_tree(self, root):
 		"""
 		This function attempts to show the status of the quadtree graphically
@@ -353,6 +793,9 @@ class GoLQuadTree():
 
 		x0, y0, x1, y1 = root.rect
 
+		# Imported here so the tree can be used without a display
+		import matplotlib.pyplot as plt
+
 		# Set initial figure and set axes to dimensions of root
 		#plt.figure()
 
@@ -376,6 +819,8 @@ class GoLQuadTree():
 		-------
 		None
 		"""
+		import matplotlib.pyplot as plt
+
 		x0, y0, x1, y1 = parent.rect
 		lines = []
 
@@ -420,7 +865,7 @@ class GoLQuadTree():
 
 if __name__ == '__main__':
 
-	baserect = [0, 0, 16, 16]
+	baserect = [0, 0, 15, 15]
 	rootnode = GoLNode(None, baserect)
 	tree = GoLQuadTree(rootnode, 0)
 
@@ -437,7 +882,7 @@ if __name__ == '__main__':
 	tree.show_tree(rootnode)
 	
 
-	baserect = [0, 0, 256, 256]
+	baserect = [0, 0, 255, 255]
 	rootnode = GoLNode(None, baserect)
 	tree = GoLQuadTree(rootnode, 1)
 
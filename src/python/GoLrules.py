@@ -0,0 +1,86 @@
+# Life-like rules for the Game of Life.
+# A rule says how many living neighbors bring a dead cell to life (B) and
+# how many keep a living cell alive (S).  Rules are parsed from the usual
+# string notations and compiled into an 18 entry lookup table indexed by
+# (state * 9 + neighbors), which every engine uses to find the next state.
+
+import re
+
+# B3/S23, B36/S23, B2/S, S23/B3, with optional case and separator
+_BS = re.compile(r'^B([0-8]*)/?S([0-8]*)$')
+_SB = re.compile(r'^S([0-8]*)/?B([0-8]*)$')
+# 23/3: survival counts first, then birth counts
+_SURVIVAL_BIRTH = re.compile(r'^([0-8]*)/([0-8]*)$')
+
+
+def parse_rule(rule):
+    """
+    Parses a Life-like rule string.
+
+    Parameters
+    ----------
+    rule: rule in B/S notation (B3/S23, b36/s23, B3S23), S/B notation with
+        letters (S23/B3) or S/B notation without letters (23/3)
+
+    Returns
+    -------
+    (born, survives) tuple of sorted lists of neighbor counts
+
+    Raises
+    ------
+    ValueError if rule is not a Life-like rule
+    """
+    text = rule.strip().upper()
+
+    match = _BS.match(text)
+    if match:
+        born, survives = match.group(1), match.group(2)
+    else:
+        match = _SB.match(text) or _SURVIVAL_BIRTH.match(text)
+        if not match:
+            raise ValueError("%r is not a Life-like rule" % (rule,))
+        survives, born = match.group(1), match.group(2)
+
+    return sorted(set(int(n) for n in born)), sorted(set(int(n) for n in survives))
+
+
+def compile_rule(born, survives):
+    """
+    Compiles neighbor counts into a rule lookup table.
+
+    Parameters
+    ----------
+    born: neighbor counts that bring a dead cell to life
+    survives: neighbor counts that keep a living cell alive
+
+    Returns
+    -------
+    bytearray of 18 entries where table[state * 9 + neighbors] is the next state
+    """
+    table = bytearray(18)
+    for n in born:
+        table[n] = 1
+    for n in survives:
+        table[9 + n] = 1
+
+    return table
+
+
+def rule_string(table):
+    """
+    Returns the B/S notation of a compiled rule table, e.g. B3/S23.
+    """
+    born = ''.join(str(n) for n in range(9) if table[n])
+    survives = ''.join(str(n) for n in range(9) if table[9 + n])
+
+    return "B%s/S%s" % (born, survives)
+
+
+def rule_from_index(index):
+    """
+    Returns the rule table of a Life-like rule numbered from 0 to 2^18 - 1.
+    Bits 0-8 of index are the birth counts and bits 9-17 the survival counts,
+    the same layout as the lookup table, so every rule is visited once when
+    sweeping index over range(1 << 18).
+    """
+    return bytearray((index >> i) & 1 for i in range(18))
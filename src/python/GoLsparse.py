@@ -0,0 +1,158 @@
+# Sparse, unbounded board for the Game of Life.
+# Only the coordinates of living cells are stored, as a set of signed
+# (x, y) tuples, so the board has no edges and no fixed size.  A generation
+# counts neighbors in a dict of the cells touched by living cells.
+
+from collections import defaultdict
+from GoLcycles import cell_key, cells_hash
+
+
+class GoLSparse():
+    """
+    Represents a Game of Life board on the infinite plane.
+    """
+
+    def __init__(self, rule):
+        """
+        Initializes an empty board.
+
+        Parameters
+        ----------
+        rule: compiled rule table (see GoLrules.compile_rule)
+
+        Returns
+        -------
+        None
+        """
+        # Rule table indexed by (state * 9 + neighbors)
+        self.__rule = rule
+
+        self.living = set()
+        # Zobrist hash of the board, kept up to date by step once state_hash
+        # has been called; None until then and after any other change
+        self.__hash = None
+
+    def spawn(self, x, y):
+        """
+        Brings the cell at (x, y) to life.
+
+        Parameters
+        ----------
+        x, y: signed coordinates of the cell
+
+        Returns
+        -------
+        None
+        """
+        self.living.add((x, y))
+        self.__hash = None
+
+    def add_cells(self, points):
+        """
+        Brings every cell in points to life.
+
+        Parameters
+        ----------
+        points: iterable of (x, y) signed coordinates
+
+        Returns
+        -------
+        None
+        """
+        self.living.update(points)
+        self.__hash = None
+
+    def step(self):
+        """
+        Advances the board by one generation.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        True if there are remaining alive cells.
+        False otherwise.
+        """
+        living = self.living
+        count = defaultdict(int)
+
+        for cell in living:
+            x, y = cell
+            # Make sure living cells without neighbors are checked too
+            count[cell] += 0
+            count[(x - 1, y - 1)] += 1
+            count[(x, y - 1)] += 1
+            count[(x + 1, y - 1)] += 1
+            count[(x - 1, y)] += 1
+            count[(x + 1, y)] += 1
+            count[(x - 1, y + 1)] += 1
+            count[(x, y + 1)] += 1
+            count[(x + 1, y + 1)] += 1
+
+        rule = self.__rule
+        self.living = set(cell for cell, neighbors in count.iteritems()
+                          if rule[(cell in living) * 9 + neighbors])
+        if self.__hash is not None:
+            # Births and deaths
+            for x, y in self.living ^ living:
+                self.__hash ^= cell_key(x, y)
+
+        return len(self.living) > 0
+
+    def population(self):
+        """
+        Returns the number of living cells.
+        """
+        return len(self.living)
+
+    def state_hash(self):
+        """
+        Returns the Zobrist hash of the board (see GoLcycles).  It is computed
+        from every living cell on the first call, then updated by every step
+        from the cells born and the cells that died.
+        """
+        if self.__hash is None:
+            self.__hash = cells_hash(self.living)
+        return self.__hash
+
+    def bounding_box(self):
+        """
+        Returns the smallest rectangle holding every living cell.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        (x0, y0, x1, y1) inclusive corners, or None when nothing is alive
+        """
+        if not self.living:
+            return None
+
+        xs = [x for x, y in self.living]
+        ys = [y for x, y in self.living]
+        return (min(xs), min(ys), max(xs), max(ys))
+
+    def get_living(self, x0, y0, width, height):
+        """
+        Returns a 2D list with False representing dead cells and True
+        representing alive cells for a window of the board.
+
+        Parameters
+        ----------
+        x0, y0: top left corner of the window
+        width, height: size of the window
+
+        Returns
+        -------
+        2D list of booleans indexed as [x][y]
+        """
+        cells = [[False for y in range(height)] for x in range(width)]
+        for x, y in self.living:
+            if x0 <= x < x0 + width and y0 <= y < y0 + height:
+                cells[x - x0][y - y0] = True
+
+        return cells
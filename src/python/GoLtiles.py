@@ -0,0 +1,185 @@
+# Parallel NumPy board for the Game of Life.
+# The board is cut into bands of rows (tiles spanning the full height) and
+# each band is stepped by a worker of a process pool.  Both generations of
+# the board live in shared memory, so workers read the one cell halo around
+# their band straight from the current generation and write their band of
+# the next generation in place; only band indices cross the pool's pipes.
+
+import ctypes
+import multiprocessing
+import numpy as np
+from GoLarray import GoLArray, sum_neighbors, apply_rule
+from GoLcycles import coords_hash
+
+# State of a worker process, set up once by _init_worker
+_worker = {}
+
+
+def _init_worker(buffers, width, height, rule, topology):
+    """
+    Maps the shared boards into a worker process.
+
+    Parameters
+    ----------
+    buffers: the two shared memory buffers holding the board generations
+    width, height: size of the board
+    rule: compiled rule table
+    topology: bounded, torus or klein
+
+    Returns
+    -------
+    None
+    """
+    _worker['boards'] = [np.frombuffer(b, dtype=np.uint8).reshape(width, height)
+                         for b in buffers]
+    _worker['rule'] = np.array(list(rule), dtype=np.uint8)
+    _worker['topology'] = topology
+    _worker['bands'] = {}
+
+
+def _step_band(args):
+    """
+    Writes the next generation of rows x0 to x1 - 1 of the board.
+
+    Parameters
+    ----------
+    args: (current, x0, x1, hashed) where current is the index of the shared
+        board holding the current generation, and hashed asks for the change
+        of the Zobrist hash
+
+    Returns
+    -------
+    Number of living cells of the band in the next generation, and the XOR
+    of the keys of the cells of the band that changed (0 unless hashed).
+    """
+    current, x0, x1, hashed = args
+    board, new_board = _worker['boards'][current], _worker['boards'][1 - current]
+    topology = _worker['topology']
+    width, height = board.shape
+
+    # Padded band and neighbor counts, kept between generations
+    if (x0, x1) not in _worker['bands']:
+        _worker['bands'][(x0, x1)] = (np.zeros((x1 - x0 + 2, height + 2), dtype=np.uint8),
+                                      np.zeros((x1 - x0, height), dtype=np.uint8))
+    p, count = _worker['bands'][(x0, x1)]
+
+    # Band and the halo rows above and below it
+    p[1:-1, 1:-1] = board[x0:x1]
+    if x0 > 0 or topology != "bounded":
+        p[0, 1:-1] = board[(x0 - 1) % width]
+    if x1 < width or topology != "bounded":
+        p[-1, 1:-1] = board[x1 % width]
+
+    # Halo columns, corners included
+    if topology == "torus":
+        p[:, 0] = p[:, -2]
+        p[:, -1] = p[:, 1]
+    elif topology == "klein":
+        # Crossing the top or bottom edge mirrors x
+        xs = (width - 1 - np.arange(x0 - 1, x1 + 1)) % width
+        p[:, 0] = board[xs, height - 1]
+        p[:, -1] = board[xs, 0]
+
+    apply_rule(_worker['rule'], board[x0:x1], sum_neighbors(p, count), new_board[x0:x1])
+
+    delta = 0
+    if hashed:
+        xs, ys = np.nonzero(board[x0:x1] != new_board[x0:x1])
+        delta = coords_hash(xs + x0, ys)
+
+    return int(np.count_nonzero(new_board[x0:x1])), delta
+
+
+class GoLTiles(GoLArray):
+    """
+    Represents a Game of Life board stored as a NumPy array in shared memory
+    and stepped in parallel by a pool of worker processes.  Results are
+    identical to GoLArray.
+    """
+
+    def __init__(self, width, height, rule, topology="bounded", processes=None, tiles=None):
+        """
+        Initializes an empty board in shared memory.  The worker pool is started
+        on the first step.
+
+        Parameters
+        ----------
+        width, height: size of the board
+        rule: compiled rule table (see GoLrules.compile_rule)
+        topology: bounded, torus or klein (see ConwayGOLGrid)
+        processes: number of worker processes, defaults to the number of cores
+        tiles: number of bands the board is cut into, defaults to processes
+
+        Returns
+        -------
+        None
+        """
+        # Two shared generations of the board; self.board is the current one.
+        # Workers keep their own step buffers, so GoLArray makes none.
+        self.__buffers = [multiprocessing.RawArray(ctypes.c_uint8, width * height)
+                          for n in range(2)]
+        self.__boards = [np.frombuffer(b, dtype=np.uint8).reshape(width, height)
+                         for b in self.__buffers]
+        self.__current = 0
+        GoLArray.__init__(self, width, height, rule, topology, board=self.__boards[0])
+
+        self.processes = processes or multiprocessing.cpu_count()
+        tiles = min(tiles or self.processes, width)
+        self.__rule = rule
+
+        # Band boundaries along x
+        bounds = [width * n // tiles for n in range(tiles + 1)]
+        self.tiles = [(bounds[n], bounds[n + 1]) for n in range(tiles)]
+        self.__pool = None
+
+    def step(self):
+        """
+        Advances the board by one generation.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        True if there are remaining alive cells.
+        False otherwise.
+        """
+        if self.__pool is None:
+            self.__pool = multiprocessing.Pool(
+                self.processes, _init_worker,
+                (self.__buffers, self.width, self.height, self.__rule, self.topology))
+
+        current = self.__current
+        hashed = self._hash is not None
+        bands = self.__pool.map(_step_band, [(current, x0, x1, hashed)
+                                             for x0, x1 in self.tiles])
+
+        self.__current = 1 - current
+        self.board = self.__boards[self.__current]
+        self._population = sum(living for living, delta in bands)
+        if hashed:
+            for living, delta in bands:
+                self._hash ^= delta
+
+        return self._population > 0
+
+    def close(self):
+        """
+        Stops the worker processes.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        if self.__pool is not None:
+            self.__pool.terminate()
+            self.__pool.join()
+            self.__pool = None
+
+    def __del__(self):
+        self.close()
@@ -1,14 +1,22 @@
 # Import necessary libraries
-import matplotlib.pyplot as plt
+# Only what every mode needs is imported here.  NumPy, the engine modules,
+# matplotlib and the tests are imported by the modes and functions that use
+# them, so short lived processes do not pay for what they never run.
 from random import randint
-from copy import deepcopy
-import numpy as np
-import unittest, sys
+from collections import defaultdict
+import sys
 import math
-from GoLquadtree import GoLNode, GoLQuadTree
+from GoLrules import parse_rule, compile_rule, rule_string
+from GoLcycles import GoLCycleDetector, cell_key, cells_hash
+from GoLpatterns import GoLPattern, chunk_cells, mask_cells, mask_chunks, load_pattern
+from GoLcheckpoint import GoLCheckpoint, write_checkpoint
+import os
 #import pylab
 
 
+# Default cap on the canonical nodes of Hashlife, a few hundred MB
+HASHLIFE_MAX_NODES = 1 << 20
+
 # Conway Game of Life Grid Class
 class ConwayGOLGrid():
     """
@@ -17,7 +25,8 @@ class ConwayGOLGrid():
     """
 
     def __init__(self, width=100, height=100, startCells=[],
-                 optimized=0, variant="B3/S23"):
+                 optimized=0, variant="B3/S23", topology="bounded", prune="eager",
+                 max_nodes=HASHLIFE_MAX_NODES):
         """
         Initializes a Grid as a 2D list and comprised of Cells.
 
@@ -26,66 +35,191 @@ class ConwayGOLGrid():
         width, height: size of the board
         startCells: list of cells to start as alive.
             If startCells is empty, cells spawn as alive at a rate of 30%.
-            startCells should be a list of coordinates (x, y)
+            startCells should be a list of coordinates (x, y), or a NumPy
+            bool array indexed as [x, y] such as a pattern file loaded with
+            GoLpatterns.load_pattern.  A GoLcheckpoint.GoLCheckpoint is drawn
+            straight into the board by the array modes (see load_checkpoint).
+            A GoLpatterns.GoLPattern is centered on the board; the unbounded
+            modes (4 and 5) read every cell of it, the others a mask of the board
         optimized: determines whether or not to use data structures to improve run-time.
 		   0 is non-optimized
 		   1 uses sets and 2D lists
 		   2 uses a quadtree structure
-        variant: defines variant of life played. Options as follows:
+		   3 uses a NumPy array and vectorized neighbor counts
+		   4 uses Hashlife on an unbounded board (width and height only
+		     set the window returned by get_living)
+		   5 uses a set of signed coordinates on an unbounded board
+		   6 uses a NumPy array in shared memory stepped in parallel by a
+		     pool of worker processes (call close() when done)
+		   7 uses a quadtree stepped a block at a time, recomputing only
+		     the blocks next to a block that changed
+		   8 uses rows of cells packed into 64 bit words, stepped 64
+		     cells at a time by bitwise adders
+		   9 uses the packed rows of mode 8, recomputing only the 64 x 64
+		     tiles next to a tile that changed
+        variant: defines variant of life played. Any Life-like rule in B/S notation
+            (B3/S23, B36/S23) or S/B notation (S23/B3, 23/3) is accepted, such as:
             B3/S23: default (Born with 3, Survives with 2 or 3)
             B6/S16
             B1/S12
             B36/S23: High life
-            B2/S3: Seeds
-            B2/S
+            B2/S3
+            B2/S: Seeds
+            Rules with B0 only make sense in the dense modes (0, 3, 8 and 9).
+        topology: defines what lies past the edges of the board. Options as follows:
+            bounded: default (cells past the edges are always dead)
+            torus: opposite edges are joined
+            klein: left and right edges are joined, top and bottom edges are
+                joined with x mirrored (a Klein bottle)
+            The unbounded modes (4 and 5) have no edges and ignore this option.
+        prune: pruning policy of the quadtree modes (eager, batch, threshold or never,
+            see GoLQuadTree)
+        max_nodes: number of canonical nodes of Hashlife (mode 4) past which
+            the nodes no longer in use and the memoized results are dropped
+            after a step, None to keep everything
         """
         self.width, self.height = width, height
         self.__optimized = optimized
         self.cells = []
         self.__living = set()
 
-        if variant == "B3/S23":
-            self.__born = [3]
-            self.__survives = [2, 3]
-        elif variant == "B6/S16":
-            self.__born = [6]
-            self.__survives = [1, 6]
-        elif variant == "B1/S12":
-            self.__born = [1]
-            self.__survives = [1, 2]
-        elif variant == "B36/S23":
-            self.__born = [3, 6]
-            self.__survives = [2, 3]
-        elif variant == "B2/S3":
-            self.__born = [2]
-            self.__survives = [3]
-        elif variant == "B2/S":
-            self.__born = [2]
-            self.__survives = []
-        else:
+        # Number of update calls so far (advance counts every generation)
+        self.generation = 0
+        # Population of the naive mode, counted during each update
+        self.__population = 0
+        # Bounding box and the generation it was found for
+        self.__box = None
+        self.__box_generation = -1
+        # Zobrist hash of modes 0 and 1, kept up to date during each update
+        self.__hash = 0
+        # Cycle detection, off until detect_cycles is called
+        self.__cycles = None
+        self.period = None
+        # Array get_living_array fills for the modes it cannot view directly
+        self.__array = None
+
+        try:
+            born, survives = parse_rule(variant)
+        except ValueError:
             print variant, " is not a valid variant. Using B3/S23."
-            self.__born = [3]
-            self.__survives = [2, 3]
-	
-	if self.__optimized != 2:
-	        for x in range(self.width):
-        	    # Create new list for 2D structure
-	            self.cells.append([])
-
-        	    for y in range(self.height):
-                	# If startCells not provided, randomly init grid
-	                if len(startCells) == 0 and randint(0, 100) < 30:
-        	            self.cells[x].append(ConwayGOLCell(x, y, True))
-                	    self.__living.add((x, y))
-
-	                else:
-        	            self.cells[x].append(ConwayGOLCell(x, y))
-	
-
-        	# Give life to all cells in the startCells list
+            born, survives = [3], [2, 3]
+
+        # Lookup table indexed by (state * 9 + neighbors) used by every engine
+        self.__rule = compile_rule(born, survives)
+        self.variant = rule_string(self.__rule)
+
+        if topology not in ("bounded", "torus", "klein"):
+            print topology, " is not a valid topology. Using bounded."
+            topology = "bounded"
+        if self.__optimized in (4, 5):
+            topology = "unbounded"
+        self.topology = topology
+
+        # A mask is loaded whole by the array and quadtree modes, a chunk of
+        # arrays at a time by Hashlife, and one cell at a time by the others
+        mask = None
+        checkpoint = None
+        # Cells of a pattern file, a chunk of arrays at a time
+        chunks = None
+        # An array can only have been made if NumPy is loaded already
+        np = sys.modules.get("numpy")
+        if isinstance(startCells, GoLPattern):
+            x0, y0 = startCells.center(self.width, self.height)
+            if self.__optimized in (4, 5):
+                # Nothing is clipped off an unbounded board
+                chunks = startCells.chunks(x0, y0)
+                startCells = chunk_cells(chunks)
+            else:
+                mask = startCells.mask(self.width, self.height, x0, y0)
+                startCells = mask_cells(mask)
+        elif np is not None and isinstance(startCells, np.ndarray):
+            mask = startCells
+            startCells = mask_cells(mask)
+        elif isinstance(startCells, GoLCheckpoint):
+            checkpoint = startCells
+            startCells = checkpoint.cells()
+        randomize = (mask is None and checkpoint is None and chunks is None and
+                     len(startCells) == 0)
+
+	if self.__optimized in (3, 6, 8, 9):
+	        if self.__optimized == 3:
+	            from GoLarray import GoLArray
+	            self.board = GoLArray(self.width, self.height, self.__rule,
+	                                  self.topology)
+	        elif self.__optimized == 8:
+	            from GoLbits import GoLBits
+	            self.board = GoLBits(self.width, self.height, self.__rule,
+	                                 self.topology)
+	        elif self.__optimized == 9:
+	            from GoLactive import GoLActive
+	            self.board = GoLActive(self.width, self.height, self.__rule,
+	                                   self.topology)
+	        else:
+	            from GoLtiles import GoLTiles
+	            self.board = GoLTiles(self.width, self.height, self.__rule,
+	                                  self.topology)
+
+	        if randomize:
+	            self.board.randomize(30)
+	        elif mask is not None:
+	            self.board.load(mask)
+	        elif checkpoint is not None:
+	            self.board.load_checkpoint(checkpoint)
+
+	        for cell in startCells if mask is None and checkpoint is None else []:
+	            self.board.spawn(cell[0], cell[1])
+	elif self.__optimized == 4:
+	        from GoLhashlife import GoLHashlife
+	        self.life = GoLHashlife(self.__rule, max_nodes)
+
+	        if randomize:
+	            startCells = [(x, y) for x in range(self.width) for y in range(self.height)
+	                          if randint(0, 100) < 30]
+
+	        # Masks and checkpoints go in as arrays, a chunk at a time
+	        if mask is not None:
+	            self.life.add_arrays(mask_chunks(mask))
+	        elif checkpoint is not None:
+	            self.life.add_arrays(checkpoint.chunks())
+	        elif chunks is not None:
+	            self.life.add_arrays(chunks)
+	        else:
+	            self.life.add_cells(startCells)
+	        if checkpoint is not None:
+	            self.life.generation = checkpoint.generation
+	elif self.__optimized == 5:
+	        from GoLsparse import GoLSparse
+	        self.sparse = GoLSparse(self.__rule)
+
+	        if randomize:
+	            startCells = [(x, y) for x in range(self.width) for y in range(self.height)
+	                          if randint(0, 100) < 30]
+
+	        self.sparse.add_cells(startCells)
+	elif self.__optimized not in (2, 7):
+	        # Cell states live in one compact buffer; self.cells[x][y] hands out views
+	        self.cells = ConwayGOLCells(self.width, self.height)
+	        # Second buffer the naive update writes into before swapping
+	        self.__next = bytearray(self.width * self.height)
+
+	        # If startCells not provided, randomly init grid
+	        if randomize:
+	            for x in range(self.width):
+	                for y in range(self.height):
+	                    if randint(0, 100) < 30:
+	                        self.cells[x][y].spawn()
+	                        self.__living.add((x, y))
+
+	        # Give life to all cells in the startCells list
+	        # Cells off the board, such as the negative ones of an unbounded
+	        # checkpoint, are dropped
 	        for cell in startCells:
-        	    self.cells[cell[0]][cell[1]].spawn()
-	            self.__living.add((cell))
+	            if 0 <= cell[0] < self.width and 0 <= cell[1] < self.height:
+	                self.cells[cell[0]][cell[1]].spawn()
+	                self.__living.add((cell))
+
+	        self.__population = len(self.__living)
+	        self.__hash = cells_hash(self.__living)
 	else:
 		if self.width != self.height:
 			print "Grid not square.  Using closest power of 2 larger than or equal to the width provided."
@@ -93,23 +227,33 @@ class ConwayGOLGrid():
 			print "Using closest power of 2 larger than or equal to the width provided."		
 		# Find closest power of 2 to the width
 		self.width = int(math.pow(2, math.ceil(math.log(self.width, 2))))
+		self.height = self.width
+
+		from GoLquadtree import GoLNode, GoLQuadTree
 
 		# Initialize QuadTree
 		baserect = [0, 0, self.width-1, self.width-1]
 		self.rootnode = GoLNode(None, baserect)
-		self.tree = GoLQuadTree(self.rootnode, 0)
+		self.tree = GoLQuadTree(self.rootnode, 0, prune)
+
+		# Start up some cells.  The tree is built bottom up in one pass,
+		# which also fills in its set of leaves (mode 7 keeps block masks
+		# on the tree's nodes instead).
+		if randomize:
+			import numpy as np
+			self.tree.bulk_load_mask(self.rootnode,
+				np.random.randint(0, 101, size=(self.width, self.width)) < 30)
+		elif mask is not None:
+			self.tree.bulk_load_mask(self.rootnode, mask)
+		else:
+			self.tree.bulk_load(self.rootnode, startCells)
 
-		# Start up some cells
-		if len(startCells) == 0:
-			for x in range(self.width):
-				for y in range(self.width):
-					if randint(0, 100) < 30:
-						self.tree.insert(self.rootnode, (x, y))
+		if self.__optimized == 7:
+			from GoLquadlife import GoLQuadLife
+			self.quadlife = GoLQuadLife(self.tree, self.__rule, self.topology)
 
-		for cell in startCells:
-			self.tree.insert(self.rootnode, cell)
-				
-		self.tree.traverse(self.rootnode)
+	if checkpoint is not None:
+	        self.generation = checkpoint.generation
 
     def update(self):
         """
@@ -127,113 +271,324 @@ class ConwayGOLGrid():
         alive = False
 
         if self.__optimized == 0:
-            # Deep copy list to make sure entire board updates correctly
-            tempGrid = deepcopy(self.cells)
+            # Read the current generation from one buffer and write the next
+            # generation into the other so the entire board updates correctly
+            state, new_state = self.cells.state, self.__next
+            width, height = self.width, self.height
+            rule = self.__rule
+            wrapped = self.topology != "bounded"
+            # Population, bounding box and hash of the new generation
+            population = 0
+            box = None
+            h = self.__hash
 
             # For every cell, check the neighbors.
-            for x in range(self.width):
-                for y in range(self.height):
-                    neighbors = self.cells[x][y].num_neighbors(self)
-
-                    # Living cells stay alive with __survives # of neighbors, else die
-                    if self.cells[x][y].is_alive():
-                        if not (neighbors in self.__survives):
-                            tempGrid[x][y].die()
-                        else:
-                            alive = True
-
-                    # Non living cells come alive with 3 neighbors
-                    else:
-                        if neighbors in self.__born:
-                            tempGrid[x][y].spawn()
-                            alive = True
-
-            # Deep copy the tempGrid to prevent losing reference
-            self.cells = deepcopy(tempGrid)
+            for x in xrange(width):
+                for y in xrange(height):
+                    neighbors = 0
+                    for n_x in xrange(x - 1, x + 2):
+                        for n_y in xrange(y - 1, y + 2):
+                            if n_x == x and n_y == y:
+                                continue
+                            if n_x >= 0 and n_y >= 0 and n_x < width and n_y < height:
+                                neighbors += state[n_x * height + n_y]
+                            elif wrapped:
+                                w_x, w_y = self.wrap_point(n_x, n_y)
+                                neighbors += state[w_x * height + w_y]
+
+                    # Look up the next state from the current state and neighbors
+                    i = x * height + y
+                    new_state[i] = rule[state[i] * 9 + neighbors]
+                    if new_state[i] != state[i]:
+                        h ^= cell_key(x, y)
+                    if new_state[i]:
+                        population += 1
+                        # x only grows, so only y can move the low corner
+                        if box is None:
+                            box = [x, y, x, y]
+                        elif y < box[1]:
+                            box[1] = y
+                        elif y > box[3]:
+                            box[3] = y
+                        box[2] = x
+
+            # Swap the buffers so the new generation becomes the current one
+            self.cells.state, self.__next = new_state, state
+            self.__population = population
+            self.__box = tuple(box) if box else None
+            self.__hash = h
+            alive = population > 0
 
         elif self.__optimized == 1:
-            count = [[0 for y in range(self.height)] for x in range(self.width)]
-            to_check = set()
+            state = self.cells.state
+            rule = self.__rule
+            wrapped = self.topology != "bounded"
+            # Only cells touched by a living cell get an entry, so the cost of
+            # a generation follows the population rather than the board size.
+            count = defaultdict(int)
 
             # For each cell that is alive...
             for cell in self.__living:
-                x, y = cell
-                to_check.add(cell)
+                # Make sure living cells without neighbors are checked too
+                count[cell] += 0
 
                 # Retrieve all neighbors
-                for neighbor in self.cells[x][y].neighbors:
+                for neighbor in self.return_neighbors(cell):
                     n_x, n_y = neighbor
                     # If neighbors are valid
                     if (n_x >= 0 and n_y >= 0 and
                                 n_x < self.width and n_y < self.height):
-                        # Then increment count and add them to the set
-                        count[n_x][n_y] += 1
-                        to_check.add(neighbor)
+                        # Then increment count
+                        count[neighbor] += 1
+                    elif wrapped:
+                        count[self.wrap_point(n_x, n_y)] += 1
 
             # Start over living.
             self.__living = set()
+            box = None
+            h = self.__hash
 
             # Above, we add 1 to the count each time a cell is touched by an alive cell.
             # So we know count contains the number of alive neighbors any given cell has.
             # We use this to quickly check the rules of life and add cells to living list.
-            for cell in to_check:
+            for cell, neighbors in count.iteritems():
                 x, y = cell
-
-                if self.cells[x][y].is_alive():
-                    if not count[x][y] in self.__survives:
-                        self.cells[x][y].die()
+                i = x * self.height + y
+
+                old = state[i]
+                state[i] = rule[old * 9 + neighbors]
+                if state[i] != old:
+                    h ^= cell_key(x, y)
+                if state[i]:
+                    self.__living.add(cell)
+                    if box is None:
+                        box = [x, y, x, y]
                     else:
-                        self.__living.add(cell)
-                        alive = True
-                else:
-                    if count[x][y] in self.__born:
-                        self.cells[x][y].spawn()
-                        self.__living.add(cell)
-                        alive = True
-	
+                        if x < box[0]:
+                            box[0] = x
+                        elif x > box[2]:
+                            box[2] = x
+                        if y < box[1]:
+                            box[1] = y
+                        elif y > box[3]:
+                            box[3] = y
+
+            self.__box = tuple(box) if box else None
+            self.__hash = h
+            alive = box is not None
+
+        elif self.__optimized in (3, 6, 8, 9):
+            alive = self.board.step()
+
+        elif self.__optimized == 4:
+            alive = self.life.step(0)
+
+        elif self.__optimized == 5:
+            alive = self.sparse.step()
+
+        elif self.__optimized == 7:
+            alive = self.quadlife.step()
+
 	else:
-        	count = [[0 for y in range(self.width)] for x in range(self.width)]
+		count = [[0 for y in range(self.width)] for x in range(self.width)]
 		to_check = set()
-		
-		for cell in GoLQuadTree.leaves:
+		rule = self.__rule
+		wrapped = self.topology != "bounded"
+
+		for cell in self.tree.leaves:
 			x, y = cell
-			
+
 			to_check.add((x,y))
-                
+
 			# Retrieve all neighbors
-                	for neighbor in self.return_neighbors((x,y)):
-                		n_x, n_y = neighbor
-                   		# If neighbors are valid
-                    		if (n_x >= 0 and n_y >= 0 and n_x < self.width and n_y < self.width):
-                        		# Then increment count and add them to the set
-                        		count[n_x][n_y] += 1
-                        		to_check.add(neighbor)
+			for neighbor in self.return_neighbors((x,y)):
+				n_x, n_y = neighbor
+				# If neighbors are valid
+				if (n_x >= 0 and n_y >= 0 and n_x < self.width and n_y < self.width):
+					# Then increment count and add them to the set
+					count[n_x][n_y] += 1
+					to_check.add(neighbor)
+				elif wrapped:
+					n_x, n_y = self.wrap_point(n_x, n_y)
+					count[n_x][n_y] += 1
+					to_check.add((n_x, n_y))
 
 		#print len(to_check), to_check
 		for cell in to_check:
 			x, y = cell
-		
-			if cell in GoLQuadTree.leaves:
-                    		if not count[x][y] in self.__survives:
-	                        	self.tree.delete(self.rootnode, cell)
-					GoLQuadTree.leaves.discard(cell)
-        	        	else:
-                        		self.tree.insert(self.rootnode, cell)
-					GoLQuadTree.leaves.add(cell)
-                        		alive = True
-               	 	else:
-                    		if count[x][y] in self.__born:
-                        		self.tree.insert(self.rootnode, cell)
-					GoLQuadTree.leaves.add(cell)
-                        		alive = True
-	
-		
-		#self.tree.traverse(self.rootnode)
 
+			if cell in self.tree.leaves:
+				if not rule[9 + count[x][y]]:
+					self.tree.delete(self.rootnode, cell)
+					self.tree.leaves.discard(cell)
+				else:
+					self.tree.insert(self.rootnode, cell)
+					self.tree.leaves.add(cell)
+					alive = True
+			else:
+				if rule[count[x][y]]:
+					self.tree.insert(self.rootnode, cell)
+					self.tree.leaves.add(cell)
+					alive = True
+
+		# Cut off the branches emptied this generation, if the policy says so
+		self.tree.end_generation()
+
+        self.generation += 1
+        if self.__optimized in (0, 1):
+            # Found along the way by the update itself
+            self.__box_generation = self.generation
+
+        if self.__cycles is not None:
+            self.period = self.__cycles.check(self.state_hash(), self.generation)
+
+        return alive
+
+    def state_hash(self):
+        """
+        Returns the Zobrist hash of the board (see GoLcycles).  Modes 0, 1, 2
+        and 7 keep it up to date from the cells that change; the other modes
+        compute it on the first call and from then on update it every
+        generation from the cells that changed.  Hashlife (optimized 4) hashes
+        the cells by position instead (see GoLhashlife), building the hash of
+        every node from the hashes of its quadrants.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        64 bit hash (61 bit for Hashlife), 0 for an empty board
+        """
+        if self.__optimized in (0, 1):
+            return self.__hash
+        elif self.__optimized == 4:
+            return self.life.state_hash()
+        elif self.__optimized == 5:
+            return self.sparse.state_hash()
+        elif self.__optimized in (2, 7):
+            return self.tree.hash
+        else:
+            return self.board.state_hash()
+
+    def detect_cycles(self, history=64):
+        """
+        Starts looking for repeated boards.  After every update, period is the
+        period of the cycle the board has entered (1 for a still life or an
+        empty board), or None while no board has repeated.
+
+        Parameters
+        ----------
+        history: number of past boards remembered, the longest period found
+
+        Returns
+        -------
+        None
+        """
+        self.__cycles = GoLCycleDetector(history)
+        self.__cycles.check(self.state_hash(), self.generation)
+        self.period = None
+
+    def advance(self, generations):
+        """
+        Advances the game by a number of generations.  Hashlife (optimized 4)
+        takes power of two jumps; every other mode calls update repeatedly.
+
+        Parameters
+        ----------
+        generations: number of generations to advance
+
+        Returns
+        -------
+        True if there are remaining alive cells.
+        False otherwise.
+        """
+        if self.__optimized == 4:
+            self.generation += generations
+            return self.life.advance(generations)
+
+        alive = True
+        for generation in range(generations):
+            alive = self.update()
 
         return alive
 
 
+    def save_checkpoint(self, path, layout=None):
+        """
+        Saves the board, rule, topology and generation as a binary checkpoint
+        (see GoLcheckpoint).  The file is written next to path and renamed
+        over it, so a run stopped while saving keeps its previous checkpoint.
+
+        Parameters
+        ----------
+        path: path of the checkpoint
+        layout: dense or sparse, the smaller of the two when not given
+
+        Returns
+        -------
+        None
+        """
+        import numpy as np
+
+        mask = cells = bands = None
+        if self.__optimized in (4, 5):
+            # Every living cell, not just the window at the origin
+            living = self.life.living() if self.__optimized == 4 else self.sparse.living
+            cells = np.array(list(living), dtype=np.int64).reshape(-1, 2).T
+        elif self.__optimized in (8, 9):
+            # Straight from the packed words, a band at a time
+            bands = self.board.packed_bands()
+        else:
+            mask = self.get_living_array()
+
+        with open(path + ".tmp", "wb") as f:
+            write_checkpoint(f, self.width, self.height, self.variant, self.topology,
+                             self.generation, self.__optimized, mask, cells, layout,
+                             bands, self.population())
+        os.rename(path + ".tmp", path)
+
+    def close(self):
+        """
+        Releases the worker processes of the parallel mode (optimized 6).
+        Does nothing for the other modes.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        if self.__optimized == 6:
+            self.board.close()
+
+    def wrap_point(self, x, y):
+        """
+        Maps coordinates that may lie past the edges of the board back onto it
+        according to the topology of the grid.
+
+        Parameters
+        ----------
+        x, y: coordinates of the point
+
+        Returns
+        -------
+        (x, y) tuple on the board, or None if the point is off a bounded board
+        """
+        if x >= 0 and y >= 0 and x < self.width and y < self.height:
+            return (x, y)
+        if self.topology == "torus":
+            return (x % self.width, y % self.height)
+        if self.topology == "klein":
+            # Crossing the top or bottom edge mirrors the x coordinate
+            if y < 0 or y >= self.height:
+                x = self.width - 1 - x
+            return (x % self.width, y % self.height)
+        return None
+
     def return_neighbors(self, point):
         """
     	Returns the set of neighbors for a given point.
@@ -254,36 +609,213 @@ class ConwayGOLGrid():
 
 	
 
-    def get_living(self):
+    def population(self):
+        """
+        Returns the number of living cells.  Every mode keeps the count up to
+        date as it updates, so this does not look at the board.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        Number of living cells
+        """
+        if self.__optimized == 0:
+            return self.__population
+        elif self.__optimized == 1:
+            return len(self.__living)
+        elif self.__optimized in (3, 6, 8, 9):
+            return self.board.population()
+        elif self.__optimized == 4:
+            return self.life.population()
+        elif self.__optimized == 5:
+            return self.sparse.population()
+        else:
+            return self.rootnode.count
+
+    def bounding_box(self):
+        """
+        Returns the smallest rectangle holding every living cell.  Modes 0 and 1
+        find it during update; the other modes search for it on the first call
+        of a generation and keep it until the next update.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        (x0, y0, x1, y1) inclusive corners, or None when nothing is alive.
+        The unbounded modes (4 and 5) may return negative coordinates.
+        """
+        if self.__box_generation != self.generation:
+            self.__box = self.__find_bounding_box()
+            self.__box_generation = self.generation
+
+        return self.__box
+
+    def stats(self):
+        """
+        Returns the generation, population and bounding box of the game.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        Dictionary with the keys generation, population and bounding_box
+        """
+        return {"generation": self.generation, "population": self.population(),
+                "bounding_box": self.bounding_box()}
+
+    def __find_bounding_box(self):
+        """
+        Searches the board of any mode for its bounding box (see bounding_box).
+        """
+        if self.__optimized in (3, 6, 8, 9):
+            return self.board.bounding_box()
+        elif self.__optimized == 4:
+            return self.life.bounding_box()
+        elif self.__optimized == 5:
+            return self.sparse.bounding_box()
+
+        if self.__optimized == 0:
+            state, height = self.cells.state, self.height
+            living = [(i // height, i % height) for i in range(len(state)) if state[i]]
+        elif self.__optimized == 1:
+            living = self.__living
+        else:
+            return self.tree.bounding_box(self.rootnode)
+
+        if not living:
+            return None
+
+        xs = [x for x, y in living]
+        ys = [y for x, y in living]
+        return (min(xs), min(ys), max(xs), max(ys))
+
+    def get_living(self, region=None):
     	"""
     	Returns a 2D list with False representing dead cells and True representing alive cells.
 
     	Parameters
     	----------
-    	None
+    	region: optional (x0, y0, x1, y1) inclusive rectangle to return instead of the
+    	    board.  Cells outside the board are dead.  On the unbounded modes (4 and 5)
+    	    pass bounding_box() to get every living cell.
 
     	Returns
     	-------
     	2D binary list with 1's counting as alive cells
 
     	"""	
+        if self.__optimized in (4, 5):
+            if region is None:
+                region = (0, 0, self.width - 1, self.height - 1)
+            x0, y0, x1, y1 = region
+            engine = self.life if self.__optimized == 4 else self.sparse
+            return engine.get_living(x0, y0, x1 - x0 + 1, y1 - y0 + 1)
+
+        if region is not None and self.__optimized in (2, 7):
+            # Only visit the part of the tree inside the region
+            x0, y0, x1, y1 = region
+            cells = [[False for y in range(y0, y1 + 1)] for x in range(x0, x1 + 1)]
+            for x, y in self.tree.query(self.rootnode, region):
+                cells[x - x0][y - y0] = True
+            return cells
+
+        if region is not None:
+            # Crop the board, treating anything outside of it as dead
+            x0, y0, x1, y1 = region
+            board = self.get_living()
+            width, height = len(board), len(board[0])
+            return [[0 <= x < width and 0 <= y < height and board[x][y]
+                     for y in range(y0, y1 + 1)] for x in range(x0, x1 + 1)]
+
+        if self.__optimized in (3, 6, 8, 9):
+            return self.board.get_living()
+
     	cells = [[False for y in range(self.height)] for x in range(self.width)]
 
         if self.__optimized == 0:
-            for y in range(self.height):
-                for x in range(self.width):
-                    if self.cells[x][y].is_alive():
+            state = self.cells.state
+            for x in range(self.width):
+                for y in range(self.height):
+                    if state[x * self.height + y]:
                         cells[x][y] = True
         elif self.__optimized == 1:
         	for x, y in self.__living:
         		cells[x][y] = True
         else:
-        	for cell in GoLQuadTree.leaves:
+        	living = self.quadlife.cells() if self.__optimized == 7 else self.tree.leaves
+        	for cell in living:
         		x,y = cell
         		cells[x][y] = True
 
         return cells
 
+    def get_living_array(self, out=None):
+        """
+        Returns the board as a NumPy array of booleans without building any
+        lists.  Modes 0, 1, 3 and 6 return a read only view of their own
+        buffer; the view shows the next generations too, except in modes 0
+        and 6 whose buffers take turns, so treat it as valid until the next
+        update.
+        The other modes fill one array that is reused on every call.
+
+        Parameters
+        ----------
+        out: optional width x height bool array to copy the board into
+
+        Returns
+        -------
+        width x height bool array indexed as [x, y]; out when given.  The
+        unbounded modes (4 and 5) return the window at the origin.
+        """
+        import numpy as np
+
+        if self.__optimized in (0, 1):
+            view = np.frombuffer(self.cells.state, dtype=np.bool_).reshape(self.width, self.height)
+        elif self.__optimized in (3, 6):
+            view = self.board.board.view(np.bool_)
+        else:
+            view = None
+
+        if view is not None:
+            if out is None:
+                view.flags.writeable = False
+                return view
+            np.copyto(out, view)
+            return out
+
+        if out is None:
+            if self.__array is None:
+                self.__array = np.zeros((self.width, self.height), dtype=np.bool_)
+            out = self.__array
+        if self.__optimized in (8, 9):
+            return self.board.unpack(out)
+        out[...] = False
+
+        if self.__optimized == 4:
+            living = self.life.living()
+        elif self.__optimized == 5:
+            living = self.sparse.living
+        elif self.__optimized == 7:
+            living = list(self.quadlife.cells())
+        else:
+            living = self.tree.leaves
+        if living:
+            xs, ys = np.array(list(living)).T
+            if self.__optimized in (4, 5):
+                inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+                xs, ys = xs[inside], ys[inside]
+            out[xs, ys] = True
+
+        return out
+
     def print_text_grid(self):
         """
         Prints the current state of the board using text.
@@ -319,8 +851,7 @@ class ConwayGOLGrid():
         -------
         None
         """
-        cells = self.get_living()
-        im.set_data(cells)
+        im.set_data(self.get_living_array())
         fig.canvas.draw()
 
 	
@@ -423,260 +954,241 @@ class ConwayGOLCell():
         return num_neighbors
 
 
+### Compact storage for the cells of a grid
+class ConwayGOLCells(object):
+    """
+    Stores the state of every cell of a grid in a single bytearray (one byte per cell,
+    1 alive, 0 dead) laid out column by column, so cell (x, y) is at x * height + y.
+    Indexing as cells[x][y] returns a ConwayGOLCellView, which keeps the grid usable
+    like the 2D list of ConwayGOLCell objects it replaces.
+    """
+    __slots__ = ('width', 'height', 'state')
+
+    def __init__(self, width, height):
+        """
+        Creates storage for a width x height grid with every cell dead.
+
+        Parameters
+        ----------
+        width, height: size of the grid
+
+        Returns
+        -------
+        None
+        """
+        self.width, self.height = width, height
+        self.state = bytearray(width * height)
+
+    def __len__(self):
+        return self.width
+
+    def __getitem__(self, x):
+        if x < 0:
+            x += self.width
+        if x < 0 or x >= self.width:
+            raise IndexError("cell column out of range")
+        return ConwayGOLColumn(self, x)
+
+    def __iter__(self):
+        for x in range(self.width):
+            yield ConwayGOLColumn(self, x)
+
+
+class ConwayGOLColumn(object):
+    """
+    Lightweight view of one column (fixed x) of a ConwayGOLCells store.
+    """
+    __slots__ = ('cells', 'x')
+
+    def __init__(self, cells, x):
+        self.cells, self.x = cells, x
+
+    def __len__(self):
+        return self.cells.height
+
+    def __getitem__(self, y):
+        if y < 0:
+            y += self.cells.height
+        if y < 0 or y >= self.cells.height:
+            raise IndexError("cell row out of range")
+        return ConwayGOLCellView(self.cells, self.x, y)
+
+    def __iter__(self):
+        for y in range(self.cells.height):
+            yield ConwayGOLCellView(self.cells, self.x, y)
+
+
+class ConwayGOLCellView(object):
+    """
+    Lightweight view of a single cell of a ConwayGOLCells store.  It provides the same
+    methods as ConwayGOLCell but reads and writes the shared buffer, and works out its
+    neighbors from its coordinates instead of storing them.
+    """
+    __slots__ = ('cells', 'x', 'y')
+
+    def __init__(self, cells, x, y):
+        self.cells, self.x, self.y = cells, x, y
+
+    @property
+    def alive(self):
+        return self.cells.state[self.x * self.cells.height + self.y] == 1
+
+    @property
+    def neighbors(self):
+        x, y = self.x, self.y
+        return [(x - 1, y - 1), (x, y - 1), (x + 1, y - 1),
+                (x - 1, y), (x + 1, y),
+                (x - 1, y + 1), (x, y + 1), (x + 1, y + 1)]
+
+    def spawn(self):
+        """
+        Changes the state of a cell from dead to alive. Assumes that the cell is dead.
+        """
+        i = self.x * self.cells.height + self.y
+        assert self.cells.state[i] == 0
+        self.cells.state[i] = 1
+
+    def die(self):
+        """
+        Changes the state of a cell from alive to dead. Assumes that the cell is alive.
+        """
+        i = self.x * self.cells.height + self.y
+        assert self.cells.state[i] == 1
+        self.cells.state[i] = 0
+
+    def is_alive(self):
+        """
+        Returns True if cell is alive, false otherwise.
+        """
+        return self.cells.state[self.x * self.cells.height + self.y] == 1
+
+    def num_neighbors(self, grid):
+        """
+        Returns the number of neighbors of a cell.
+
+        Parameters
+        ----------
+        grid: the ConwayGOLGrid object containing all cells
+
+        Returns
+        -------
+        number of alive neighbors
+        """
+        state, height = self.cells.state, self.cells.height
+        num_neighbors = 0
+
+        for cell in self.neighbors:
+            cell = grid.wrap_point(cell[0], cell[1])
+            if cell is not None:
+                num_neighbors += state[cell[0] * height + cell[1]]
+
+        return num_neighbors
+
+
+
+# Short names of the engines selected by the optimized argument of ConwayGOLGrid
+ENGINES = {0: "naive", 1: "sets", 2: "quadtree", 3: "numpy", 4: "hashlife",
+           5: "unbounded", 6: "parallel", 7: "quadblocks", 8: "bitpacked",
+           9: "active"}
+
+# Names of the built in starting patterns
+PATTERNS = ["random", "block", "blinker", "toad", "glider", "lightweight_spaceship",
+            "glider_gun", "sierpinski"]
+
+def initial_cells(initial, size):
+    """
+    Returns the starting cells of one of the built in patterns.
+
+    Parameters
+    ----------
+    initial: name of the pattern (see PATTERNS), or the path of an RLE, Life 1.06
+        or plaintext pattern file (see GoLpatterns)
+    size: width of the square board the pattern is placed on
+
+    Returns
+    -------
+    list of coordinates (x, y). The random pattern is an empty list, which makes
+    ConwayGOLGrid seed the board randomly.  A pattern file is returned as a
+    NumPy mask with the pattern centered on the board.
+    """
+    half = size // 2
+
+    if initial not in PATTERNS and os.path.isfile(initial):
+        return load_pattern(initial, size, size)[0]
+
+    if initial == "random":
+        return []
+    elif initial == "block":
+        return [(half-1,half-1),(half-1,half),
+                (half,half-1),(half,half)]
+    elif initial == "blinker":
+        return [(half-1,half),(half,half),(half+1,half)]
+    elif initial == "toad":
+        return [(half-1,half-1),(half-1,half),(half-1,half+1),
+            (half,half-2),(half,half-1),(half,half)]
+    elif initial == "glider":
+        return [(3,4),(4,2),(4,4),(5,3),(5,4)]
+    elif initial == "lightweight_spaceship":
+        return [(half-1,3),(half-1,4),(half-1,5),
+                (half-1,6),(half-1,7),(half,2),
+                (half,7),(half+1,7),
+                (half+2,2),(half+2,6)]
+    elif initial == "glider_gun":
+        return [(1,5),(1,6),(2,5),(2,6),(11,5),(11,6),(11,7),
+                (12,4),(12,8),(13,3),(13,9),(14,3),(14,9),(15,6),
+                (16,4),(16,8),(17,5),(17,6),(17,7),(18,6),(21,3),
+                (21,4),(21,5),(22,3),(22,4),(22,5),(23,2),(23,6),
+                (25,1),(25,2),(25,6),(25,7),(35,3),(35,4),(36,3),
+                (36,4),(35,22),(35,23),(35,25),(36,22),(36,23),(36,25),
+                (36,26),(36,27),(37,28),(38,22),(38,23),(38,25),(38,26),
+                (38,27),(39,23),(39,25),(40,23),(40,25),(41,24)]
+    elif initial == "sierpinski":
+        return [(half,half)]
+
+    raise ValueError("%r is not a built in pattern" % (initial,))
+
+
+
+def load_checkpoint(path, optimized=None):
+    """
+    Resumes a game from a checkpoint written by ConwayGOLGrid.save_checkpoint.
+    The file is mapped into memory and the array modes (3, 6, 8 and 9)
+    unpack it straight into their board.
+
+    Parameters
+    ----------
+    path: path of the checkpoint
+    optimized: mode of the new game, the mode that saved it when not given.
+        A board saved by an unbounded mode (4 or 5) can only be resumed by an
+        unbounded mode without losing the cells outside of the window.
+
+    Returns
+    -------
+    ConwayGOLGrid at the generation of the checkpoint
+    """
+    with GoLCheckpoint(path) as checkpoint:
+        if optimized is None:
+            optimized = checkpoint.engine
+        topology = checkpoint.topology
+        if topology == "unbounded":
+            topology = "bounded"
+
+        return ConwayGOLGrid(checkpoint.width, checkpoint.height, checkpoint, optimized,
+                             checkpoint.rule, topology)
+
+
 
-# Write a set of unit tests to check the functionality and correctness of each
-# method that is part of class above.
-class TestConwayCell(unittest.TestCase):
-	def test_cell_is_alive(self):
-		"""Test status of each cell (living or dead)."""
-		# Initialize a Conway Grid with a few living cells.
-		# Alive cells: (1,3), (3,6), (5,5), (7,2), (9,6)
-		test_game = ConwayGOLGrid(10, 10, [(1, 3), (3, 6), (5, 5), (7, 2), (9, 6)], 
-			optimized=True, variant="B1/S12")
-		self.assertEqual(test_game.cells[1][3].is_alive(), True)	# Live cell
-		self.assertEqual(test_game.cells[3][6].is_alive(), True)	# Live cell
-		self.assertEqual(test_game.cells[5][5].is_alive(), True)	# Live cell
-		self.assertEqual(test_game.cells[7][2].is_alive(), True)	# Live cell
-		self.assertEqual(test_game.cells[9][6].is_alive(), True)	# Live cell
-		self.assertEqual(test_game.cells[1][1].is_alive(), False)	# Dead cell
-		self.assertEqual(test_game.cells[5][4].is_alive(), False)	# Dead cell
-		self.assertEqual(test_game.cells[9][9].is_alive(), False)	# Dead cell
-
-	def test_cell_spawn(self):
-		"""Test spawning a cell (brining to life a dead cell)."""
-		# Initialize a Conway Grid with a few living cells.
-		# Alive cells: (1,3), (3,6), (5,5), (7,2), (9,6)
-		test_game = ConwayGOLGrid(10, 10, [(1, 3), (3, 6), (5, 5), (7, 2), (9, 6)], 
-			optimized=True, variant="B1/S12")
-		self.assertEqual(test_game.cells[9][6].is_alive(), True)	# Live cell
-		self.assertEqual(test_game.cells[1][1].is_alive(), False)	# Dead cell
-		# Spawn a cell on the grid in position (1,1)
-		test_game.cells[1][1].spawn()
-		self.assertEqual(test_game.cells[1][1].is_alive(), True)	# New live cell
-
-	def test_cell_die(self):
-		"""Test killing a cell (taking the live from an alive cell)."""
-		# Initialize a Conway Grid with a few living cells.
-		# Alive cells: (1,3), (3,6), (5,5), (7,2), (9,6)
-		test_game = ConwayGOLGrid(10, 10, [(1, 3), (3, 6), (5, 5), (7, 2), (9, 6)], 
-			optimized=True, variant="B1/S12")
-		self.assertEqual(test_game.cells[9][6].is_alive(), True)	# Live cell
-		self.assertEqual(test_game.cells[1][1].is_alive(), False)	# Dead cell
-		test_game.cells[9][6].die()
-		self.assertEqual(test_game.cells[9][6].is_alive(), False)	# New dead cell
-
-	def test_cell_num_neighbors(self):
-		"""Test the number of neighbors that are alive for a given cell."""
-		# Initialize a Conway Grid with a few living cells.
-		# Alive cells: (1,2), (1,3), (2,1), (3,1), (3,3),
-		#			   (6,6), (6,7), (7,7), (7,8), (8,8)
-		test_game = ConwayGOLGrid(10, 10, [(1, 2), (1, 3), (2, 1), (3, 1), (3, 3),
-			(6, 6), (6, 7), (7, 7), (7, 8), (8, 8)], optimized=True, variant="B1/S12")
-		# Test to make sure method works on dead cells
-		self.assertEqual(test_game.cells[2][2].num_neighbors(test_game), 5)	# (2, 2) has 5 neighbors
-		# Test to make sure method works on alive cells
-		self.assertEqual(test_game.cells[7][7].num_neighbors(test_game), 4)
-
-
-
-class TestConwayGrid(unittest.TestCase):
-	def test_grid_get_living(self):
-		"""Test the get living function to make sure it returns the correct grid."""
-		# Initialize a Conway Grid with a few living cells (on a 5x5 grid)
-		# Alive cells: (1,1), (2,4), (3,1), (4,3)
-		test_game = ConwayGOLGrid(5, 5, [(1, 1), (2, 4), (3, 1), (4, 3)],
-			optimized=True, variant="B1/S12")
-		cells = test_game.get_living()
-		for y in range(test_game.height):
-			for x in range(test_game.width):
-				if (x==1 and y==1) or (x==2 and y==4) or (x==3 and y==1) or (x==4 and y==3):
-					self.assertEqual(cells[x][y], True)
-				else:
-					self.assertEqual(cells[x][y], False)
-
-	def test_grid_update_box(self):
-		"""Test the update function with the B3/S23 rule and a box"""
-		# Initialize the board with a box and test B3/S23 (Should remain a box)
-		test_game_box = ConwayGOLGrid(4, 4, [(2, 2), (2, 3), (3, 2), (3, 3)],
-			optimized=True, variant="B3/S23")
-		# Perform an update step and make sure the box remains
-		cells_before_update = test_game_box.get_living()
-		test_game_box.update()
-		cells_after_update = test_game_box.get_living()
-		self.assertEqual(cells_before_update, cells_after_update)
-		test_game_box.update()
-		cells_after_update2 = test_game_box.get_living()
-		self.assertEqual(cells_after_update, cells_after_update2)
-
-	def test_grid_update_beehive(self):
-		"""Test the update function with the B2/S23 rule and a beehive"""
-		# Initialize the board with a beehive and test B2/S23 (Should remain a beehive)
-		test_game_beehive = ConwayGOLGrid(6, 6, [(2, 3), (2, 4), (3, 2), (3, 5), (4, 3), (4, 4)],
-			optimized=True, variant="B3/S23")
-		cells_before_update = test_game_beehive.get_living()
-		test_game_beehive.update()
-		cells_after_update = test_game_beehive.get_living()
-		self.assertEqual(cells_before_update, cells_after_update)
-		test_game_beehive.update()
-		cells_after_update2 = test_game_beehive.get_living()
-		self.assertEqual(cells_after_update, cells_after_update2)
-
-	def test_grid_update_blinker(self):
-		"""Test the update function with the B3/S23 rule and a blinker"""
-		# Initialize the board with a blinker (after update should rotate 90 degrees)
-		test_game_blinker = ConwayGOLGrid(4, 4, [(1, 2), (2, 2), (3, 2)],
-			optimized=True, variant="B3/S23")
-		cells_beginning = test_game_blinker.get_living()
-		# Perform an update step and make sure the blinker rotates 90 degrees
-		test_game_blinker.update()
-		# Check to see if the only cells that are alive are the rotated blinker
-		for y in range(test_game_blinker.height):
-			for x in range(test_game_blinker.width):
-				if (x==2 and y==1) or (x==2 and y==2) or (x==2 and y==3):
-					self.assertEqual(test_game_blinker.cells[x][y].is_alive(), True)
-				else:
-					self.assertEqual(test_game_blinker.cells[x][y].is_alive(), False)
-		# Run another update step and make sure the blinker returns to original
-		test_game_blinker.update()
-		cells_after_update2 = test_game_blinker.get_living()
-		self.assertEqual(cells_beginning, cells_after_update2)
-
-	def test_grid_update_toad(self):
-		"""Test the update functionw with the B3/S23 rule and a toad"""
-		# Initialize the board with a toad (after update should blink then return)
-		test_game_toad = ConwayGOLGrid(6, 6, [(3, 3),(3, 4),(3, 5),(4, 2),(4, 3),(4, 4)],
-			optimized=True, variant="B3/S23")
-		cells_beginning = test_game_toad.get_living()
-		# Perform an update step and make sure the toad transforms correctly
-		test_game_toad.update()
-		# Check to see if the correct cells are alive
-		for y in range(test_game_toad.height):
-			for x in range(test_game_toad.width):
-				if ((x==2 and y==4) or (x==3 and y==2) or (x==3 and y==5) or 
-					(x==4 and y==2) or (x==4 and y==5) or (x==5 and y==3)):
-					self.assertEqual(test_game_toad.cells[x][y].is_alive(), True)
-				else:
-					self.assertEqual(test_game_toad.cells[x][y].is_alive(), False)
-		# Run another update step and make sure the toad returns to original
-		test_game_toad.update()
-		cells_after_update2 =test_game_toad.get_living()
-		self.assertEqual(cells_beginning, cells_after_update2)
-
-
-
-class TestConwayImplementation(unittest.TestCase):
-	def test_original_vs_optimized_b3s23(self):
-		"""Test the original vs. optimized implementation to make sure they update the same."""
-		# Initialize two Conway Grids (both the same)
-		test_game_original = ConwayGOLGrid(10, 10, optimized=True, variant="B3/S23")
-		test_game_optimized = deepcopy(test_game_original)
-		cells_original = test_game_original.get_living()
-		cells_optimized = test_game_optimized.get_living()
-		# Make sure the two grids are the same before update
-		self.assertEqual(cells_original, cells_optimized)
-		# Update for both grids
-		test_game_original.update()
-		test_game_optimized.update()
-		cells_original_after = test_game_original.get_living()
-		cells_optimized_after = test_game_original.get_living()
-		# Make sure the two grids are the same after update
-		self.assertEqual(cells_original_after, cells_optimized_after)
-
-	def test_original_vs_optimized_b6s16(self):
-		"""Test the original vs. optimized implementation to make sure they update the same."""
-		# Initialize two Conway Grids (both the same)
-		test_game_original = ConwayGOLGrid(10, 10, optimized=True, variant="B6/S16")
-		test_game_optimized = deepcopy(test_game_original)
-		cells_original = test_game_original.get_living()
-		cells_optimized = test_game_optimized.get_living()
-		# Make sure the two grids are the same before update
-		self.assertEqual(cells_original, cells_optimized)
-		# Update for both grids
-		test_game_original.update()
-		test_game_optimized.update()
-		cells_original_after = test_game_original.get_living()
-		cells_optimized_after = test_game_original.get_living()
-		# Make sure the two grids are the same after update
-		self.assertEqual(cells_original_after, cells_optimized_after)
-
-	def test_original_vs_optimized_b1s12(self):
-		"""Test the original vs. optimized implementation to make sure they update the same."""
-		# Initialize two Conway Grids (both the same)
-		test_game_original = ConwayGOLGrid(10, 10, optimized=True, variant="B1/S12")
-		test_game_optimized = deepcopy(test_game_original)
-		cells_original = test_game_original.get_living()
-		cells_optimized = test_game_optimized.get_living()
-		# Make sure the two grids are the same before update
-		self.assertEqual(cells_original, cells_optimized)
-		# Update for both grids
-		test_game_original.update()
-		test_game_optimized.update()
-		cells_original_after = test_game_original.get_living()
-		cells_optimized_after = test_game_original.get_living()
-		# Make sure the two grids are the same after update
-		self.assertEqual(cells_original_after, cells_optimized_after)
-
-	def test_original_vs_optimized_b36s23(self):
-		"""Test the original vs. optimized implementation to make sure they update the same."""
-		# Initialize two Conway Grids (both the same)
-		test_game_original = ConwayGOLGrid(10, 10, optimized=True, variant="B36/S23")
-		test_game_optimized = deepcopy(test_game_original)
-		cells_original = test_game_original.get_living()
-		cells_optimized = test_game_optimized.get_living()
-		# Make sure the two grids are the same before update
-		self.assertEqual(cells_original, cells_optimized)
-		# Update for both grids
-		test_game_original.update()
-		test_game_optimized.update()
-		cells_original_after = test_game_original.get_living()
-		cells_optimized_after = test_game_original.get_living()
-		# Make sure the two grids are the same after update
-		self.assertEqual(cells_original_after, cells_optimized_after)
-
-	def test_original_vs_optimized_b2s3(self):
-		"""Test the original vs. optimized implementation to make sure they update the same."""
-		# Initialize two Conway Grids (both the same)
-		test_game_original = ConwayGOLGrid(10, 10, optimized=True, variant="B2/S3")
-		test_game_optimized = deepcopy(test_game_original)
-		cells_original = test_game_original.get_living()
-		cells_optimized = test_game_optimized.get_living()
-		# Make sure the two grids are the same before update
-		self.assertEqual(cells_original, cells_optimized)
-		# Update for both grids
-		test_game_original.update()
-		test_game_optimized.update()
-		cells_original_after = test_game_original.get_living()
-		cells_optimized_after = test_game_original.get_living()
-		# Make sure the two grids are the same after update
-		self.assertEqual(cells_original_after, cells_optimized_after)
-
-	def test_original_vs_optimized_b2s(self):
-		"""Test the original vs. optimized implementation to make sure they update the same."""
-		# Initialize two Conway Grids (both the same)
-		test_game_original = ConwayGOLGrid(10, 10, optimized=True, variant="B2/S")
-		test_game_optimized = deepcopy(test_game_original)
-		cells_original = test_game_original.get_living()
-		cells_optimized = test_game_optimized.get_living()
-		# Make sure the two grids are the same before update
-		self.assertEqual(cells_original, cells_optimized)
-		# Update for both grids
-		test_game_original.update()
-		test_game_optimized.update()
-		cells_original_after = test_game_original.get_living()
-		cells_optimized_after = test_game_original.get_living()
-		# Make sure the two grids are the same after update
-		self.assertEqual(cells_original_after, cells_optimized_after)
-
-
-
-# Main function to test Conway's Game of Life
 if __name__ == '__main__':
     # Incorrect command line parameters runs the automated tests
     if len(sys.argv) != 6:
         print "Incorrect command line parameters."
         print "Usages: python conway.py <size> <optimization> <variant> <iterations> <initial grid>"
+        print "        <initial grid> is a built in pattern or a .rle, .lif or .cells file"
         print "\nRunning automated tests."
 
+        import unittest
+        from test_conway import TestConwayCell, TestConwayGrid, TestConwayImplementation
+
         cell_suite = unittest.TestLoader().loadTestsFromTestCase(TestConwayCell)
         unittest.TextTestRunner().run(cell_suite)
 
@@ -696,32 +1208,10 @@ if __name__ == '__main__':
         initial = str(sys.argv[5])
 
         # Determine which grid to use and create it
-        if initial == "block":
-            initial_grid = [(size/2-1,size/2-1),(size/2-1,size/2),
-                            (size/2,size/2-1),(size/2,size/2)]
-        elif initial == "blinker":
-            initial_grid = [(size/2-1,size/2),(size/2,size/2),(size/2+1,size/2)]
-        elif initial == "toad":
-            initial_grid = [(size/2-1,size/2-1),(size/2-1,size/2),(size/2-1,size/2+1),
-                (size/2,size/2-2),(size/2,size/2-1),(size/2,size/2)]
-        elif initial == "glider":
-            initial_grid = [(3,4),(4,2),(4,4),(5,3),(5,4)]
-        elif initial == "lightweight_spaceship":
-            initial_grid = [(size/2-1,3),(size/2-1,4),(size/2-1,5),
-                                 (size/2-1,6),(size/2-1,7),(size/2,2),
-                                 (size/2,7),(size/2+1,7),
-                                 (size/2+2,2),(size/2+2,6)]
-        elif initial == "glider_gun":
-            initial_grid = [(1,5),(1,6),(2,5),(2,6),(11,5),(11,6),(11,7),
-                      (12,4),(12,8),(13,3),(13,9),(14,3),(14,9),(15,6),
-                      (16,4),(16,8),(17,5),(17,6),(17,7),(18,6),(21,3),
-                      (21,4),(21,5),(22,3),(22,4),(22,5),(23,2),(23,6),
-                      (25,1),(25,2),(25,6),(25,7),(35,3),(35,4),(36,3),
-                      (36,4),(35,22),(35,23),(35,25),(36,22),(36,23),(36,25),
-                      (36,26),(36,27),(37,28),(38,22),(38,23),(38,25),(38,26),
-                      (38,27),(39,23),(39,25),(40,23),(40,25),(41,24)]
-        elif initial == "sierpinski":
-            initial_grid = [(size/2,size/2)]
+        initial_grid = initial_cells(initial, size)
+
+        # Only the interactive viewer needs matplotlib (see conway_cli.py)
+        import matplotlib.pyplot as plt
 
         fig = plt.figure(1)
         ax = plt.gca()
@@ -735,9 +1225,11 @@ if __name__ == '__main__':
 
             # "Play" the game of life
             count = 0
+            game.detect_cycles()
             while count < max_iterations and game.update():
                 count += 1
                 game.print_grid(im, fig, opt)
+                ax.set_title("Generation %(generation)d, population %(population)d" % game.stats())
 
                 if opt == 2:
                     new_fig = plt.figure(2)
@@ -747,5 +1239,14 @@ if __name__ == '__main__':
                     plt.figure(1)
 
                 plt.pause(0.05)
-            
+
+                # Oscillators and still lifes would run until max_iterations
+                if game.period is not None:
+                    break
+
+            # Starting over would only repeat the same cycle
+            if game.period is not None:
+                print "Cycle of period", game.period, "found after", count, "iterations."
+                break
+
         print "Finished after ", count, "iterations."
@@ -0,0 +1,412 @@
+# Benchmark suite for the Game of Life engines.
+# Runs every combination of engine, grid size, rule, starting pattern and
+# density, times each generation after a warmup, and writes the results as
+# JSON so runs from different releases can be compared.
+#
+# Each case runs in a fresh interpreter, so its memory figures are its own:
+# without tracemalloc (Python 2) the peak resident set size only ever grows
+# within a process.
+#
+# The startup time of each engine (importing conway in a fresh interpreter and
+# running one small update) is measured too, for short lived worker processes.
+#
+# Usage: python conway_benchmark.py --engines 1 3 4 --sizes 64 256 --output bench.json
+#        python conway_benchmark.py --baseline bench.json   (fails on regressions)
+
+import argparse
+import ast
+import gc
+import json
+import math
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import timeit
+
+from conway import ConwayGOLGrid, ENGINES, PATTERNS, initial_cells
+
+# tracemalloc only exists on Python 3.4+; without it the peak resident set
+# size of the process is reported instead.
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+# Run by startup_case in a fresh interpreter.  The quadtree modes print to
+# stdout, so the results are the last line of the output.
+_STARTUP_SCRIPT = """
+import json, sys, timeit
+start = timeit.default_timer()
+import conway
+imported = timeit.default_timer()
+game = conway.ConwayGOLGrid(16, 16, conway.initial_cells("glider", 16), optimized=%d)
+game.update()
+game.close()
+done = timeit.default_timer()
+sys.stdout.write("\\n" + json.dumps({
+    "import_seconds": imported - start,
+    "first_update_seconds": done - imported,
+    "modules": len(sys.modules),
+    "heavy_modules": sorted(m for m in ("numpy", "matplotlib", "unittest", "multiprocessing")
+                            if m in sys.modules),
+}) + "\\n")
+"""
+
+# Run by isolated_case in a fresh interpreter, with the arguments of run_case
+# as a Python literal.
+_CASE_SCRIPT = """
+import ast, json, sys
+from conway_benchmark import run_case
+result = run_case(**ast.literal_eval(sys.argv[1]))
+sys.stdout.write("\\n" + json.dumps(result) + "\\n")
+"""
+
+
+def percentile(values, fraction):
+    """
+    Returns the nearest rank percentile of a list of values.
+
+    Parameters
+    ----------
+    values: sorted list of numbers
+    fraction: percentile between 0 and 1
+
+    Returns
+    -------
+    The smallest value with at least fraction of the values at or below it
+    """
+    rank = min(max(int(math.ceil(fraction * len(values))), 1), len(values))
+    return values[rank - 1]
+
+
+def start_cells(pattern, size, density, seed):
+    """
+    Returns the starting cells of a benchmark case.
+
+    Parameters
+    ----------
+    pattern: name of a built in pattern (see conway.PATTERNS)
+    size: width and height of the board
+    density: percentage of living cells for the random pattern
+    seed: seed of the random pattern, so every engine gets the same board
+
+    Returns
+    -------
+    list of coordinates (x, y)
+    """
+    if pattern != "random":
+        return initial_cells(pattern, size)
+
+    rng = random.Random(seed)
+    cells = [(x, y) for x in range(size) for y in range(size) if rng.random() * 100 < density]
+    # An empty list would make ConwayGOLGrid seed its own random board
+    return cells or [(size // 2, size // 2)]
+
+
+def run_case(engine, size, rule, pattern, density, topology, generations, warmup, seed,
+             prune="eager"):
+    """
+    Runs one benchmark case.
+
+    Parameters
+    ----------
+    engine: optimized mode of ConwayGOLGrid
+    size: width and height of the board
+    rule: Life-like rule
+    pattern, density, seed: starting cells (see start_cells)
+    topology: topology of the board
+    generations: number of timed generations
+    warmup: number of generations run before timing starts
+    prune: pruning policy of the quadtree engine
+
+    Returns
+    -------
+    dict of results
+    """
+    if generations < 1:
+        raise ValueError("at least one generation has to be timed")
+
+    # Peak resident set size before the case, so a fresh process reports
+    # how much the case itself added
+    rss_start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    cells = start_cells(pattern, size, density, seed)
+    gc.collect()
+    if tracemalloc is not None:
+        tracemalloc.start()
+
+    timer = timeit.default_timer
+    start = timer()
+    game = ConwayGOLGrid(size, size, cells, optimized=engine, variant=rule, topology=topology,
+                         prune=prune)
+    setup = timer() - start
+
+    for generation in range(warmup):
+        game.update()
+
+    latencies = []
+    for generation in range(generations):
+        start = timer()
+        game.update()
+        latencies.append(timer() - start)
+
+    population = sum(map(sum, game.get_living()))
+    node_counts = game.tree.node_counts() if engine in (2, 7) else None
+    game.close()
+
+    peak_alloc = None
+    if tracemalloc is not None:
+        peak_alloc = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    total = sum(latencies)
+    latencies.sort()
+
+    return {
+        "engine": engine,
+        "engine_name": ENGINES.get(engine, str(engine)),
+        "size": size,
+        "rule": rule,
+        "pattern": pattern,
+        "density": density if pattern == "random" else None,
+        "topology": topology,
+        "warmup": warmup,
+        "generations": generations,
+        "setup_seconds": setup,
+        "latency_seconds": {
+            "mean": total / len(latencies),
+            "p50": percentile(latencies, 0.50),
+            "p90": percentile(latencies, 0.90),
+            "p99": percentile(latencies, 0.99),
+            "max": latencies[-1],
+        },
+        "cells_per_second": size * size * generations / total if total > 0 else None,
+        "final_population": population,
+        "prune": prune if engine in (2, 7) else None,
+        "quadtree_nodes": node_counts,
+        "peak_alloc_bytes": peak_alloc,
+        # Peak of the process running the case, on Linux in kilobytes, and
+        # how much it grew during the case
+        "max_rss_kb": max_rss,
+        "rss_growth_kb": max_rss - rss_start,
+    }
+
+
+def isolated_case(**kwargs):
+    """
+    Runs one benchmark case in a fresh interpreter, so its peak memory is
+    not hidden by the cases run before it.
+
+    Parameters
+    ----------
+    kwargs: arguments of run_case
+
+    Returns
+    -------
+    dict of results (see run_case)
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    output = subprocess.check_output([sys.executable, "-c", _CASE_SCRIPT, repr(kwargs)], cwd=here)
+    # The quadtree modes print to stdout, so the results are the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def startup_case(engine, repeats):
+    """
+    Measures how long a fresh process takes to import conway and update a
+    small board with one engine.
+
+    Parameters
+    ----------
+    engine: optimized mode of ConwayGOLGrid
+    repeats: number of processes started
+
+    Returns
+    -------
+    dict of results with the median of each time
+    """
+    timer = timeit.default_timer
+    here = os.path.dirname(os.path.abspath(__file__))
+    runs = []
+
+    for n in range(repeats):
+        start = timer()
+        output = subprocess.check_output([sys.executable, "-c", _STARTUP_SCRIPT % engine], cwd=here)
+        run = json.loads(output.strip().splitlines()[-1])
+        run["process_seconds"] = timer() - start
+        runs.append(run)
+
+    median = lambda key: percentile(sorted(run[key] for run in runs), 0.50)
+    return {
+        "engine": engine,
+        "engine_name": ENGINES.get(engine, str(engine)),
+        "repeats": repeats,
+        "import_seconds": median("import_seconds"),
+        "first_update_seconds": median("first_update_seconds"),
+        "process_seconds": median("process_seconds"),
+        "modules": runs[-1]["modules"],
+        "heavy_modules": runs[-1]["heavy_modules"],
+    }
+
+
+def compare_startup(results, baseline, tolerance):
+    """
+    Compares median process startup times against a previous run.
+
+    Parameters
+    ----------
+    results: list of startup result dicts of this run
+    baseline: list of startup result dicts of the previous run
+    tolerance: allowed slowdown as a fraction
+
+    Returns
+    -------
+    list of (result, baseline result, ratio) for every regressed engine
+    """
+    previous = dict((r["engine"], r) for r in baseline)
+    regressions = []
+
+    for result in results:
+        old = previous.get(result["engine"])
+        if old is None:
+            continue
+        ratio = result["process_seconds"] / max(old["process_seconds"], 1e-12)
+        if ratio > 1 + tolerance:
+            regressions.append((result, old, ratio))
+
+    return regressions
+
+
+def case_key(result):
+    """
+    Returns the fields that identify a benchmark case.
+    """
+    return (result["engine"], result["size"], result["rule"], result["pattern"],
+            result["density"], result["topology"], result.get("prune"))
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares median latencies against a previous run.
+
+    Parameters
+    ----------
+    results: list of result dicts of this run
+    baseline: list of result dicts of the previous run
+    tolerance: allowed slowdown as a fraction (0.1 is 10% slower)
+
+    Returns
+    -------
+    list of (result, baseline result, ratio) for every regressed case
+    """
+    previous = dict((case_key(r), r) for r in baseline)
+    regressions = []
+
+    for result in results:
+        old = previous.get(case_key(result))
+        if old is None:
+            continue
+        ratio = result["latency_seconds"]["p50"] / max(old["latency_seconds"]["p50"], 1e-12)
+        if ratio > 1 + tolerance:
+            regressions.append((result, old, ratio))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Game of Life engines.")
+    parser.add_argument("--engines", type=int, nargs="+", default=sorted(ENGINES),
+                        help="optimized modes to run (default: %(default)s)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 32, 64, 128],
+                        help="board widths (default: %(default)s)")
+    parser.add_argument("--rules", nargs="+", default=["B3/S23"],
+                        help="Life-like rules (default: %(default)s)")
+    parser.add_argument("--patterns", nargs="+", default=["random"], choices=PATTERNS,
+                        help="starting patterns (default: %(default)s)")
+    parser.add_argument("--densities", type=float, nargs="+", default=[30],
+                        help="percent of living cells for the random pattern (default: %(default)s)")
+    parser.add_argument("--topology", default="bounded", choices=["bounded", "torus", "klein"])
+    parser.add_argument("--prune", default="eager", choices=["eager", "batch", "threshold", "never"],
+                        help="pruning policy of the quadtree engine (default: %(default)s)")
+    parser.add_argument("--generations", type=int, default=100,
+                        help="timed generations per case (default: %(default)s)")
+    parser.add_argument("--warmup", type=int, default=5,
+                        help="untimed generations before timing (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random pattern")
+    parser.add_argument("--same-process", action="store_true",
+                        help="run every case in this process; faster, but max_rss_kb is then "
+                             "the peak of all cases so far")
+    parser.add_argument("--startup-repeats", type=int, default=5,
+                        help="fresh processes started per engine to time startup, 0 to skip "
+                             "(default: %(default)s)")
+    parser.add_argument("--output", default="benchmark.json",
+                        help="JSON file to write (default: %(default)s)")
+    parser.add_argument("--baseline", help="JSON file of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="allowed median slowdown against the baseline (default: %(default)s)")
+    args = parser.parse_args(argv)
+    if args.generations < 1:
+        parser.error("--generations must be at least 1")
+
+    case = run_case if args.same_process else isolated_case
+    results = []
+    for size in args.sizes:
+        for rule in args.rules:
+            for pattern in args.patterns:
+                densities = args.densities if pattern == "random" else [None]
+                for density in densities:
+                    for engine in args.engines:
+                        result = case(engine=engine, size=size, rule=rule, pattern=pattern,
+                                      density=density, topology=args.topology,
+                                      generations=args.generations, warmup=args.warmup,
+                                      seed=args.seed, prune=args.prune)
+                        results.append(result)
+                        sys.stderr.write("%-10s %5d %-8s %-12s p50 %.6fs  p99 %.6fs  %.3g cells/s\n" % (
+                            result["engine_name"], size, rule, pattern,
+                            result["latency_seconds"]["p50"], result["latency_seconds"]["p99"],
+                            result["cells_per_second"] or 0))
+
+    startup = []
+    if args.startup_repeats > 0:
+        for engine in args.engines:
+            result = startup_case(engine, args.startup_repeats)
+            startup.append(result)
+            sys.stderr.write("%-10s startup %.4fs  import %.4fs  first update %.4fs  %d modules\n" % (
+                result["engine_name"], result["process_seconds"], result["import_seconds"],
+                result["first_update_seconds"], result["modules"]))
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "memory_metric": "tracemalloc" if tracemalloc is not None else "rss_growth_kb",
+        "results": results,
+        "startup": startup,
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for result, old, ratio in regressions:
+            sys.stderr.write("REGRESSION %s size %d %s %s: p50 %.6fs -> %.6fs (%.2fx)\n" % (
+                result["engine_name"], result["size"], result["rule"], result["pattern"],
+                old["latency_seconds"]["p50"], result["latency_seconds"]["p50"], ratio))
+        startup_regressions = compare_startup(startup, baseline.get("startup", []), args.tolerance)
+        for result, old, ratio in startup_regressions:
+            sys.stderr.write("REGRESSION %s startup: %.4fs -> %.4fs (%.2fx)\n" % (
+                result["engine_name"], old["process_seconds"], result["process_seconds"], ratio))
+        if regressions or startup_regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,260 @@
+# Headless command line for the Game of Life.
+# Runs any engine without a display and without importing matplotlib:
+#
+#   python conway_cli.py run --engine 3 --size 512 --pattern gun.rle --generations 10000
+#   python conway_cli.py run --resume run.gol --checkpoint run.gol --checkpoint-every 1000
+#   python conway_cli.py benchmark --engines 1 3 --sizes 256   (see conway_benchmark.py)
+#   python conway_cli.py convert breeder.rle breeder.cells
+#
+# run prints the final generation, population, bounding box and speed, stops
+# early when the board dies out or repeats, and can write RLE snapshots and
+# binary checkpoints to resume from (see GoLcheckpoint.py).
+
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+
+from conway import ConwayGOLGrid, ENGINES, PATTERNS, initial_cells, load_checkpoint
+from GoLpatterns import FORMATS, GoLPattern, write_pattern
+from GoLcheckpoint import GoLCheckpoint
+
+# Pattern format written for each file extension
+EXTENSIONS = {"rle": "rle", "lif": "life106", "life": "life106", "cells": "cells"}
+
+
+def start_pattern(pattern, width, height):
+    """
+    Returns the starting cells and rule of a run.
+
+    Parameters
+    ----------
+    pattern: name of a built in pattern (see conway.PATTERNS) or a pattern file
+    width, height: size of the board
+
+    Returns
+    -------
+    (cells, rule) where cells is a list of coordinates or a GoLPattern, which
+    ConwayGOLGrid centers on the board, and rule is the rule given in the
+    pattern file, or None
+    """
+    if pattern in PATTERNS:
+        return initial_cells(pattern, width), None
+
+    # Read by the engine itself, so the unbounded ones get every cell
+    pattern = GoLPattern(pattern)
+    return pattern, pattern.rule
+
+
+def write_snapshot(game, path):
+    """
+    Writes the board of a game to an RLE file.
+    """
+    with open(path, "w") as f:
+        write_pattern(f, game.get_living_array(), "rle", game.variant)
+
+
+def run(args):
+    """
+    Runs one game and prints its final stats.
+
+    Parameters
+    ----------
+    args: parsed arguments of the run subcommand
+
+    Returns
+    -------
+    Exit status
+    """
+    if args.seed is not None:
+        random.seed(args.seed)
+        import numpy as np
+        np.random.seed(args.seed)
+
+    timer = timeit.default_timer
+    engine = args.engine
+    if args.resume:
+        # The board, rule, topology and generation all come from the checkpoint
+        if engine is None:
+            with GoLCheckpoint(args.resume) as checkpoint:
+                engine = checkpoint.engine
+        start = timer()
+        game = load_checkpoint(args.resume, engine)
+        setup = timer() - start
+    else:
+        if engine is None:
+            engine = 1
+        height = args.height or args.size
+        cells, pattern_rule = start_pattern(args.pattern, args.size, height)
+        rule = args.rule or pattern_rule or "B3/S23"
+
+        start = timer()
+        game = ConwayGOLGrid(args.size, height, cells, optimized=engine, variant=rule,
+                             topology=args.topology, prune=args.prune)
+        setup = timer() - start
+
+    # Looking for cycles means stepping one generation at a time, which
+    # Hashlife would rather not do
+    cycle_history = args.cycle_history
+    if cycle_history is None:
+        cycle_history = 0 if engine == 4 else 64
+    if cycle_history:
+        game.detect_cycles(cycle_history)
+
+    first = game.generation
+    start = timer()
+    if engine == 4 and not cycle_history and not args.snapshot_every and \
+            not args.checkpoint_every:
+        # Nothing to look at in between, so Hashlife can take big jumps
+        game.advance(max(args.generations - first, 0))
+    else:
+        while game.generation < args.generations:
+            game.update()
+            if args.snapshot_every and game.generation % args.snapshot_every == 0:
+                write_snapshot(game, "%s_%06d.rle" % (args.snapshot, game.generation))
+            if args.checkpoint_every and game.generation % args.checkpoint_every == 0:
+                game.save_checkpoint(args.checkpoint)
+            if game.period is not None or game.population() == 0:
+                break
+    elapsed = timer() - start
+
+    stats = game.stats()
+    stats.update({
+        "engine": ENGINES.get(engine, str(engine)),
+        "rule": game.variant,
+        "topology": game.topology,
+        "period": game.period,
+        "setup_seconds": setup,
+        "seconds": elapsed,
+        "generations_per_second": (game.generation - first) / elapsed if elapsed > 0 else None,
+    })
+    if args.output:
+        write_snapshot(game, args.output)
+    if args.checkpoint:
+        game.save_checkpoint(args.checkpoint)
+    game.close()
+
+    if args.json:
+        print json.dumps(stats, sort_keys=True)
+    else:
+        print "engine %(engine)s, rule %(rule)s, topology %(topology)s" % stats
+        print "generation %(generation)d, population %(population)d" % stats
+        print "bounding box", stats["bounding_box"]
+        if stats["period"] is not None:
+            print "stopped on a cycle of period %(period)d" % stats
+        elif stats["population"] == 0:
+            print "stopped after the board died out"
+        print "%.3fs (%.3g generations/s), setup %.3fs" % (
+            elapsed, stats["generations_per_second"] or 0, setup)
+
+    return 0
+
+
+def benchmark(args):
+    """
+    Runs the benchmark suite with the remaining arguments (see conway_benchmark.py).
+    """
+    import conway_benchmark
+
+    return conway_benchmark.main(args.extra)
+
+
+def convert(args):
+    """
+    Converts a pattern file to another format.
+
+    Parameters
+    ----------
+    args: parsed arguments of the convert subcommand
+
+    Returns
+    -------
+    Exit status
+    """
+    format = args.format
+    if format is None:
+        extension = os.path.splitext(args.output)[1].lstrip(".").lower()
+        if extension not in EXTENSIONS:
+            sys.stderr.write("Cannot tell the format of %s, use --format\n" % (args.output,))
+            return 2
+        format = EXTENSIONS[extension]
+
+    pattern = GoLPattern(args.input)
+    box = pattern.bounding_box()
+    if box is None:
+        box = (0, 0, 0, 0)
+    x0, y0, x1, y1 = box
+    mask = pattern.mask(x1 - x0 + 1, y1 - y0 + 1, -x0, -y0)
+
+    with open(args.output, "w") as f:
+        write_pattern(f, mask, format, args.rule or pattern.rule)
+
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Game of Life without a display.")
+    commands = parser.add_subparsers(dest="command")
+
+    parser_run = commands.add_parser("run", help="run one game and print its final stats")
+    parser_run.add_argument("--engine", type=int, choices=sorted(ENGINES),
+                            help="optimized mode of ConwayGOLGrid (default: 1, or the "
+                                 "checkpoint's engine with --resume)")
+    parser_run.add_argument("--size", type=int, default=100, help="board width (default: %(default)s)")
+    parser_run.add_argument("--height", type=int, help="board height (default: the width)")
+    parser_run.add_argument("--rule", help="Life-like rule (default: the pattern file's rule or B3/S23)")
+    parser_run.add_argument("--topology", default="bounded", choices=["bounded", "torus", "klein"])
+    parser_run.add_argument("--prune", default="eager", choices=["eager", "batch", "threshold", "never"],
+                            help="pruning policy of the quadtree engines (default: %(default)s)")
+    parser_run.add_argument("--pattern", default="random",
+                            help="built in pattern (%s) or pattern file (default: %%(default)s)"
+                            % ", ".join(PATTERNS))
+    parser_run.add_argument("--generations", type=int, default=100,
+                            help="generations to run (default: %(default)s)")
+    parser_run.add_argument("--cycle-history", type=int,
+                            help="stop when the board repeats within this many generations, "
+                                 "0 to never stop early.  Cycles are looked for every "
+                                 "generation, which keeps Hashlife (engine 4) from jumping "
+                                 "many generations at once (default: 64, 0 for engine 4)")
+    parser_run.add_argument("--snapshot-every", type=int, default=0,
+                            help="write an RLE snapshot every this many generations")
+    parser_run.add_argument("--snapshot", default="snapshot",
+                            help="file name prefix of the snapshots (default: %(default)s)")
+    parser_run.add_argument("--output", help="RLE file to write the final board to")
+    parser_run.add_argument("--checkpoint",
+                            help="binary checkpoint to write the final board to (see --resume)")
+    parser_run.add_argument("--checkpoint-every", type=int, default=0,
+                            help="also write the checkpoint every this many generations")
+    parser_run.add_argument("--resume", help="checkpoint to start from instead of a pattern; "
+                                             "--generations counts from its generation")
+    parser_run.add_argument("--seed", type=int, help="seed of the random pattern")
+    parser_run.add_argument("--json", action="store_true", help="print the stats as JSON")
+    parser_run.set_defaults(handler=run)
+
+    # Every other argument is passed on to conway_benchmark.py
+    parser_benchmark = commands.add_parser("benchmark", add_help=False,
+                                           help="run the benchmark suite "
+                                                "(takes the arguments of conway_benchmark.py)")
+    parser_benchmark.set_defaults(handler=benchmark)
+
+    parser_convert = commands.add_parser("convert", help="convert a pattern file")
+    parser_convert.add_argument("input", help="RLE, Life 1.06 or plaintext file")
+    parser_convert.add_argument("output", help="file to write")
+    parser_convert.add_argument("--format", choices=FORMATS,
+                                help="format to write (default: from the output extension)")
+    parser_convert.add_argument("--rule", help="rule to write into an RLE header")
+    parser_convert.set_defaults(handler=convert)
+
+    args, args.extra = parser.parse_known_args(argv)
+    if args.extra and args.command != "benchmark":
+        parser.error("unrecognized arguments: %s" % " ".join(args.extra))
+    if args.command == "run" and args.checkpoint_every and not args.checkpoint:
+        parser.error("--checkpoint-every needs --checkpoint")
+
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1 @@
+python ../conway_cli.py run --engine 4 --size 64 --pattern glider_gun --generations 100000 --cycle-history 0
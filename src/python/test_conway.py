@@ -0,0 +1,950 @@
+# Unit tests for conway.py and the engine modules it uses.
+# Run with python -m unittest test_conway, or python conway.py without arguments.
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from random import randint, seed
+from copy import deepcopy
+import numpy as np
+from conway import ConwayGOLGrid, initial_cells, load_checkpoint
+from GoLquadtree import GoLNode, GoLQuadTree
+from GoLarray import GoLArray
+from GoLtiles import GoLTiles
+from GoLbits import GoLBits
+from GoLrules import parse_rule, compile_rule, rule_string
+from GoLpatterns import GoLPattern, mask_cells, load_pattern, write_pattern
+from GoLcheckpoint import GoLCheckpoint
+from GoLhashlife import GoLHashlife
+from GoLcycles import cells_hash, array_hash
+
+
+# Write a set of unit tests to check the functionality and correctness of each
+# method that is part of class above.
+class TestConwayCell(unittest.TestCase):
+	def test_cell_is_alive(self):
+		"""Test status of each cell (living or dead)."""
+		# Initialize a Conway Grid with a few living cells.
+		# Alive cells: (1,3), (3,6), (5,5), (7,2), (9,6)
+		test_game = ConwayGOLGrid(10, 10, [(1, 3), (3, 6), (5, 5), (7, 2), (9, 6)], 
+			optimized=True, variant="B1/S12")
+		self.assertEqual(test_game.cells[1][3].is_alive(), True)	# Live cell
+		self.assertEqual(test_game.cells[3][6].is_alive(), True)	# Live cell
+		self.assertEqual(test_game.cells[5][5].is_alive(), True)	# Live cell
+		self.assertEqual(test_game.cells[7][2].is_alive(), True)	# Live cell
+		self.assertEqual(test_game.cells[9][6].is_alive(), True)	# Live cell
+		self.assertEqual(test_game.cells[1][1].is_alive(), False)	# Dead cell
+		self.assertEqual(test_game.cells[5][4].is_alive(), False)	# Dead cell
+		self.assertEqual(test_game.cells[9][9].is_alive(), False)	# Dead cell
+
+	def test_cell_spawn(self):
+		"""Test spawning a cell (brining to life a dead cell)."""
+		# Initialize a Conway Grid with a few living cells.
+		# Alive cells: (1,3), (3,6), (5,5), (7,2), (9,6)
+		test_game = ConwayGOLGrid(10, 10, [(1, 3), (3, 6), (5, 5), (7, 2), (9, 6)], 
+			optimized=True, variant="B1/S12")
+		self.assertEqual(test_game.cells[9][6].is_alive(), True)	# Live cell
+		self.assertEqual(test_game.cells[1][1].is_alive(), False)	# Dead cell
+		# Spawn a cell on the grid in position (1,1)
+		test_game.cells[1][1].spawn()
+		self.assertEqual(test_game.cells[1][1].is_alive(), True)	# New live cell
+
+	def test_cell_die(self):
+		"""Test killing a cell (taking the live from an alive cell)."""
+		# Initialize a Conway Grid with a few living cells.
+		# Alive cells: (1,3), (3,6), (5,5), (7,2), (9,6)
+		test_game = ConwayGOLGrid(10, 10, [(1, 3), (3, 6), (5, 5), (7, 2), (9, 6)], 
+			optimized=True, variant="B1/S12")
+		self.assertEqual(test_game.cells[9][6].is_alive(), True)	# Live cell
+		self.assertEqual(test_game.cells[1][1].is_alive(), False)	# Dead cell
+		test_game.cells[9][6].die()
+		self.assertEqual(test_game.cells[9][6].is_alive(), False)	# New dead cell
+
+	def test_cell_num_neighbors(self):
+		"""Test the number of neighbors that are alive for a given cell."""
+		# Initialize a Conway Grid with a few living cells.
+		# Alive cells: (1,2), (1,3), (2,1), (3,1), (3,3),
+		#			   (6,6), (6,7), (7,7), (7,8), (8,8)
+		test_game = ConwayGOLGrid(10, 10, [(1, 2), (1, 3), (2, 1), (3, 1), (3, 3),
+			(6, 6), (6, 7), (7, 7), (7, 8), (8, 8)], optimized=True, variant="B1/S12")
+		# Test to make sure method works on dead cells
+		self.assertEqual(test_game.cells[2][2].num_neighbors(test_game), 5)	# (2, 2) has 5 neighbors
+		# Test to make sure method works on alive cells
+		self.assertEqual(test_game.cells[7][7].num_neighbors(test_game), 4)
+
+
+
+class TestConwayGrid(unittest.TestCase):
+	def test_grid_compact_cells(self):
+		"""Test that cell views read and write the grid's compact cell storage."""
+		test_game = ConwayGOLGrid(6, 4, [(5, 3)], optimized=0, variant="B3/S23")
+		# One byte per cell, stored column by column
+		self.assertEqual(len(test_game.cells.state), 24)
+		self.assertEqual(test_game.cells.state[5 * 4 + 3], 1)
+		test_game.cells[0][2].spawn()
+		self.assertEqual(test_game.cells.state[0 * 4 + 2], 1)
+		self.assertEqual(test_game.cells[0][1].num_neighbors(test_game), 1)
+		self.assertEqual(test_game.cells[-1][-1].is_alive(), True)
+		self.assertRaises(IndexError, lambda: test_game.cells[6])
+
+	def test_grid_get_living(self):
+		"""Test the get living function to make sure it returns the correct grid."""
+		# Initialize a Conway Grid with a few living cells (on a 5x5 grid)
+		# Alive cells: (1,1), (2,4), (3,1), (4,3)
+		test_game = ConwayGOLGrid(5, 5, [(1, 1), (2, 4), (3, 1), (4, 3)],
+			optimized=True, variant="B1/S12")
+		cells = test_game.get_living()
+		for y in range(test_game.height):
+			for x in range(test_game.width):
+				if (x==1 and y==1) or (x==2 and y==4) or (x==3 and y==1) or (x==4 and y==3):
+					self.assertEqual(cells[x][y], True)
+				else:
+					self.assertEqual(cells[x][y], False)
+
+	def test_grid_update_box(self):
+		"""Test the update function with the B3/S23 rule and a box"""
+		# Initialize the board with a box and test B3/S23 (Should remain a box)
+		test_game_box = ConwayGOLGrid(4, 4, [(2, 2), (2, 3), (3, 2), (3, 3)],
+			optimized=True, variant="B3/S23")
+		# Perform an update step and make sure the box remains
+		cells_before_update = test_game_box.get_living()
+		test_game_box.update()
+		cells_after_update = test_game_box.get_living()
+		self.assertEqual(cells_before_update, cells_after_update)
+		test_game_box.update()
+		cells_after_update2 = test_game_box.get_living()
+		self.assertEqual(cells_after_update, cells_after_update2)
+
+	def test_grid_update_beehive(self):
+		"""Test the update function with the B2/S23 rule and a beehive"""
+		# Initialize the board with a beehive and test B2/S23 (Should remain a beehive)
+		test_game_beehive = ConwayGOLGrid(6, 6, [(2, 3), (2, 4), (3, 2), (3, 5), (4, 3), (4, 4)],
+			optimized=True, variant="B3/S23")
+		cells_before_update = test_game_beehive.get_living()
+		test_game_beehive.update()
+		cells_after_update = test_game_beehive.get_living()
+		self.assertEqual(cells_before_update, cells_after_update)
+		test_game_beehive.update()
+		cells_after_update2 = test_game_beehive.get_living()
+		self.assertEqual(cells_after_update, cells_after_update2)
+
+	def test_grid_update_blinker(self):
+		"""Test the update function with the B3/S23 rule and a blinker"""
+		# Initialize the board with a blinker (after update should rotate 90 degrees)
+		test_game_blinker = ConwayGOLGrid(4, 4, [(1, 2), (2, 2), (3, 2)],
+			optimized=True, variant="B3/S23")
+		cells_beginning = test_game_blinker.get_living()
+		# Perform an update step and make sure the blinker rotates 90 degrees
+		test_game_blinker.update()
+		# Check to see if the only cells that are alive are the rotated blinker
+		for y in range(test_game_blinker.height):
+			for x in range(test_game_blinker.width):
+				if (x==2 and y==1) or (x==2 and y==2) or (x==2 and y==3):
+					self.assertEqual(test_game_blinker.cells[x][y].is_alive(), True)
+				else:
+					self.assertEqual(test_game_blinker.cells[x][y].is_alive(), False)
+		# Run another update step and make sure the blinker returns to original
+		test_game_blinker.update()
+		cells_after_update2 = test_game_blinker.get_living()
+		self.assertEqual(cells_beginning, cells_after_update2)
+
+	def test_grid_update_toad(self):
+		"""Test the update functionw with the B3/S23 rule and a toad"""
+		# Initialize the board with a toad (after update should blink then return)
+		test_game_toad = ConwayGOLGrid(6, 6, [(3, 3),(3, 4),(3, 5),(4, 2),(4, 3),(4, 4)],
+			optimized=True, variant="B3/S23")
+		cells_beginning = test_game_toad.get_living()
+		# Perform an update step and make sure the toad transforms correctly
+		test_game_toad.update()
+		# Check to see if the correct cells are alive
+		for y in range(test_game_toad.height):
+			for x in range(test_game_toad.width):
+				if ((x==2 and y==4) or (x==3 and y==2) or (x==3 and y==5) or 
+					(x==4 and y==2) or (x==4 and y==5) or (x==5 and y==3)):
+					self.assertEqual(test_game_toad.cells[x][y].is_alive(), True)
+				else:
+					self.assertEqual(test_game_toad.cells[x][y].is_alive(), False)
+		# Run another update step and make sure the toad returns to original
+		test_game_toad.update()
+		cells_after_update2 =test_game_toad.get_living()
+		self.assertEqual(cells_beginning, cells_after_update2)
+
+
+
+class TestConwayImplementation(unittest.TestCase):
+	def test_original_vs_optimized_b3s23(self):
+		"""Test the original vs. optimized implementation to make sure they update the same."""
+		# Initialize two Conway Grids (both the same)
+		test_game_original = ConwayGOLGrid(10, 10, optimized=True, variant="B3/S23")
+		test_game_optimized = deepcopy(test_game_original)
+		cells_original = test_game_original.get_living()
+		cells_optimized = test_game_optimized.get_living()
+		# Make sure the two grids are the same before update
+		self.assertEqual(cells_original, cells_optimized)
+		# Update for both grids
+		test_game_original.update()
+		test_game_optimized.update()
+		cells_original_after = test_game_original.get_living()
+		cells_optimized_after = test_game_original.get_living()
+		# Make sure the two grids are the same after update
+		self.assertEqual(cells_original_after, cells_optimized_after)
+
+	def test_original_vs_optimized_b6s16(self):
+		"""Test the original vs. optimized implementation to make sure they update the same."""
+		# Initialize two Conway Grids (both the same)
+		test_game_original = ConwayGOLGrid(10, 10, optimized=True, variant="B6/S16")
+		test_game_optimized = deepcopy(test_game_original)
+		cells_original = test_game_original.get_living()
+		cells_optimized = test_game_optimized.get_living()
+		# Make sure the two grids are the same before update
+		self.assertEqual(cells_original, cells_optimized)
+		# Update for both grids
+		test_game_original.update()
+		test_game_optimized.update()
+		cells_original_after = test_game_original.get_living()
+		cells_optimized_after = test_game_original.get_living()
+		# Make sure the two grids are the same after update
+		self.assertEqual(cells_original_after, cells_optimized_after)
+
+	def test_original_vs_optimized_b1s12(self):
+		"""Test the original vs. optimized implementation to make sure they update the same."""
+		# Initialize two Conway Grids (both the same)
+		test_game_original = ConwayGOLGrid(10, 10, optimized=True, variant="B1/S12")
+		test_game_optimized = deepcopy(test_game_original)
+		cells_original = test_game_original.get_living()
+		cells_optimized = test_game_optimized.get_living()
+		# Make sure the two grids are the same before update
+		self.assertEqual(cells_original, cells_optimized)
+		# Update for both grids
+		test_game_original.update()
+		test_game_optimized.update()
+		cells_original_after = test_game_original.get_living()
+		cells_optimized_after = test_game_original.get_living()
+		# Make sure the two grids are the same after update
+		self.assertEqual(cells_original_after, cells_optimized_after)
+
+	def test_original_vs_optimized_b36s23(self):
+		"""Test the original vs. optimized implementation to make sure they update the same."""
+		# Initialize two Conway Grids (both the same)
+		test_game_original = ConwayGOLGrid(10, 10, optimized=True, variant="B36/S23")
+		test_game_optimized = deepcopy(test_game_original)
+		cells_original = test_game_original.get_living()
+		cells_optimized = test_game_optimized.get_living()
+		# Make sure the two grids are the same before update
+		self.assertEqual(cells_original, cells_optimized)
+		# Update for both grids
+		test_game_original.update()
+		test_game_optimized.update()
+		cells_original_after = test_game_original.get_living()
+		cells_optimized_after = test_game_original.get_living()
+		# Make sure the two grids are the same after update
+		self.assertEqual(cells_original_after, cells_optimized_after)
+
+	def test_original_vs_optimized_b2s3(self):
+		"""Test the original vs. optimized implementation to make sure they update the same."""
+		# Initialize two Conway Grids (both the same)
+		test_game_original = ConwayGOLGrid(10, 10, optimized=True, variant="B2/S3")
+		test_game_optimized = deepcopy(test_game_original)
+		cells_original = test_game_original.get_living()
+		cells_optimized = test_game_optimized.get_living()
+		# Make sure the two grids are the same before update
+		self.assertEqual(cells_original, cells_optimized)
+		# Update for both grids
+		test_game_original.update()
+		test_game_optimized.update()
+		cells_original_after = test_game_original.get_living()
+		cells_optimized_after = test_game_original.get_living()
+		# Make sure the two grids are the same after update
+		self.assertEqual(cells_original_after, cells_optimized_after)
+
+	def test_original_vs_optimized_b2s(self):
+		"""Test the original vs. optimized implementation to make sure they update the same."""
+		# Initialize two Conway Grids (both the same)
+		test_game_original = ConwayGOLGrid(10, 10, optimized=True, variant="B2/S")
+		test_game_optimized = deepcopy(test_game_original)
+		cells_original = test_game_original.get_living()
+		cells_optimized = test_game_optimized.get_living()
+		# Make sure the two grids are the same before update
+		self.assertEqual(cells_original, cells_optimized)
+		# Update for both grids
+		test_game_original.update()
+		test_game_optimized.update()
+		cells_original_after = test_game_original.get_living()
+		cells_optimized_after = test_game_original.get_living()
+		# Make sure the two grids are the same after update
+		self.assertEqual(cells_original_after, cells_optimized_after)
+
+	def test_original_vs_sparse(self):
+		"""Test the original vs. set based implementation for every variant over several updates."""
+		for variant in ["B3/S23", "B6/S16", "B1/S12", "B36/S23", "B2/S3", "B2/S"]:
+			# Use the same random start cells for both grids
+			start_cells = [(x, y) for x in range(12) for y in range(9) if randint(0, 100) < 30]
+			test_game_original = ConwayGOLGrid(12, 9, start_cells, optimized=0, variant=variant)
+			test_game_sparse = ConwayGOLGrid(12, 9, start_cells, optimized=1, variant=variant)
+			for generation in range(5):
+				self.assertEqual(test_game_original.update(), test_game_sparse.update())
+				self.assertEqual(test_game_original.get_living(), test_game_sparse.get_living())
+
+	def test_original_vs_numpy(self):
+		"""Test the original vs. NumPy implementation for every variant over several updates."""
+		for variant in ["B3/S23", "B6/S16", "B1/S12", "B36/S23", "B2/S3", "B2/S"]:
+			# Use the same random start cells for both grids
+			start_cells = [(x, y) for x in range(12) for y in range(9) if randint(0, 100) < 30]
+			test_game_original = ConwayGOLGrid(12, 9, start_cells, optimized=0, variant=variant)
+			test_game_numpy = ConwayGOLGrid(12, 9, start_cells, optimized=3, variant=variant)
+			self.assertEqual(test_game_original.get_living(), test_game_numpy.get_living())
+			for generation in range(5):
+				self.assertEqual(test_game_original.update(), test_game_numpy.update())
+				self.assertEqual(test_game_original.get_living(), test_game_numpy.get_living())
+
+	def test_original_vs_hashlife(self):
+		"""Test the original vs. Hashlife implementation away from the edges of the board."""
+		for variant in ["B3/S23", "B36/S23", "B2/S3"]:
+			# Random cells in the middle of the board so the edges are never reached
+			start_cells = [(x, y) for x in range(15, 25) for y in range(15, 25) if randint(0, 100) < 30]
+			test_game_original = ConwayGOLGrid(40, 40, start_cells, optimized=0, variant=variant)
+			test_game_hashlife = ConwayGOLGrid(40, 40, start_cells, optimized=4, variant=variant)
+			self.assertEqual(test_game_original.get_living(), test_game_hashlife.get_living())
+			for generation in range(5):
+				test_game_original.update()
+				test_game_hashlife.update()
+				self.assertEqual(test_game_original.get_living(), test_game_hashlife.get_living())
+
+	def test_unbounded_sparse(self):
+		"""Test the unbounded set based implementation against Hashlife and off the board edges."""
+		# Glider heading north west, off the top left corner of the board
+		glider = [(0, 0), (1, 0), (2, 0), (0, 1), (1, 2)]
+		test_game_sparse = ConwayGOLGrid(10, 10, glider, optimized=5, variant="B3/S23")
+		test_game_hashlife = ConwayGOLGrid(10, 10, glider, optimized=4, variant="B3/S23")
+		self.assertEqual(test_game_sparse.bounding_box(), (0, 0, 2, 2))
+		for generation in range(20):
+			self.assertEqual(test_game_sparse.update(), True)
+			test_game_hashlife.update()
+			self.assertEqual(test_game_sparse.bounding_box(), test_game_hashlife.bounding_box())
+		# After 20 generations the glider moved 5 cells up and left
+		self.assertEqual(test_game_sparse.bounding_box(), (-5, -5, -3, -3))
+		box = test_game_sparse.bounding_box()
+		self.assertEqual(test_game_sparse.get_living(box), test_game_hashlife.get_living(box))
+		self.assertEqual(sum(map(sum, test_game_sparse.get_living(box))), 5)
+
+	def test_topologies(self):
+		"""Test that every bounded mode agrees on the torus and Klein bottle topologies."""
+		for topology in ["torus", "klein"]:
+			# The quadtree mode needs a power of 2 width
+			start_cells = [(x, y) for x in range(8) for y in range(8) if randint(0, 100) < 30]
+			test_game_original = ConwayGOLGrid(8, 8, start_cells, optimized=0, variant="B3/S23",
+				topology=topology)
+			test_games = [ConwayGOLGrid(8, 8, start_cells, optimized=opt, variant="B3/S23",
+				topology=topology) for opt in [1, 2, 3, 8, 9]]
+			for generation in range(5):
+				test_game_original.update()
+				for test_game in test_games:
+					test_game.update()
+					self.assertEqual(test_game_original.get_living(), test_game.get_living())
+
+	def test_torus_glider(self):
+		"""Test that a glider on a torus comes back to where it started."""
+		glider = [(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)]
+		for opt in [0, 1, 2, 3, 8, 9]:
+			test_game = ConwayGOLGrid(8, 8, glider, optimized=opt, variant="B3/S23", topology="torus")
+			cells_beginning = test_game.get_living()
+			# A glider moves one cell diagonally every 4 generations
+			test_game.advance(4 * 8)
+			self.assertEqual(cells_beginning, test_game.get_living())
+
+	def test_klein_glider(self):
+		"""Test that a glider crossing the top and bottom of a Klein bottle comes back mirrored."""
+		# Glider heading south east, and its mirror image heading south west
+		glider = [(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)]
+		mirrored = [(7 - x, y) for x, y in glider]
+		test_game = ConwayGOLGrid(8, 8, glider, optimized=3, variant="B3/S23", topology="klein")
+		test_game_mirrored = ConwayGOLGrid(8, 8, mirrored, optimized=0, variant="B3/S23")
+		# After 32 generations the glider has crossed the bottom edge once and is
+		# back on its starting row, mirrored
+		test_game.advance(32)
+		self.assertEqual(test_game_mirrored.get_living(), test_game.get_living())
+
+	def test_numpy_vs_parallel(self):
+		"""Test the NumPy vs. parallel implementation on every topology."""
+		rule = compile_rule([3], [2, 3])
+		for topology in ["bounded", "torus", "klein"]:
+			test_board_numpy = GoLArray(23, 17, rule, topology)
+			# Use more tiles than workers so halos are read across several bands
+			test_board_parallel = GoLTiles(23, 17, rule, topology, processes=2, tiles=5)
+			test_board_numpy.randomize(30)
+			test_board_parallel.board[...] = test_board_numpy.board
+			for generation in range(10):
+				self.assertEqual(test_board_numpy.step(), test_board_parallel.step())
+				self.assertTrue((test_board_numpy.board == test_board_parallel.board).all())
+			test_board_parallel.close()
+		# The grid runs the parallel mode like any other
+		for topology in ["bounded", "torus", "klein"]:
+			seed(topology)
+			start_cells = [(x, y) for x in range(23) for y in range(17) if randint(0, 100) < 30]
+			test_game_numpy = ConwayGOLGrid(23, 17, start_cells, optimized=3, topology=topology)
+			test_game_parallel = ConwayGOLGrid(23, 17, start_cells, optimized=6, topology=topology)
+			for generation in range(10):
+				test_game_numpy.update()
+				test_game_parallel.update()
+				self.assertEqual(test_game_numpy.get_living(), test_game_parallel.get_living())
+				self.assertEqual(test_game_numpy.population(), test_game_parallel.population())
+			test_game_parallel.close()
+		test_game_parallel = ConwayGOLGrid(8, 8, [(1, 2), (2, 2), (3, 2)], optimized=6)
+		test_game_parallel.update()
+		self.assertEqual(test_game_parallel.bounding_box(), (2, 1, 2, 3))
+		test_game_parallel.close()
+
+	def test_original_vs_quadblocks(self):
+		"""Test the original vs. block stepped quadtree implementation on every topology."""
+		for size, topology, variant, prune in [(32, "bounded", "B3/S23", "eager"),
+				(32, "torus", "B36/S23", "batch"), (32, "klein", "B3/S23", "never"),
+				(4, "torus", "B3/S23", "eager")]:
+			start_cells = [(x, y) for x in range(size) for y in range(size) if randint(0, 100) < 30]
+			test_game_original = ConwayGOLGrid(size, size, start_cells, optimized=0,
+				variant=variant, topology=topology)
+			test_game_blocks = ConwayGOLGrid(size, size, start_cells, optimized=7,
+				variant=variant, topology=topology, prune=prune)
+			for generation in range(20):
+				self.assertEqual(test_game_original.update(), test_game_blocks.update())
+				self.assertEqual(test_game_original.get_living(), test_game_blocks.get_living())
+			self.assertEqual(test_game_blocks.tree.node_counts()["nodes"],
+				test_game_blocks.tree.size(test_game_blocks.rootnode))
+			# The masks on the block nodes match the cells in the tree
+			tree = test_game_blocks.tree
+			self.assertEqual(sorted(test_game_blocks.quadlife.cells()),
+				sorted(tree.query(test_game_blocks.rootnode, test_game_blocks.rootnode.rect)))
+
+	def test_quadtree_instances(self):
+		"""Test that two quadtree grids in one process do not share state."""
+		test_game_blinker = ConwayGOLGrid(8, 8, [(1, 2), (2, 2), (3, 2)], optimized=2)
+		test_game_block = ConwayGOLGrid(8, 8, [(5, 5), (5, 6), (6, 5), (6, 6)], optimized=2)
+		self.assertEqual(test_game_blinker.tree.leaves, set([(1, 2), (2, 2), (3, 2)]))
+		self.assertEqual(test_game_block.tree.leaves, set([(5, 5), (5, 6), (6, 5), (6, 6)]))
+		for generation in range(3):
+			test_game_blinker.update()
+			test_game_block.update()
+		self.assertEqual(test_game_blinker.tree.leaves, set([(2, 1), (2, 2), (2, 3)]))
+		self.assertEqual(test_game_block.tree.leaves, set([(5, 5), (5, 6), (6, 5), (6, 6)]))
+
+	def test_quadtree_pruning(self):
+		"""Test that every pruning policy gives the same game and keeps correct node counts."""
+		start_cells = [(x, y) for x in range(16) for y in range(16) if randint(0, 100) < 30]
+		test_game_original = ConwayGOLGrid(16, 16, start_cells, optimized=0)
+		test_games = [ConwayGOLGrid(16, 16, start_cells, optimized=2, prune=prune)
+			for prune in GoLQuadTree.PRUNE_POLICIES]
+		for generation in range(6):
+			test_game_original.update()
+			for test_game in test_games:
+				test_game.update()
+				self.assertEqual(test_game_original.get_living(), test_game.get_living())
+				counts = test_game.tree.node_counts()
+				# Compare the incremental counts with a full walk of the tree
+				self.assertEqual(counts["nodes"], test_game.tree.size(test_game.rootnode))
+				self.assertEqual(counts["leaves"], len(test_game.tree.leaves))
+		eager, batch, threshold, never = [test_game.tree.node_counts() for test_game in test_games]
+		self.assertEqual(eager["empty"], 0)
+		self.assertEqual(batch["empty"], 0)
+		self.assertEqual(eager["nodes"], batch["nodes"])
+		self.assertTrue(never["nodes"] >= threshold["nodes"] >= eager["nodes"])
+
+	def test_quadtree_operations(self):
+		"""Test insert, delete and is_element against a set of points."""
+		root = GoLNode(None, (0, 0, 15, 15))
+		tree = GoLQuadTree(root, 0)
+		points = set()
+		for n in range(400):
+			point = (randint(0, 15), randint(0, 15))
+			if randint(0, 1):
+				self.assertEqual(tree.insert(root, point), point not in points)
+				points.add(point)
+			else:
+				self.assertEqual(tree.delete(root, point), point in points)
+				points.discard(point)
+		self.assertFalse(tree.insert(root, (16, 0)))
+		self.assertFalse(tree.delete(root, (-1, 3)))
+		self.assertEqual(root.count, len(points))
+		self.assertEqual(tree.node_counts()["nodes"], tree.size(root))
+		for x in range(16):
+			for y in range(16):
+				self.assertEqual(tree.is_element(root, (x, y)), (x, y) in points)
+		# Eager pruning cuts every branch off once the last point is gone
+		for point in points:
+			self.assertTrue(tree.delete(root, point))
+		self.assertEqual(root.children, [None, None, None, None])
+		self.assertEqual(tree.node_counts()["nodes"], 1)
+		# The walk down the tree needs a square root with a power of 2 width
+		self.assertRaises(ValueError, GoLQuadTree, GoLNode(None, (0, 0, 16, 16)), 0)
+		self.assertRaises(ValueError, GoLQuadTree, GoLNode(None, (0, 0, 15, 7)), 0)
+
+	def test_quadtree_bulk_load(self):
+		"""Test that bulk loading builds the same tree as inserting one point at a time."""
+		points = [(x, y) for x in range(32) for y in range(32) if randint(0, 100) < 30]
+		mask = np.zeros((32, 32), dtype=bool)
+		for x, y in points:
+			mask[x, y] = True
+		trees = []
+		for load in ["insert", "points", "mask"]:
+			root = GoLNode(None, (0, 0, 31, 31))
+			tree = GoLQuadTree(root, 0)
+			if load == "insert":
+				for point in points:
+					tree.insert(root, point)
+				tree.traverse(root)
+			elif load == "points":
+				# Duplicates and points off the tree are skipped
+				self.assertEqual(tree.bulk_load(root, points + points[:3] + [(32, 0)]), len(points))
+			else:
+				self.assertEqual(tree.bulk_load_mask(root, mask), len(points))
+			self.assertEqual(tree.leaves, set(points))
+			self.assertEqual(root.count, len(points))
+			trees.append((tree.node_counts(), tree.size(root), tree.maxdepth))
+		self.assertEqual(trees[0], trees[1])
+		self.assertEqual(trees[0], trees[2])
+		self.assertEqual(trees[0][0]["nodes"], trees[0][1])
+
+	def test_quadtree_queries(self):
+		"""Test range, population and nearest point queries against a brute force search."""
+		points = [(x, y) for x in range(32) for y in range(32) if randint(0, 100) < 10]
+		root = GoLNode(None, (0, 0, 31, 31))
+		tree = GoLQuadTree(root, 0)
+		tree.bulk_load(root, points)
+		for rect in [(0, 0, 31, 31), (3, 5, 20, 9), (-4, -4, 2, 40), (31, 31, 31, 31), (40, 0, 50, 10)]:
+			x0, y0, x1, y1 = rect
+			inside = set(p for p in points if x0 <= p[0] <= x1 and y0 <= p[1] <= y1)
+			self.assertEqual(set(tree.query(root, rect)), inside)
+			self.assertEqual(tree.population(root, rect), len(inside))
+		self.assertEqual(tree.population(root), len(points))
+		for point in [(0, 0), (16, 16), (31, 5), (-10, 40)]:
+			found = tree.nearest(root, point)
+			distance = lambda p: (p[0] - point[0]) ** 2 + (p[1] - point[1]) ** 2
+			self.assertTrue(found in points)
+			self.assertEqual(distance(found), min(map(distance, points)))
+		self.assertEqual(tree.nearest(GoLNode(None, (0, 0, 7, 7)), (1, 1)), None)
+		test_game = ConwayGOLGrid(16, 16, [(2, 3), (5, 5), (6, 5)], optimized=7)
+		self.assertEqual(test_game.get_living((4, 4, 6, 5)), [[False, False], [False, True], [False, True]])
+		self.assertEqual(test_game.tree.nearest(test_game.rootnode, (15, 15), limit=5), None)
+
+	def test_stats(self):
+		"""Test the population, bounding box and generation counters of every mode."""
+		start_cells = [(x, y) for x in range(6, 10) for y in range(6, 10) if randint(0, 100) < 40]
+		for opt in [0, 1, 2, 3, 4, 5, 7, 8, 9]:
+			test_game = ConwayGOLGrid(16, 16, start_cells, optimized=opt)
+			# Nothing can travel past the edges in 6 generations
+			for generation in range(6):
+				cells = test_game.get_living()
+				living = [(x, y) for x in range(16) for y in range(16) if cells[x][y]]
+				box = None
+				if living:
+					xs, ys = zip(*living)
+					box = (min(xs), min(ys), max(xs), max(ys))
+				self.assertEqual(test_game.stats(), {"generation": generation,
+					"population": len(living), "bounding_box": box})
+				test_game.update()
+		test_game = ConwayGOLGrid(16, 16, [(1, 2), (2, 2), (3, 2)], optimized=4)
+		test_game.advance(5)
+		self.assertEqual(test_game.stats(), {"generation": 5, "population": 3,
+			"bounding_box": (2, 1, 2, 3)})
+
+	def test_cycle_detection(self):
+		"""Test that every mode reports the same hashes and the periods of oscillators."""
+		# Kept 3 cells from the edges so mode 5 cannot leave the board in 3 generations
+		start_cells = [(x, y) for x in range(3, 12) for y in range(3, 12) if randint(0, 100) < 30]
+		hashes = []
+		for opt in [0, 1, 2, 3, 5, 6, 7, 8, 9]:
+			test_game = ConwayGOLGrid(16, 16, start_cells, optimized=opt)
+			hashes.append([test_game.state_hash()])
+			for generation in range(3):
+				test_game.update()
+				hashes[-1].append(test_game.state_hash())
+			test_game.close()
+		for other in hashes[1:]:
+			self.assertEqual(hashes[0], other)
+		for opt in [0, 1, 2, 3, 4, 5, 7, 8, 9]:
+			# A lone cell dies, and the empty board repeats one generation later
+			for cells, period, found in [([(5, 5), (5, 6), (6, 5), (6, 6)], 1, 1),
+					([(4, 5), (5, 5), (6, 5)], 2, 2), ([(5, 5)], 1, 2)]:
+				test_game = ConwayGOLGrid(16, 16, cells, optimized=opt)
+				test_game.detect_cycles()
+				for generation in range(4):
+					test_game.update()
+					if test_game.period is not None:
+						break
+				self.assertEqual(test_game.period, period)
+				self.assertEqual(test_game.generation, found)
+		# Gliders move, so their boards never repeat on a bounded board
+		test_game = ConwayGOLGrid(32, 32, initial_cells("glider", 32), optimized=1)
+		test_game.detect_cycles(history=8)
+		for generation in range(20):
+			test_game.update()
+			self.assertEqual(test_game.period, None)
+
+	def test_incremental_hash(self):
+		"""Test that the hashes updated every generation match hashes of the whole board."""
+		# A corner of a large board, so mode 9 only steps the tiles around it
+		start_cells = [(x, y) for x in range(8, 28) for y in range(8, 28) if randint(0, 100) < 30]
+		for opt in [3, 5, 6, 8, 9]:
+			test_game = ConwayGOLGrid(256, 256, start_cells, optimized=opt)
+			test_game.state_hash()
+			for generation in range(12):
+				test_game.update()
+				if opt == 5:
+					self.assertEqual(test_game.state_hash(), cells_hash(test_game.sparse.living))
+				else:
+					self.assertEqual(test_game.state_hash(), array_hash(test_game.get_living_array()))
+			test_game.close()
+		# Hashlife's hash does not depend on the size of the root, but does on
+		# where the cells are
+		test_game = ConwayGOLGrid(32, 32, initial_cells("glider", 32), optimized=4)
+		glider_hash = test_game.state_hash()
+		for generation in range(12):
+			test_game.update()
+			test_life = GoLHashlife(compile_rule([3], [2, 3]))
+			test_life.add_cells(test_game.life.living())
+			self.assertEqual(test_game.state_hash(), test_life.state_hash())
+			self.assertNotEqual(test_game.state_hash(), glider_hash)
+		self.assertEqual(GoLHashlife(compile_rule([3], [2, 3])).state_hash(), 0)
+
+	def test_get_living_array(self):
+		"""Test that the array accessor matches get_living in every mode."""
+		start_cells = [(x, y) for x in range(16) for y in range(16) if randint(0, 100) < 30]
+		for opt in [0, 1, 2, 3, 4, 5, 7, 8, 9]:
+			test_game = ConwayGOLGrid(16, 16, start_cells, optimized=opt)
+			out = np.zeros((16, 16), dtype=bool)
+			for generation in range(3):
+				cells = test_game.get_living_array()
+				self.assertEqual(cells.dtype, np.bool_)
+				self.assertEqual(cells.tolist(), test_game.get_living())
+				self.assertTrue(test_game.get_living_array(out=out) is out)
+				self.assertEqual(out.tolist(), test_game.get_living())
+				test_game.update()
+		# The array modes hand out a read only view of their board
+		test_game = ConwayGOLGrid(8, 8, [(1, 2)], optimized=3)
+		cells = test_game.get_living_array()
+		self.assertFalse(cells.flags.writeable)
+		self.assertTrue(np.may_share_memory(cells, test_game.board.board))
+		# The parallel mode's view is of the generation it was taken at
+		test_game = ConwayGOLGrid(8, 8, [(1, 2), (2, 2), (3, 2)], optimized=6)
+		cells = test_game.get_living_array()
+		self.assertEqual(cells.tolist(), test_game.get_living())
+		test_game.update()
+		self.assertEqual(test_game.get_living_array().tolist(), test_game.get_living())
+		test_game.close()
+
+	def test_pattern_files(self):
+		"""Test that the three pattern formats read the same glider and load into every mode."""
+		from StringIO import StringIO
+		glider = [(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)]
+		files = [
+			("rle", "#C glider\nx = 3, y = 3, rule = B3/S23\nbo$2bo$3o!\n"),
+			# Counts may be split from their tag by a line break
+			("rle", "x = 3, y = 3\nbob$2bo$\n3\no!\n"),
+			("life106", "#Life 1.06\n1 0\n2 1\n0 2\n1 2\n2 2\n"),
+			("cells", "!Name: Glider\n.O.\n..O\nOOO\n")]
+		for format, text in files:
+			pattern = GoLPattern(StringIO(text))
+			self.assertEqual(pattern.format, format)
+			self.assertEqual(sorted(pattern.cells()), sorted(glider))
+			self.assertEqual(pattern.bounding_box(), (0, 0, 2, 2))
+		self.assertEqual(GoLPattern(StringIO(files[0][1])).rule, "B3/S23")
+		self.assertEqual(GoLPattern(StringIO(files[0][1])).width, 3)
+
+		mask, rule = load_pattern(StringIO(files[0][1]), 8, 8)
+		shifted = [(x + 2, y + 2) for x, y in glider]
+		self.assertEqual(sorted(mask_cells(mask)), sorted(shifted))
+		# Cells off the mask are dropped
+		self.assertEqual(GoLPattern(StringIO(files[2][1])).mask(2, 2, -1, -1).tolist(),
+			[[False, True], [True, True]])
+		for opt in [0, 1, 2, 3, 4, 5, 7, 8, 9]:
+			test_game = ConwayGOLGrid(8, 8, mask, optimized=opt)
+			test_game_list = ConwayGOLGrid(8, 8, shifted, optimized=opt)
+			for generation in range(4):
+				self.assertEqual(test_game.get_living(), test_game_list.get_living())
+				test_game.update()
+				test_game_list.update()
+		# A pattern goes in centered; the unbounded modes keep the cells past the window
+		row = "x = 40, y = 3\n$40o!\n"
+		for opt in [0, 1, 2, 3, 4, 5, 7, 8, 9]:
+			test_game = ConwayGOLGrid(8, 8, GoLPattern(StringIO(row)), optimized=opt)
+			self.assertEqual(test_game.population(), 40 if opt in (4, 5) else 8)
+			self.assertEqual(test_game.bounding_box(), (-16, 3, 23, 3) if opt in (4, 5) else (0, 3, 7, 3))
+		test_game = ConwayGOLGrid(8, 8, GoLPattern(StringIO(files[3][1])), optimized=5)
+		self.assertEqual(sorted(test_game.sparse.living), sorted(shifted))
+		chunk = list(GoLPattern(StringIO(row)).chunks(-16, 2))
+		self.assertEqual(len(chunk), 1)
+		self.assertEqual(chunk[0][0].tolist(), range(-16, 24))
+
+	def test_write_patterns(self):
+		"""Test that every pattern format reads back the board it was written from."""
+		from StringIO import StringIO
+		mask = np.random.randint(0, 101, size=(23, 9)) < 20
+		# Leading and trailing blank rows and columns are kept by RLE only
+		mask[:, :2] = False
+		mask[-3:, :] = False
+		mask[0, 5] = True
+		for format in ["rle", "life106", "cells"]:
+			f = StringIO()
+			write_pattern(f, mask, format, "B36/S23")
+			pattern = GoLPattern(StringIO(f.getvalue()))
+			self.assertEqual(pattern.format, format)
+			self.assertEqual(pattern.mask(23, 9).tolist(), mask.tolist())
+			if format == "rle":
+				self.assertEqual((pattern.width, pattern.height, pattern.rule), (23, 9, "B36/S23"))
+				self.assertTrue(max(map(len, f.getvalue().splitlines())) <= 70)
+
+	def test_checkpoints(self):
+		"""Test that a game resumed from a checkpoint carries on like the saved game."""
+		path = os.path.join(tempfile.mkdtemp(), "game.gol")
+		for opt in [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]:
+			for layout in ["dense", "sparse"]:
+				test_game = ConwayGOLGrid(64, 64, initial_cells("glider_gun", 64), optimized=opt,
+					variant="B36/S23", topology="torus")
+				for generation in range(7):
+					test_game.update()
+				test_game.save_checkpoint(path, layout)
+				with GoLCheckpoint(path) as checkpoint:
+					self.assertEqual(checkpoint.layout, layout)
+					self.assertEqual(checkpoint.population, test_game.population())
+				test_game_resumed = load_checkpoint(path)
+				self.assertEqual(test_game_resumed.generation, 7)
+				self.assertEqual(test_game_resumed.variant, test_game.variant)
+				self.assertEqual(test_game_resumed.topology, test_game.topology)
+				for generation in range(3):
+					box = test_game.bounding_box()
+					self.assertEqual(test_game_resumed.get_living(box), test_game.get_living(box))
+					test_game.update()
+					test_game_resumed.update()
+				test_game.close()
+				test_game_resumed.close()
+		# The unbounded modes keep the cells left of the window
+		test_game = ConwayGOLGrid(16, 16, [(1, 0), (0, 1), (0, 2), (1, 2), (2, 2)], optimized=5)
+		test_game.advance(40)
+		test_game.save_checkpoint(path)
+		self.assertEqual(load_checkpoint(path).bounding_box(), test_game.bounding_box())
+		# The bounded modes drop the cells off their board
+		for opt in [0, 1, 2, 3, 7, 8]:
+			test_game_bounded = load_checkpoint(path, opt)
+			self.assertEqual(test_game_bounded.population(), 0)
+			self.assertEqual(test_game_bounded.bounding_box(), None)
+			self.assertFalse(test_game_bounded.update())
+		# Sparse checkpoints set the cells of the packed modes word by word,
+		# several of them in the same word
+		cells = [(1, 70), (2, 71), (0, 72), (1, 72), (2, 72), (1, 5), (-3, 5), (40, 130), (99, 99)]
+		test_game = ConwayGOLGrid(100, 100, cells, optimized=5)
+		test_game.save_checkpoint(path, "sparse")
+		test_game_numpy = load_checkpoint(path, 3)
+		self.assertEqual(test_game_numpy.population(), 7)
+		for opt in [8, 9]:
+			test_game_bits = load_checkpoint(path, opt)
+			self.assertEqual(test_game_bits.population(), 7)
+			self.assertEqual(test_game_bits.get_living(), test_game_numpy.get_living())
+		with open(path, "wb") as f:
+			f.write("not a checkpoint" * 8)
+		self.assertRaises(ValueError, GoLCheckpoint, path)
+
+	def test_cli(self):
+		"""Test the run, convert and benchmark commands of the headless command line."""
+		import json
+		from StringIO import StringIO
+		import conway_cli
+		folder = tempfile.mkdtemp()
+
+		def main(argv):
+			stdout, sys.stdout = sys.stdout, StringIO()
+			try:
+				status = conway_cli.main(argv)
+				return status, sys.stdout.getvalue()
+			finally:
+				sys.stdout = stdout
+
+		# A blinker repeats after two generations, so the run stops there
+		output, checkpoint = os.path.join(folder, "final.rle"), os.path.join(folder, "final.gol")
+		status, text = main(["run", "--engine", "3", "--size", "16", "--pattern", "blinker",
+			"--generations", "50", "--json", "--output", output, "--checkpoint", checkpoint])
+		stats = json.loads(text)
+		self.assertEqual(status, 0)
+		self.assertEqual((stats["generation"], stats["population"], stats["period"]), (2, 3, 2))
+		self.assertEqual(stats["engine"], "numpy")
+		test_game = ConwayGOLGrid(16, 16, initial_cells("blinker", 16), optimized=3)
+		test_game.advance(2)
+		self.assertEqual(GoLPattern(output).mask(16, 16).tolist(), test_game.get_living())
+		test_game_resumed = load_checkpoint(checkpoint)
+		self.assertEqual(test_game_resumed.generation, 2)
+		self.assertEqual(test_game_resumed.get_living(), test_game.get_living())
+		# Resuming counts the generations from the checkpoint
+		status, text = main(["run", "--resume", checkpoint, "--generations", "5",
+			"--cycle-history", "0", "--json"])
+		self.assertEqual(json.loads(text)["generation"], 5)
+		# Hashlife only looks for cycles when asked to, and jumps to the end otherwise
+		for extra, generation, period in [([], 50, None), (["--cycle-history", "8"], 2, 2)]:
+			status, text = main(["run", "--engine", "4", "--size", "16", "--pattern", "blinker",
+				"--generations", "50", "--json"] + extra)
+			stats = json.loads(text)
+			self.assertEqual((stats["generation"], stats["period"]), (generation, period))
+
+		# A glider written as RLE comes back the same from the other formats
+		source = os.path.join(folder, "glider.rle")
+		with open(source, "w") as f:
+			f.write("x = 3, y = 3, rule = B3/S23\nbo$2bo$3o!\n")
+		glider = GoLPattern(source).mask(3, 3).tolist()
+		previous = source
+		for name in ["glider.cells", "glider.lif", "glider2.rle"]:
+			path = os.path.join(folder, name)
+			self.assertEqual(main(["convert", previous, path])[0], 0)
+			self.assertEqual(GoLPattern(path).mask(3, 3).tolist(), glider)
+			previous = path
+		self.assertEqual(main(["convert", previous, source, "--rule", "B36/S23"])[0], 0)
+		self.assertEqual(GoLPattern(source).rule, "B36/S23")
+
+		# Unknown arguments are only passed on by benchmark
+		report = os.path.join(folder, "bench.json")
+		stderr, sys.stderr = sys.stderr, StringIO()
+		try:
+			self.assertRaises(SystemExit, main, ["convert", source, previous, "--engines", "1"])
+			status, text = main(["benchmark", "--engines", "1", "--sizes", "8", "--generations", "2",
+				"--warmup", "0", "--startup-repeats", "0", "--same-process", "--output", report])
+		finally:
+			sys.stderr = stderr
+		self.assertEqual(status, 0)
+		with open(report) as f:
+			results = json.load(f)["results"]
+		self.assertEqual([(r["engine"], r["size"], r["generations"]) for r in results], [(1, 8, 2)])
+
+	def test_rule_notations(self):
+		"""Test that the B/S and S/B notations compile to the same rule."""
+		self.assertEqual(parse_rule("B3/S23"), ([3], [2, 3]))
+		self.assertEqual(parse_rule("b36/s23"), ([3, 6], [2, 3]))
+		self.assertEqual(parse_rule("S23/B3"), ([3], [2, 3]))
+		self.assertEqual(parse_rule("23/3"), ([3], [2, 3]))
+		self.assertEqual(parse_rule("B2/S"), ([2], []))
+		self.assertEqual(parse_rule("/2"), ([2], []))
+		self.assertRaises(ValueError, parse_rule, "B9/S23")
+		self.assertRaises(ValueError, parse_rule, "Conway")
+		self.assertEqual(rule_string(compile_rule([3, 6, 8], [2, 4, 5])), "B368/S245")
+		self.assertEqual(ConwayGOLGrid(4, 4, [(1, 1)], optimized=1, variant="245/368").variant,
+			"B368/S245")
+
+	def test_original_vs_numpy_any_rule(self):
+		"""Test the original vs. NumPy implementation with rules outside the built in list."""
+		for variant in ["B368/S245", "B0/S8", "S012345678/B3", "B1357/S1357"]:
+			start_cells = [(x, y) for x in range(10) for y in range(10) if randint(0, 100) < 30]
+			test_game_original = ConwayGOLGrid(10, 10, start_cells, optimized=0, variant=variant,
+				topology="torus")
+			test_game_numpy = ConwayGOLGrid(10, 10, start_cells, optimized=3, variant=variant,
+				topology="torus")
+			for generation in range(4):
+				self.assertEqual(test_game_original.update(), test_game_numpy.update())
+				self.assertEqual(test_game_original.get_living(), test_game_numpy.get_living())
+
+	def test_numpy_vs_bitpacked(self):
+		"""Test the NumPy vs. bit-packed implementation on boards that do not fill their last word."""
+		for width, height in [(10, 10), (7, 64), (20, 70), (3, 130)]:
+			for variant in ["B3/S23", "B0/S8", "B1357/S1357"]:
+				for topology in ["bounded", "torus", "klein"]:
+					start_cells = np.random.randint(0, 101, size=(width, height)) < 30
+					test_game_numpy = ConwayGOLGrid(width, height, start_cells, optimized=3,
+						variant=variant, topology=topology)
+					test_game_bits = ConwayGOLGrid(width, height, start_cells, optimized=8,
+						variant=variant, topology=topology)
+					for generation in range(4):
+						self.assertEqual(test_game_numpy.update(), test_game_bits.update())
+						self.assertEqual(test_game_numpy.get_living(), test_game_bits.get_living())
+						self.assertEqual(test_game_numpy.stats(), test_game_bits.stats())
+		# Random boards are made a band at a time, from the same numbers
+		rule = compile_rule([3], [2, 3])
+		test_board_numpy, test_board_bits = GoLArray(30, 70, rule), GoLBits(30, 70, rule)
+		test_board_bits._band = 4
+		np.random.seed(1)
+		test_board_numpy.randomize(30)
+		np.random.seed(1)
+		test_board_bits.randomize(30)
+		self.assertEqual(test_board_numpy.get_living(), test_board_bits.get_living())
+		self.assertEqual(test_board_numpy.population(), test_board_bits.population())
+
+	def test_numpy_vs_active(self):
+		"""Test the NumPy vs. active region implementation, with tiles smaller than the board."""
+		for width, height in [(10, 10), (20, 70), (130, 130)]:
+			for variant in ["B3/S23", "B0/S8", "B36/S23"]:
+				for topology in ["bounded", "torus", "klein"]:
+					start_cells = np.zeros((width, height), dtype=bool)
+					start_cells[:width // 2, :height // 2] = np.random.randint(0, 101,
+						size=(width // 2, height // 2)) < 30
+					test_game_numpy = ConwayGOLGrid(width, height, start_cells, optimized=3,
+						variant=variant, topology=topology)
+					test_game_active = ConwayGOLGrid(width, height, start_cells, optimized=9,
+						variant=variant, topology=topology)
+					for generation in range(12):
+						self.assertEqual(test_game_numpy.update(), test_game_active.update())
+						self.assertEqual(test_game_numpy.get_living(), test_game_active.get_living())
+						self.assertEqual(test_game_numpy.population(), test_game_active.population())
+
+	def test_active_tiles(self):
+		"""Test that the active region mode leaves tiles of still lifes and blinkers alone."""
+		block = [(10, 10), (10, 11), (11, 10), (11, 11)]
+		blinker = [(200, 150), (201, 150), (202, 150)]
+		test_game = ConwayGOLGrid(256, 256, block + blinker, optimized=9)
+		# 64 x 64 tiles around each, cut off by the edges of the 4 x 4 tiles
+		self.assertEqual(test_game.board.active().sum(), 2 * 2 + 2 * 3)
+		test_game.advance(2)
+		# Both repeat every two generations, so no tile changed
+		self.assertEqual(test_game.board.active().sum(), 0)
+		test_game.advance(3)
+		self.assertEqual(sorted(mask_cells(test_game.get_living_array())),
+			sorted(block + [(201, 149), (201, 150), (201, 151)]))
+
+	def test_hashlife_advance(self):
+		"""Test that a Hashlife jump matches advancing one generation at a time."""
+		# R-pentomino in the middle of a board large enough to hold it for 100 generations
+		r_pentomino = [(100, 99), (101, 99), (99, 100), (100, 100), (100, 101)]
+		test_game_numpy = ConwayGOLGrid(200, 200, r_pentomino, optimized=3, variant="B3/S23")
+		test_game_hashlife = ConwayGOLGrid(200, 200, r_pentomino, optimized=4, variant="B3/S23")
+		test_game_numpy.advance(100)
+		test_game_hashlife.advance(100)
+		self.assertEqual(test_game_numpy.get_living(), test_game_hashlife.get_living())
+		self.assertEqual(test_game_hashlife.life.generation, 100)
+
+	def test_hashlife_max_nodes(self):
+		"""Test that Hashlife drops unused nodes past its cap and still gets the same board."""
+		from StringIO import StringIO
+		gosper_gun = list(GoLPattern(StringIO("x = 36, y = 9\n24bo$22bobo$12b2o6b2o12b2o$"
+			"11bo3bo4b2o12b2o$2o8bo5bo3b2o$2o8bo3bob2o4bobo$10bo5bo7bo$11bo3bo$12b2o!\n")).cells())
+		test_game = ConwayGOLGrid(64, 64, gosper_gun, optimized=4, max_nodes=None)
+		test_game_capped = ConwayGOLGrid(64, 64, gosper_gun, optimized=4, max_nodes=1000)
+		for n in range(5):
+			test_game.advance(1000)
+			test_game_capped.advance(1000)
+			self.assertTrue(test_game_capped.life.node_count() <= 1000)
+		self.assertTrue(test_game.life.node_count() > 1000)
+		self.assertEqual(test_game_capped.population(), test_game.population())
+		self.assertEqual(test_game_capped.bounding_box(), test_game.bounding_box())
+
+	def test_hashlife_arrays(self):
+		"""Test that Hashlife builds the same universe from arrays of cells as from a list."""
+		rule = compile_rule([3], [2, 3])
+		for span in [3, 40, 3000]:
+			points = list(set((randint(-span, span), randint(-span, span)) for n in range(300)))
+			test_life_cells = GoLHashlife(rule)
+			test_life_cells.add_cells(points)
+			test_life_arrays = GoLHashlife(rule)
+			xs, ys = np.array(points).T
+			test_life_arrays.add_arrays([(xs[:100], ys[:100]), (xs[100:], ys[100:])])
+			self.assertEqual(sorted(test_life_cells.living()), sorted(test_life_arrays.living()))
+			# Blocks that already hold cells
+			test_life_arrays.add_arrays([(xs[:10] + 1, ys[:10])])
+			test_life_cells.add_cells((x + 1, y) for x, y in points[:10])
+			self.assertEqual(sorted(test_life_cells.living()), sorted(test_life_arrays.living()))
+		# A mask goes into the grid as arrays
+		mask = np.random.randint(0, 101, size=(40, 40)) < 30
+		test_game_hashlife = ConwayGOLGrid(40, 40, mask, optimized=4)
+		self.assertEqual(test_game_hashlife.get_living(), mask.tolist())
+
+	def test_lazy_imports(self):
+		"""Test that importing conway and running a pure Python engine loads no heavy modules."""
+		# A fresh interpreter, since this one has already imported everything
+		script = ("import sys, conway; "
+			"conway.ConwayGOLGrid(8, 8, [(1, 2), (2, 2), (3, 2)], optimized=1).update(); "
+			"print(' '.join(m for m in ('numpy', 'matplotlib', 'unittest') if m in sys.modules))")
+		here = os.path.dirname(os.path.abspath(__file__))
+		output = subprocess.check_output([sys.executable, "-c", script], cwd=here)
+		self.assertEqual(output.strip(), "")